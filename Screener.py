@@ -11,10 +11,16 @@ from services.Reporter import Reporter
 from services.PageBuilder import PageBuilder
 from services.dashboard.DashboardPageBuilder import DashboardPageBuilder
 from utils.CustomPage.CustomPage import CustomPage
-from utils.Tools import _warn, _info
+from utils.Tools import _warn, _info, _pr
+from utils.ClientFactory import ClientFactory
+from utils.RateLimiter import RateLimiter
+from utils.Paginator import Paginator
+from utils.MetricStore import MetricStore
+from utils.Profiler import Profiler
 
 from frameworks.FrameworkPageBuilder import FrameworkPageBuilder
 from utils.ExcelBuilder import ExcelBuilder
+from utils.WorkUnitScheduler import WorkUnitScheduler
 import shutil
 # import zlib
 
@@ -25,7 +31,7 @@ class Screener:
         pass
     
     @staticmethod
-    def scanByService(service, regions, filters):
+    def scanByUnit(service, regions, filters):
         _cli_options = Config.get('_SS_PARAMS', {})
         
         _zeroCount = {
@@ -35,29 +41,20 @@ class Screener:
             'timespent': 0
         }
         
-        contexts = {}
-        charts = {}
-        time_start = time.time()
-        
-        tempCount = 0
         service = service.split('::')
         
-        _regions = ['GLOBAL'] if service[0] in Config.GLOBAL_SERVICES else regions
-        
         scannedKey = 'scanned_'+service[0]
-        globalKey = 'GLOBALRESOURCES_'+service[0]
-        Config.set(scannedKey, _zeroCount)
         
         ## CustomPage Enhancement
         cp = CustomPage()
-        cp.resetOutput(service[0])
         
-        for region in _regions:
+        for region in regions:
+            time_start = time.time()
+            Config.set(scannedKey, _zeroCount.copy())
+            
             reg = region
             if region == 'GLOBAL':
                 reg = 'us-east-1'
-                # reg = regions[0]
-            
             
             CURRENT_REGION = reg
             cw = Cloudwatch(reg)
@@ -72,11 +69,8 @@ class Screener:
             if len(service) > 1 and service[1] != []:
                 serv.setRules(service[1])
             
-            if not service[0] in contexts:
-                contexts[service[0]] = {}
-
-            if not service[0] in charts:
-                charts[service[0]] = {}
+            results = {}
+            charts = {}
             
             Config.set('CWClient', cw.getClient())
             try:
@@ -85,17 +79,13 @@ class Screener:
                 Config.set(classPrefix, reg)
                 
                 resp = serv.advise()
-                arr = {}
-                info = {}
                 for identifier, obj in resp.items():
-                    arr[identifier] = obj['results']
-                    info[identifier] = obj['info']
+                    results[identifier] = obj['results']
                     
-                contexts[service[0]][region] = arr
-                charts[service[0]][region] = serv.getChart()
+                charts = serv.getChart()
                 
             except botocore.exceptions.ClientError as e:
-                contexts[service[0]][region] = {}
+                results = {}
                 eCode = e.response['Error']['Code']
                 eMsg = e.response['Error']['Message']
                 print("Screener.py error: {}, {}".format(eCode, eMsg))
@@ -104,42 +94,28 @@ class Screener:
                     _warn('Impacted Region: [{}], Services: {}... Cross Account limitation, encounted errors: {}'.format(reg, service[0], e))
 
             except botocore.exceptions.EndpointConnectionError as e:
-                contexts[service[0]][region] = {}
+                results = {}
                 _warn("(Not showstopper: Service <{}> not available: {}".format(service[0], e))
                 
-            tempCount += len(contexts[service[0]][region])
+            serv.flushScanned()
             del serv
             
             Config.set(classPrefix, None)
-
-        
-        GLOBALRESOURCES = Config.get(globalKey, [])
-        if len(GLOBALRESOURCES) > 0:
-            garr = {}
-            ginfo = {}
-            for identifier, obj in GLOBALRESOURCES.items():
-                garr[identifier] = obj['results']
-                ginfo[identifier] = obj['info']
-                
-            contexts[service[0]]['GLOBAL'] = arr
-        
-        time_end = time.time()
-        scanned = Config.get(scannedKey)
-        # print(scannedKey)
-        
-        scanned['timespent'] = time_end - time_start
-        
-        with open(_C.FORK_DIR + '/' + service[0] + '.json', 'w') as f:
-            json.dump(contexts[service[0]], f)
-        
-        with open(_C.FORK_DIR + '/' + service[0] + '.stat.json', 'w') as f:
-            json.dump(scanned, f)
-
-        ## write the charts data per region
-        with open(_C.FORK_DIR + '/' + service[0] + '.charts.json', 'w') as f:
-            json.dump(charts[service[0]], f)
             
-        cp.writeOutput(service[0].lower())
+            scanned = Config.get(scannedKey)
+            scanned['timespent'] = time.time() - time_start
+            
+            WorkUnitScheduler.writeUnit(service[0], region, results, charts, scanned, cp.collectOutput(service[0]), Profiler.collect())
+            MetricStore.reset()
+        
+        stats = ClientFactory.getStats()
+        _pr("[{}] boto3 clients created: {}, reused: {}".format(service[0], stats['created'], stats['hits']))
+        rlStats = RateLimiter.getStats()
+        _pr("[{}] rate limited {} calls for {}s, throttled {} times".format(service[0], rlStats['waits'], round(rlStats['waited'], 3), rlStats['throttles']))
+        msStats = MetricStore.getStats()
+        _pr("[{}] {} metric queries in {} GetMetricData calls, {} served from store".format(service[0], msStats['queries'], msStats['calls'], msStats['hits']))
+        pgStats = Paginator.getStats()
+        _pr("[{}] paginated {} list calls over {} pages".format(service[0], sum(v['calls'] for v in pgStats.values()), sum(v['pages'] for v in pgStats.values())))
 
 
     @staticmethod
@@ -2,6 +2,7 @@ import boto3, json, botocore
 from botocore.exceptions import BotoCoreError
 from botocore.config import Config as bConfig
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from datetime import datetime
 from utils.Tools import _warn
 import time
@@ -51,7 +52,7 @@ class WATools():
         boto3Config = bConfig(region_name = cfg['region'])
         ssBoto = Config.get('ssBoto', None)
 
-        self.waClient = ssBoto.client('wellarchitected', config=boto3Config)
+        self.waClient = ClientFactory.getClient(ssBoto, 'wellarchitected', config=boto3Config)
 
 
     def checkIfReportExists(self):
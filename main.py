@@ -20,7 +20,14 @@ from utils.SuppressionsManager import SuppressionsManager
 from utils.Tools import _info, _warn
 import constants as _C
 from utils.AwsRegionSelector import AwsRegionSelector
+from utils.WorkUnitScheduler import WorkUnitScheduler
+from utils.InventoryWriter import InventoryWriter
+from utils.AccountExecutor import AccountExecutor
+from utils.RateLimiter import RateLimiter
+from utils.ClientFactory import ClientFactory
+from services.ResourceExecutor import ResourceExecutor
 from Screener import Screener
+from services.iam.IamCredentialReport import IamCredentialReport
 
 def number_format(num, places=2):
     return locale.format_string("%.*f", (places, num), True)
@@ -35,6 +42,7 @@ testmode = _cli_options['ztestmode']
 filters = _cli_options['tags']
 crossAccounts = _cli_options['crossAccounts']
 workerCounts = _cli_options['workerCounts']
+parallelAccounts = _cli_options['parallelAccounts']
 beta = _cli_options['beta']
 suppress_file = _cli_options['suppress_file']
 
@@ -61,6 +69,26 @@ if suppress_file:
         Config.set('suppressions_manager', suppressions_manager)
 Config.set('beta', beta)
 
+## Shared API rate limits for all workers, must be created before any Pool
+rateLimits = None
+if _cli_options.get('others', None) is not None:
+    try:
+        otherOptions = json.loads(_cli_options['others'])
+        rateLimits = otherOptions.get('rateLimits', None)
+        ## seconds to reuse Cost Explorer responses across runs, 0 = current scan only
+        Config.set('ceCacheTTL', otherOptions.get('ceCacheTTL', 0))
+        ## keep IAM managed policy verdicts across runs, versions are immutable so no expiry
+        Config.set('iamPolicyCache', otherOptions.get('iamPolicyCache', 0))
+        ## drivers run concurrently per (service, region), 0 = ResourceExecutor defaults, 1 = one at a time
+        Config.set('resourceWorkers', otherOptions.get('resourceWorkers', 0))
+        ## per check and per API timing written to __fork/profile.json, 0 = off
+        Config.set('profiler', otherOptions.get('profiler', 1))
+    except json.JSONDecodeError:
+        pass
+RateLimiter.init(rateLimits)
+## Before any client is created, workers inherit it
+ClientFactory.setMaxPoolConnections(ResourceExecutor.getMaxConcurrency())
+
 _AWS_OPTIONS = {
     'signature_version': Config.AWS_SDK['signature_version']
 }
@@ -88,7 +116,7 @@ if crossAccounts == True:
     cav.resetIamGlobalEndpointTokenVersion()
     if cav.isValidated() == False:
         print('CrossAccountsFlag=True but failed to validate, exit...')
-        exit()
+        exit(1)
     
     if cav.checkIfIncludeThisAccount() == True:
         rolesCred['default'] = {}
@@ -103,42 +131,29 @@ for file in os.listdir(_C.ADMINLTE_DIR):
     if file.isnumeric() == True:
         shutil.rmtree(_C.ADMINLTE_DIR + '/' + file)
 
-acctLoop = 0
 CfnTrailObj = CfnTrail()
 
-for acctId, cred in rolesCred.items():
-    acctLoop = acctLoop + 1
-    flagSkipPromptForRegionConfirmation = True
-    if acctLoop == 1:
-        flagSkipPromptForRegionConfirmation = False
-    
-    tcred = cred.copy()
-    tcred['region_name'] = defaultSessionRegion
-    aid = acctId
-    if acctId == 'default':
-        aid = 'Current Account'
-    
-    
+def setAccountSession(acctId, cred):
     if acctId != 'default':
+        tcred = cred.copy()
+        tcred['region_name'] = defaultSessionRegion
         newSess = boto3.session.Session(**tcred)
         Config.set('ssBoto', newSess)
     else:
         Config.set('ssBoto', defaultBoto3)
 
-    
-    Config.set('scanned', {'resources': 0, 'rules': 0, 'exceptions': 0})
+def resolveRegions(flagSkipPromptForRegionConfirmation):
     if _cli_options['regions'] == None:
         print("--regions option is not present. Generating region list...")
         
         regions = AwsRegionSelector.prompt_for_region(flagSkipPromptForRegionConfirmation)
         if not regions or len(regions.split(',')) == 0:
             print("No valid region(s) selected. Exiting.")
-            exit()
+            exit(1)
         
         # Set back to cli options
         _cli_options['regions'] = regions
     
-    services = _cli_options['services'].split(',')
     regions = _cli_options['regions'].split(',')
     
     Config.set('PARAMS_REGION_ALL', False)
@@ -148,10 +163,25 @@ for acctId, cred in rolesCred.items():
         ## Can pass in True for RegionSelector to skip prompt
         regions = AwsRegionSelector.get_all_enabled_regions(flagSkipPromptForRegionConfirmation)
     
-    
-    if acctLoop == 1:
-        Config.set('REGIONS_SELECTED', regions)
+    return regions
+
+def buildListOfAccounts():
+    ## Build List of Accounts for dropdown...
+    listOfAccts = []
+    if 'default' in rolesCred:
+        resp = defaultBoto3.client('sts').get_caller_identity()
+        listOfAccts.append(resp.get('Account'))
+    
+    for tacctId, tcred in rolesCred.items():
+        if tacctId != 'default':
+            listOfAccts.append(tacctId)
         
+    Config.set('ListOfAccounts', listOfAccts)
+
+def scanAccount(acctId, regions, workers):
+    Config.set('scanned', {'resources': 0, 'rules': 0, 'exceptions': 0})
+    services = _cli_options['services'].split(',')
+    
     frameworks = []
     if len(_cli_options['frameworks']) > 0:
         frameworks = _cli_options['frameworks'].split(',')
@@ -171,18 +201,6 @@ for acctId, cred in rolesCred.items():
     print("=================================================")
     print("")
     
-    ## Build List of Accounts for dropdown...
-    if acctLoop == 1:
-        listOfAccts = []
-        if acctId == 'default':
-            listOfAccts.append(acctInfo['Account'])
-        
-        for tacctId, tcred in rolesCred.items():
-            if tacctId != 'default':
-                listOfAccts.append(tacctId)
-            
-        Config.set('ListOfAccounts', listOfAccts)
-    
     contexts = {}
     charts = {}
     serviceStat = {}
@@ -202,7 +220,7 @@ for acctId, cred in rolesCred.items():
         except json.JSONDecodeError as e:
             print("Unable to read --others parameters, invalid JSON format provided")
             print(f"Error decoding JSON: {e}")
-            exit()
+            exit(1)
 
     if testmode == False:
         cfnAdditionalStr = None
@@ -213,7 +231,7 @@ for acctId, cred in rolesCred.items():
     
     overallTimeStart = time.time()
     # os.chdir('__fork')
-    directory = '__fork'
+    directory = _C.FORK_DIR
     if not os.path.exists(directory):
         os.mkdir(directory)
     
@@ -226,23 +244,23 @@ for acctId, cred in rolesCred.items():
     with open(directory + '/tail.txt', 'w') as fp:
         pass
     
-    special_services = {'iam', 's3'}
-    input_ranges = {}
-
-    ## Make IAM and S3 to be separate pool
-    if 'iam' in services:
-        input_ranges['iam'] = ('iam', regions, filters)
-
-    input_ranges.update({service: (service, regions, filters) for service in services if service not in special_services})
-
-    if 's3' in services:
-        input_ranges['s3'] = ('s3', regions, filters)
-
-    input_ranges = list(input_ranges.values())
+    ## IAM credential report takes a while to generate, request it before the pool starts
+    if 'iam' in [service.split('::')[0] for service in services]:
+        IamCredentialReport.request()
+    
+    ## Split services into (service, region) work units, longest expected first
+    WorkUnitScheduler.reset()
+    input_ranges = WorkUnitScheduler.buildUnits(services, regions, filters)
 
-    pool = Pool(processes=int(workerCounts))
-    pool.starmap(Screener.scanByService, input_ranges)
+    pool = Pool(processes=int(workers), initializer=RateLimiter.attach, initargs=RateLimiter.getShared())
+    ## chunksize=1 so idle workers always pick up the next unit in order
+    pool.starmap(Screener.scanByUnit, input_ranges, chunksize=1)
     pool.close()
+    pool.join()
+
+    WorkUnitScheduler.mergeUnits(services)
+    ## rows streamed by the workers, merged once into all.csv
+    InventoryWriter.merge(_C.FORK_DIR + '/all.csv')
 
     if testmode == False:
         CfnTrailObj.deleteStack()
@@ -260,7 +278,7 @@ for acctId, cred in rolesCred.items():
     
     hasGlobal = False
     for file in os.listdir(_C.FORK_DIR):
-        if file[0] == '.' or file == _C.SESSUID_FILENAME or file == 'tail.txt' or file == 'error.txt' or file == 'empty.txt' or file == 'all.csv' or file[0:10] == 'CustomPage':
+        if file[0] == '.' or file == _C.SESSUID_FILENAME or file == 'tail.txt' or file == 'error.txt' or file == 'empty.txt' or file == 'all.csv' or file == 'profile.json' or file[0:10] == 'CustomPage':
             continue
         f = file.split('.')
         if len(f) == 2:
@@ -347,6 +365,46 @@ for acctId, cred in rolesCred.items():
         os.rename(src, dest)
     
 
+def scanAccountInIsolation(acctId, cred, workers):
+    ## Runs in its own process, Config cache is already isolated per process
+    ## but __fork has to be separated as accounts are scanned at the same time
+    _C.FORK_DIR = _C.ROOT_DIR + '/__fork/.accounts/' + acctId
+    if not os.path.exists(_C.FORK_DIR):
+        os.makedirs(_C.FORK_DIR)
+    
+    setAccountSession(acctId, cred)
+    regions = resolveRegions(True)
+    scanAccount(acctId, regions, workers)
+
+buildListOfAccounts()
+
+failedAccounts = []
+parallelAccounts = min(int(parallelAccounts), int(workerCounts), len(rolesCred))
+if parallelAccounts > 1:
+    ## Prompt (if any) once upfront, accounts are scanned in background processes
+    firstAcctId, firstCred = list(rolesCred.items())[0]
+    setAccountSession(firstAcctId, firstCred)
+    Config.set('REGIONS_SELECTED', resolveRegions(False))
+    
+    executor = AccountExecutor(parallelAccounts, workerCounts)
+    _info("Scanning {} accounts, {} at a time with {} workers each".format(len(rolesCred), parallelAccounts, executor.getWorkersPerAccount()), True)
+    failedAccounts = executor.run(scanAccountInIsolation, rolesCred)
+else:
+    acctLoop = 0
+    for acctId, cred in rolesCred.items():
+        acctLoop = acctLoop + 1
+        flagSkipPromptForRegionConfirmation = True
+        if acctLoop == 1:
+            flagSkipPromptForRegionConfirmation = False
+        
+        setAccountSession(acctId, cred)
+        regions = resolveRegions(flagSkipPromptForRegionConfirmation)
+        
+        if acctLoop == 1:
+            Config.set('REGIONS_SELECTED', regions)
+        
+        scanAccount(acctId, regions, workerCounts)
+
 adminlteDir = _C.ADMINLTE_ROOT_DIR
 shutil.make_archive('output', 'zip', adminlteDir)
 
@@ -363,3 +421,7 @@ if beta:
     print("\033[96m  01/ Concurrent Mode on Evaluator (Attempt to improve performance) \033[0m")
     print("\033[96m  02/ API Buttons on each service html \033[0m")
     print("\033[93m[-- ..... --] THANK YOU FOR TESTING BETA FEATURES [-- ..... --] \033[0m")
+
+if failedAccounts:
+    _warn("{} of {} accounts did not complete: {}".format(len(failedAccounts), len(rolesCred), ', '.join(failedAccounts)))
+    exit(1)
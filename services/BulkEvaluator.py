@@ -0,0 +1,116 @@
+import traceback
+import botocore
+import time
+
+from array import array
+
+from utils.Config import Config
+from utils.Tools import _warn
+from utils.CustomPage.CustomPage import CustomPage
+from services.Evaluator import Evaluator
+from utils.Profiler import Profiler
+import constants as _C
+
+## Evaluator for checks which only compare attributes already returned by a list call
+## Resources are kept as columns instead of one driver object each, every _check method works on
+## whole columns and records findings for the failing rows only. Counters are updated once per
+## run, the all.csv inventory and custom page records are buffered by finalize for all rows at once
+class BulkEvaluator():
+    ## column name: array typecode, None for a plain list
+    COLUMNS = {}
+    ## column holding the resource name
+    NAME_COLUMN = None
+
+    def __init__(self, keyPrefix):
+        self.keyPrefix = keyPrefix
+        self.columns = {name: array(typecode) if typecode else [] for name, typecode in self.COLUMNS.items()}
+        ## row index: {check: [-1, value]}
+        self.results = {}
+        self.classname = type(self).__name__
+
+    def addRow(self, row):
+        for name, column in self.columns.items():
+            column.append(row[name])
+
+    def getColumn(self, name):
+        return self.columns[name]
+
+    def getRowCount(self):
+        return len(self.columns[self.NAME_COLUMN])
+
+    def addFindings(self, check, rows, values):
+        '''
+        rows: failing row indexes, values: finding value of each row
+        '''
+        for row, value in zip(rows, values):
+            if row not in self.results:
+                self.results[row] = {}
+            self.results[row][check] = [-1, value]
+
+    def run(self, serviceName):
+        self._serviceName = serviceName.__name__
+        rulePrefix = serviceName.__name__ + '::rules'
+        rules = Config.get(rulePrefix, [])
+        debugFlag = Config.get('DEBUG')
+
+        methods = [method for method in dir(self) if method.startswith('_check')]
+        filteredMethods = [method for method in methods if not rules or method[6:].lower() in rules]
+
+        ecnt = 0
+        emsg = []
+        for method in filteredMethods:
+            try:
+                startTime = time.time()
+                if debugFlag:
+                    print('--- --- fn: ' + method)
+
+                getattr(self, method)()
+                Profiler.recordCheck(self._serviceName, self.classname, method, time.time() - startTime)
+                if debugFlag:
+                    timeSpent = round(time.time() - startTime, 3)
+                    if timeSpent >= 0.2:
+                        _warn("Long running checks {}s".format(timeSpent))
+
+            except botocore.exceptions.ClientError as e:
+                code = e.response['Error']['Code']
+                msg = e.response['Error']['Message']
+                print(code, msg)
+                print(traceback.format_exc())
+                emsg.append(traceback.format_exc())
+            except Exception:
+                ecnt += 1
+                print(traceback.format_exc())
+                emsg.append(traceback.format_exc())
+
+        if emsg:
+            with open(_C.FORK_DIR + '/error.txt', 'a+') as f:
+                f.write('\n\n'.join(emsg))
+                f.close()
+
+        rowCount = self.getRowCount()
+        scannedKey = 'scanned_'+serviceName.__name__.lower()
+        Config.increase(scannedKey, {
+            'resources': rowCount,
+            'rules': len(filteredMethods) * rowCount,
+            'exceptions': ecnt
+        })
+
+    ## Same rows and custom page records as Evaluator.finalize, buffered for all rows at once
+    def finalize(self):
+        driver = self.classname.lower()
+        classPrefix = Config.getDriversClassPrefix(driver)
+        region = Config.get(classPrefix, "")
+        names = self.getColumn(self.NAME_COLUMN)
+
+        buffer = Evaluator.getBuffer(self._serviceName)
+        buffer['scanned'].extend([';'.join([region, driver, name, '-1' if row in self.results else '1']) for row, name in enumerate(names)])
+
+        if CustomPage().tracksDriver(driver):
+            buffer['pages'].extend([(driver, name, self.results.get(row, {}), {}) for row, name in enumerate(names)])
+
+    def getInfo(self):
+        '''
+        return {keyPrefix + name: {'results', 'info'}} of the rows with findings, as Evaluator.getInfo per resource
+        '''
+        names = self.getColumn(self.NAME_COLUMN)
+        return {self.keyPrefix + names[row]: {'results': results, 'info': {}} for row, results in sorted(self.results.items())}
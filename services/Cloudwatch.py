@@ -1,11 +1,20 @@
 from datetime import date, timedelta, datetime
 from botocore.config import Config as bConfig
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 
 class Cloudwatch:
     def __init__(self, region):
         ssBoto = Config.get('ssBoto')
-        self.cwClient = ssBoto.client('cloudwatch', config=bConfig(region_name=region))
+        ## Same options as Service.bConfig, shares the cached client with services using cloudwatch
+        conf = bConfig(
+            region_name = region,
+            retries = {
+                'mode': 'standard',
+                'max_attempts': 5
+            }
+        )
+        self.cwClient = ClientFactory.getClient(ssBoto, 'cloudwatch', config=conf)
     
     def getClient(self):
         return self.cwClient
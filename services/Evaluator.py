@@ -9,6 +9,8 @@ import concurrent.futures as cf
 from utils.Config import Config
 from utils.Tools import _warn, _info
 from utils.CustomPage.CustomPage import CustomPage
+from utils.InventoryWriter import InventoryWriter
+from utils.Profiler import Profiler
 import constants as _C
 
 def runSingleCheck(tmp_obj, method_name):
@@ -17,6 +19,7 @@ def runSingleCheck(tmp_obj, method_name):
     try:
         startTime = time.time()
         getattr(obj, method_name)()
+        Profiler.recordCheck(obj._serviceName, obj.classname, method_name, time.time() - startTime)
         if debugFlag:
             timeSpent = round(time.time() - startTime, 3)
             print('--- --- fn: ' + method_name)
@@ -36,6 +39,9 @@ def runSingleCheck(tmp_obj, method_name):
     return emsg
 
 class Evaluator():
+    ## {serviceName: {'scanned': [all.csv row], 'pages': [(driver, name, results, InventoryInfo)]}}
+    buffers = {}
+    
     def __init__(self):
         self.init()
         
@@ -65,6 +71,7 @@ class Evaluator():
         return self.chartData
 
     def run(self, serviceName):
+        self._serviceName = serviceName.__name__
         servClass = self.classname
         rulePrefix = serviceName.__name__ + '::rules'
         servMethods = servClass + '::methods'
@@ -74,6 +81,7 @@ class Evaluator():
         
         ecnt = cnt = 0
         emsg = []
+        runStartTime = time.time()
 
         #Improve of methods scanning
         methods = Config.get(servMethods, [])
@@ -106,6 +114,7 @@ class Evaluator():
                             print('--- --- fn: ' + method)
                             
                         getattr(self, method)()
+                        Profiler.recordCheck(self._serviceName, servClass, method, time.time() - startTime)
                         if debugFlag:
                             timeSpent = round(time.time() - startTime, 3)
                             if timeSpent >= 0.2:
@@ -127,14 +136,16 @@ class Evaluator():
                 f.write('\n\n'.join(emsg))
                 f.close()
         
+        Profiler.recordResource(self._serviceName, servClass, getattr(self, '_resourceName', ''), time.time() - runStartTime)
+        
         scannedKey = 'scanned_'+serviceName.__name__.lower()
         # print(scannedKey)
         
-        scanned = Config.get(scannedKey)
-        Config.set(scannedKey, {
-            'resources': scanned['resources'] + 1,
-            'rules': scanned['rules'] + cnt,
-            'exceptions': scanned['exceptions'] + ecnt
+        ## drivers of a service may run concurrently, see ResourceExecutor
+        Config.increase(scannedKey, {
+            'resources': 1,
+            'rules': cnt,
+            'exceptions': ecnt
         })
         
         if debugFlag:
@@ -149,16 +160,13 @@ class Evaluator():
     def getInfo(self):
         return {'results': self.results, 'info': self.InventoryInfo}
     
-    ## Enhancement 20240117 - Capture all scanned resources    
-    def __del__(self):
+    ## Enhancement 20240117 - Capture all scanned resources
+    ## Called by the Service once run() is done, the inventory row and custom page record are
+    ## buffered per service and written by Evaluator.flush once per (service, region)
+    def finalize(self):
         driver = type(self).__name__.lower()
         classPrefix = Config.getDriversClassPrefix(driver)
         
-        ConfigKey = 'AllScannedResources.' + classPrefix
-        scanned = Config.get(ConfigKey, [])
-        
-        # print(classPrefix, Config.get(classPrefix))
-        
         hasError = '1'
         for check, find in self.results.items():
             if find[0] == -1:
@@ -170,23 +178,44 @@ class Evaluator():
             name = self._resourceName
         else:
             _warn("driver: '{}' need to set self._resourceName".format(driver))
-
-        scanned.append(';'.join([Config.get(classPrefix, ""), driver or "", name or "", hasError or ""]))
-        Config.set(ConfigKey, scanned)
-            
-            
+        
+        buffer = Evaluator.getBuffer(self._serviceName)
+        buffer['scanned'].append(';'.join([Config.get(classPrefix, ""), driver or "", name or "", hasError or ""]))
+        buffer['pages'].append((driver, name, self.results, self.InventoryInfo))
+    
+    @staticmethod
+    def getBuffer(serviceName):
+        with Config.lock:
+            if serviceName not in Evaluator.buffers:
+                Evaluator.buffers[serviceName] = {'scanned': [], 'pages': []}
+            return Evaluator.buffers[serviceName]
+    
+    @staticmethod
+    def flush(serviceName):
+        buffer = Evaluator.buffers.pop(serviceName, None)
+        if buffer is None:
+            return
+        
+        InventoryWriter.write(buffer['scanned'])
+        
         ## Handle custom page requirement
         cp = CustomPage()
+        tracked = {}
         
         emsg = []
-        try:
-            cp.trackInfo(driver, name, self.results, self.InventoryInfo)
-        except Exception:
-            print(traceback.format_exc())
-            emsg.append(traceback.format_exc())
+        for driver, name, results, inventoryInfo in buffer['pages']:
+            if driver not in tracked:
+                tracked[driver] = cp.tracksDriver(driver)
+            if not tracked[driver]:
+                continue
+            
+            try:
+                cp.trackInfo(driver, name, results, inventoryInfo)
+            except Exception:
+                print(traceback.format_exc())
+                emsg.append(traceback.format_exc())
         
         if emsg:
             with open(_C.FORK_DIR + '/error.txt', 'a+') as f:
                 f.write('\n\n'.join(emsg))
                 f.close()
-        
\ No newline at end of file
@@ -0,0 +1,63 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.Config import Config
+
+## Bounded thread pool for the drivers of one (service, region)
+## Drivers spend most of their time waiting on AWS APIs, so building and running them for several
+## resources at once shortens a region scan. Results come back in the order of the input items
+## whatever order the threads finish in, so the findings do not depend on timing
+class ResourceExecutor():
+    DEFAULT_WORKERS = 4
+
+    ## largest MAX_WORKERS of the prefetchers sharing one client (S3BucketConfig)
+    PREFETCH_WORKERS = 16
+
+    ## per service cap, ClientFactory sizes the connection pools from getMaxConcurrency
+    SERVICE_WORKERS = {
+        'ec2': 8,
+        's3': 8,
+        'rds': 4,
+        'dynamodb': 8,
+        'kms': 8,
+        'sqs': 8,
+        'lambda': 8
+    }
+
+    def __init__(self, serviceName):
+        self.workers = ResourceExecutor.getWorkers(serviceName)
+
+    @staticmethod
+    def getWorkers(serviceName):
+        '''
+        --others '{"resourceWorkers": n}' caps every service, 1 runs the drivers one after another
+        '''
+        workers = ResourceExecutor.SERVICE_WORKERS.get(serviceName.lower(), ResourceExecutor.DEFAULT_WORKERS)
+        limit = Config.get('resourceWorkers', 0)
+        if limit:
+            workers = min(workers, int(limit))
+        return max(workers, 1)
+
+    @staticmethod
+    def getMaxConcurrency():
+        '''
+        most threads a single client serves at once: resource drivers of a service, each running its
+        checks on a ThreadPoolExecutor in beta mode, or a prefetcher's own workers
+        '''
+        services = list(ResourceExecutor.SERVICE_WORKERS.keys()) + ['']
+        workers = max(ResourceExecutor.getWorkers(serviceName) for serviceName in services)
+        if Config.get('beta', False):
+            workers *= min(32, (os.cpu_count() or 1) + 4)
+        return max(workers, ResourceExecutor.PREFETCH_WORKERS)
+
+    def map(self, fn, items):
+        '''
+        return [fn(item)] in items order, the first exception raised by fn is raised again
+        '''
+        items = list(items)
+        if self.workers == 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as executor:
+            return list(executor.map(fn, items))
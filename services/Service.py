@@ -3,7 +3,8 @@ import time
 import boto3
 from botocore.config import Config as bConfig
 from utils.Config import Config
-import constants as _C
+from services.Evaluator import Evaluator
+from services.ResourceExecutor import ResourceExecutor
 
 class Service:
     _AWS_OPTIONS = {}
@@ -80,19 +81,40 @@ class Service:
         rules = rules.lower().split('^')
         Config.set(self.RULESPREFIX, rules)
         
+    ## Build and run one driver per item on the ResourceExecutor of this service
+    ## build(item) returns (key, driver), or None to skip the item. Findings are returned as
+    ## {key: getInfo()} in items order and driver chart data is added to the service charts
+    def runDrivers(self, items, build):
+        def evaluate(item):
+            built = build(item)
+            if built is None:
+                return None
+            
+            key, obj = built
+            obj.run(self.__class__)
+            obj.finalize()
+            return key, obj.getInfo(), obj.getChartData()
+        
+        objs = {}
+        for result in ResourceExecutor(self.__class__.__name__).map(evaluate, items):
+            if result is None:
+                continue
+            
+            key, info, chartData = result
+            objs[key] = info
+            self.setChartData(chartData)
+        
+        return objs
+    
+    ## Write what the drivers buffered in finalize(), once per (service, region)
+    def flushScanned(self):
+        Evaluator.flush(self.__class__.__name__)
+        
     def __del__(self):
         self.processChartData()
         timespent = round(time.time() - self.overallTimeStart, 3)
         print('\033[1;42mCOMPLETED\033[0m -- \x1b[4;30;47m' + self.__class__.__name__.upper() + '::'+self.region+'\x1b[0m (' + str(timespent) + 's)')
         
-        items = Config.retrieveAllCache()
-        key = [k for k in items.keys() if 'AllScannedResources' in k]
-        f = open(_C.FORK_DIR + '/' + 'all.csv', 'a+')
-        for ke in key:
-            f.write('\r\n'.join(items[ke]) + '\r\n')
-        f.close()
-            
-        
         Config.set(self.RULESPREFIX, [])
         
     def setTags(self, tags):
@@ -2,6 +2,8 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from services.Service import Service
 from services.accessanalyzer.drivers.AccessanalyzerCommon import AccessanalyzerCommon
 
@@ -9,13 +11,12 @@ class Accessanalyzer(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.accessanalyzerClient = ssBoto.client('accessanalyzer', config=self.bConfig)
+        self.accessanalyzerClient = ClientFactory.getClient(ssBoto, 'accessanalyzer', config=self.bConfig)
         
     def getResources(self):
         arr = []
         try:
-            results = self.accessanalyzerClient.list_analyzers()
-            arr = results.get('analyzers', [])
+            arr = Paginator.list(self.accessanalyzerClient, 'list_analyzers', 'analyzers')
         except botocore.exceptions.ClientError as e:
             if e.response['Error']['Code'] not in ['AccessDeniedException']:
                 raise
@@ -29,6 +30,7 @@ class Accessanalyzer(Service):
             # Create a placeholder for account-level checks
             obj = AccessanalyzerCommon({}, self.accessanalyzerClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs['AccessAnalyzer::Account'] = obj.getInfo()
             del obj
         else:
@@ -36,6 +38,7 @@ class Accessanalyzer(Service):
                 print('... (AccessAnalyzer) inspecting ' + analyzer.get('name', 'Unknown'))
                 obj = AccessanalyzerCommon(analyzer, self.accessanalyzerClient)
                 obj.run(self.__class__)
+                obj.finalize()
                 objs[f"AccessAnalyzer::{analyzer.get('name', 'Unknown')}"] = obj.getInfo()
                 del obj
         
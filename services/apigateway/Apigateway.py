@@ -3,6 +3,8 @@ import botocore
 import requests
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from services.Service import Service
 from services.apigateway.drivers.ApiGatewayCommon import ApiGatewayCommon
 from services.apigateway.drivers.ApiGatewayRest import ApiGatewayRest
@@ -19,8 +21,8 @@ class Apigateway(Service):
         self.apis = []
         self.apisv2 = []
         
-        self.apiClient = ssBoto.client('apigateway', config=self.bConfig)
-        self.apiv2Client = ssBoto.client('apigatewayv2', config=self.bConfig)
+        self.apiClient = ClientFactory.getClient(ssBoto, 'apigateway', config=self.bConfig)
+        self.apiv2Client = ClientFactory.getClient(ssBoto, 'apigatewayv2', config=self.bConfig)
         
         return
     
@@ -28,11 +30,7 @@ class Apigateway(Service):
         apis = []   
 
         try:
-            apis = self.apiClient.get_rest_apis()
-            self.apis = apis.get('items')
-            while apis.get('position') is not None:
-                apis = self.apiClient.get_rest_apis(position=apis.get('position'))
-                self.apis = self.apis + apis.get('items')
+            self.apis = Paginator.list(self.apiClient, 'get_rest_apis', 'items')
 
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
@@ -41,11 +39,7 @@ class Apigateway(Service):
         apis = []
 
         try:
-            apis = self.apiv2Client.get_apis()
-            self.apisv2 = apis.get('Items')
-            while apis.get('position') is not None:
-                apis = self.apiv2Client.get_apis(position=apis.get('position'))
-                self.apisv2 = self.apisv2 + apis.get('Items')
+            self.apisv2 = Paginator.list(self.apiv2Client, 'get_apis', 'Items')
 
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
@@ -59,6 +53,7 @@ class Apigateway(Service):
                 _pi('APIGateway', objName)
                 obj = ApiGatewayCommon(api, self.apiv2Client)
                 obj.run(self.__class__)
+                obj.finalize()
                 objs[objName] = obj.getInfo()
                 del obj
 
@@ -68,6 +63,7 @@ class Apigateway(Service):
                 _pi('APIGateway', objName)
                 obj = ApiGatewayRest(api, self.apiClient)
                 obj.run(self.__class__)
+                obj.finalize()
                 objs[objName] = obj.getInfo()
                 del obj
         
@@ -2,6 +2,7 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.awsconfig.drivers.AwsconfigCommon import AwsconfigCommon
 
@@ -9,7 +10,7 @@ class Awsconfig(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.configClient = ssBoto.client('config', config=self.bConfig)
+        self.configClient = ClientFactory.getClient(ssBoto, 'config', config=self.bConfig)
         
     def getResources(self):
         arr = []
@@ -29,6 +30,7 @@ class Awsconfig(Service):
             # Create a placeholder for account-level checks
             obj = AwsconfigCommon({}, self.configClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs['Config::Account'] = obj.getInfo()
             del obj
         else:
@@ -36,6 +38,7 @@ class Awsconfig(Service):
                 print('... (Config) inspecting ' + recorder.get('name', 'Unknown'))
                 obj = AwsconfigCommon(recorder, self.configClient)
                 obj.run(self.__class__)
+                obj.finalize()
                 objs[f"Config::{recorder.get('name', 'Unknown')}"] = obj.getInfo()
                 del obj
         
@@ -1,5 +1,6 @@
 import botocore
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.bedrock.drivers.BedrockModel import BedrockModel
 from services.bedrock.drivers.BedrockKnowledgeBase import BedrockKnowledgeBase
@@ -9,7 +10,7 @@ class Bedrock(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.bedrockClient = ssBoto.client('bedrock', config=self.bConfig)
+        self.bedrockClient = ClientFactory.getClient(ssBoto, 'bedrock', config=self.bConfig)
         
     def getFoundationModels(self):
         models = []
@@ -32,7 +33,7 @@ class Bedrock(Service):
     def getKnowledgeBases(self):
         knowledge_bases = []
         try:
-            bedrock_agent_client = self.ssBoto.client('bedrock-agent', config=self.bConfig)
+            bedrock_agent_client = ClientFactory.getClient(self.ssBoto, 'bedrock-agent', config=self.bConfig)
             response = bedrock_agent_client.list_knowledge_bases()
             knowledge_bases = response.get('knowledgeBaseSummaries', [])
         except botocore.exceptions.ClientError as e:
@@ -50,6 +51,7 @@ class Bedrock(Service):
             
             obj = BedrockModel(model, self.bedrockClient, 'foundation')
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"FoundationModel::{model_id}"] = obj.getInfo()
             del obj
         
@@ -61,6 +63,7 @@ class Bedrock(Service):
             
             obj = BedrockModel(model, self.bedrockClient, 'custom')
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"CustomModel::{model_name}"] = obj.getInfo()
             del obj
         
@@ -72,6 +75,7 @@ class Bedrock(Service):
             
             obj = BedrockKnowledgeBase(kb, self.ssBoto)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"KnowledgeBase::{kb_id}"] = obj.getInfo()
             del obj
         
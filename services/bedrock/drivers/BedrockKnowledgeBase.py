@@ -1,12 +1,13 @@
 import botocore
 from services.Evaluator import Evaluator
+from utils.ClientFactory import ClientFactory
 
 class BedrockKnowledgeBase(Evaluator):
     def __init__(self, knowledge_base, boto_session):
         super().__init__()
         self.knowledge_base = knowledge_base
         self.kb_id = knowledge_base['knowledgeBaseId']
-        self.bedrock_agent_client = boto_session.client('bedrock-agent')
+        self.bedrock_agent_client = ClientFactory.getClient(boto_session, 'bedrock-agent')
         
         self.addII('KnowledgeBaseId', self.kb_id)
         self.addII('Name', knowledge_base.get('name', ''))
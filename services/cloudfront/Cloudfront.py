@@ -4,6 +4,8 @@ import json
 import time
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from utils.Tools import _pr
 from services.Service import Service
 from services.cloudfront.drivers.cloudfrontDist import cloudfrontDist
@@ -16,31 +18,20 @@ class Cloudfront(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.cloudfrontClient = ssBoto.client('cloudfront')
+        self.cloudfrontClient = ClientFactory.getClient(ssBoto, 'cloudfront')
         
     def getDistributions(self):
         
-        response = self.cloudfrontClient.list_distributions()
         arr = []
-        
-        while True:
-            if "DistributionList" in response and "Items" in response["DistributionList"]:
-                for dist in response["DistributionList"]["Items"]:
-                    toAppend = True
-                    if self.tags:
-                        myTags = self.cloudfrontClient.list_tags_for_resource(Resource=dist['ARN'])
-                        if self.resourceHasTags(myTags.get('Tags')['Items']) == False:
-                            toAppend = False
-                           
-                    if toAppend:    
-                        arr.append(dist["Id"])
-                        
-                if "NextMarker" not in response["DistributionList"]:
-                    break
-    
-                response = self.cloudfrontClient.list_distributions(Marker=response["DistributionList"]["NextMarker"])
-            else:
-                break
+        for dist in Paginator.paginate(self.cloudfrontClient, 'list_distributions', 'DistributionList.Items'):
+            toAppend = True
+            if self.tags:
+                myTags = self.cloudfrontClient.list_tags_for_resource(Resource=dist['ARN'])
+                if self.resourceHasTags(myTags.get('Tags')['Items']) == False:
+                    toAppend = False
+                   
+            if toAppend:    
+                arr.append(dist["Id"])
         
         return arr
         
@@ -53,6 +44,7 @@ class Cloudfront(Service):
             _pi('CloudFront::Distribution', dist)
             obj = cloudfrontDist(dist, self.cloudfrontClient)
             obj.run(self.__class__)
+            obj.finalize()
             
             objs['Cloudfront::' + dist] = obj.getInfo()
             del obj
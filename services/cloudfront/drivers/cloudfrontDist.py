@@ -2,6 +2,7 @@ import urllib.parse
 from datetime import date
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Evaluator import Evaluator
 
 class cloudfrontDist(Evaluator):
@@ -85,5 +86,5 @@ class cloudfrontDist(Evaluator):
     
 if __name__ == "__main__":
     ssBoto = Config.get('ssBoto')
-    c = ssBoto.client('cloudfront')
+    c = ClientFactory.getClient(ssBoto, 'cloudfront')
     o = cloudfrontDist('ok', c)
\ No newline at end of file
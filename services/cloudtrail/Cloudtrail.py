@@ -4,6 +4,9 @@ import json
 import time
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
+from utils.WorkUnitScheduler import WorkUnitScheduler
 from botocore.config import Config as bConfig
 from services.Service import Service
 from services.cloudtrail.drivers.CloudtrailCommon import CloudtrailCommon
@@ -16,22 +19,12 @@ class Cloudtrail(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.ctClient = ssBoto.client('cloudtrail', config=self.bConfig)
-        self.snsClient = ssBoto.client('sns', config=self.bConfig)
-        self.s3Client = ssBoto.client('s3')
+        self.ctClient = ClientFactory.getClient(ssBoto, 'cloudtrail', config=self.bConfig)
+        self.snsClient = ClientFactory.getClient(ssBoto, 'sns', config=self.bConfig)
+        self.s3Client = ClientFactory.getClient(ssBoto, 's3')
         
     def getTrails(self):
-        results = []
-        ctClient = self.ctClient
-        resp = ctClient.list_trails()
-        results += resp.get('Trails')
-        
-        while True:
-            if resp.get('NextToken') == None:
-                break
-            
-            resp = ctClient.list_trails(NextToken = resp.get('NextToken'))
-            results += resp.get('Trails')
+        results = Paginator.list(self.ctClient, 'list_trails', 'Trails')
         
         
         if not self.tags:
@@ -43,7 +36,7 @@ class Cloudtrail(Service):
             
             ## despite cloudtrail seems like a "global api", for list_tags, need to call based on region tho.
             ## need to create separate boto instance for that region
-            myTmpCtClient = self.ssBoto.client('cloudtrail', config=bConfig(region_name=ctInfo[3]))
+            myTmpCtClient = ClientFactory.getClient(self.ssBoto, 'cloudtrail', config=bConfig(region_name=ctInfo[3]))
             tags = myTmpCtClient.list_tags(ResourceIdList=[detail['TrailARN']])
             
             if self.resourceHasTags(tags.get('ResourceTagList')[0]['TagsList']):
@@ -63,23 +56,20 @@ class Cloudtrail(Service):
         objs = {}
         trails = self.getTrails()
         
-        ctRanList = Config.get('CloudTrail_ranList', [])
-        
+        ## regions are scanned by different workers, claim the trail across processes
         for trail in trails:
-            if trail['TrailARN'] in ctRanList:
+            if not WorkUnitScheduler.claimOnce('CloudTrail::' + trail['TrailARN']):
                 print('[Cloudtrail::SKIPPED] {} executed in other regions'.format(trail['Name']))
                 continue
             
             _pi('Cloudtrail', trail['Name'])
-            ctRanList.append(trail['TrailARN'])
             
             obj = CloudtrailCommon(trail, self.ctClient, self.snsClient, self.s3Client)
             obj.run(self.__class__)
+            obj.finalize()
             objs['Cloudtrail::' + trail['Name']] = obj.getInfo()
             del obj
         
-        Config.set('CloudTrail_ranList', ctRanList)
-        
         _pi('CloudTrail:Common')
         obj = CloudtrailAccount(self.ctClient, len(trails))
         objs['Cloudtrail::General'] = obj.getInfo()
@@ -3,6 +3,8 @@ import botocore
 import requests
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from services.Service import Service
 
 ###### TO DO #####
@@ -10,6 +12,7 @@ from services.Service import Service
 ## Example
 from services.cloudwatch.drivers.CloudwatchCommon import CloudwatchCommon
 from services.cloudwatch.drivers.CloudwatchTrails import CloudwatchTrails
+from services.cloudwatch.CloudwatchMetricFilters import CloudwatchMetricFilters
 
 from utils.Tools import _pi
 
@@ -22,25 +25,18 @@ class Cloudwatch(Service):
         super().__init__(region)
         ssBoto = self.ssBoto
         
-        self.cwClient = ssBoto.client('cloudwatch', config=self.bConfig)
-        self.cwLogClient = ssBoto.client('logs', config=self.bConfig)
-        self.ctClient = ssBoto.client('cloudtrail', config=self.bConfig)
+        self.cwClient = ClientFactory.getClient(ssBoto, 'cloudwatch', config=self.bConfig)
+        self.cwLogClient = ClientFactory.getClient(ssBoto, 'logs', config=self.bConfig)
+        self.ctClient = ClientFactory.getClient(ssBoto, 'cloudtrail', config=self.bConfig)
         
         self.ctLogs = []
-        self.logGroups = []
         
         return
     
     ## method to get resources for the services
     ## return the array of the resources
-    def loopTrail(self, NextToken=None):
-        args = {}
-        if NextToken:
-            args['NextToken'] = NextToken
-        
-        resp = self.ctClient.list_trails(**args)
-        trails = resp.get('Trails')
-        for trail in trails:
+    def loopTrail(self):
+        for trail in Paginator.paginate(self.ctClient, 'list_trails', 'Trails'):
             if trail['HomeRegion'] == self.region:
                 info = self.ctClient.describe_trails(trailNameList=[trail['TrailARN']])
                 tl = info.get('trailList')[0]
@@ -49,47 +45,39 @@ class Cloudwatch(Service):
                     self.ctLogs.append([trail['TrailARN'], tl['CloudWatchLogsLogGroupArn'], logGroupName])
                 else:
                     self.ctLogs.append([trail['TrailARN'], None, None])
-           
-        if resp.get('NextToken'):
-            self.loopTrail(resp.get('NextToken'))
     
-    def getAllLogs(self, nextToken=None):
-        args = {}
-        if nextToken:
-            args['nextToken'] = nextToken
-        
-        resp = self.cwLogClient.describe_log_groups(**args)
-        logGroups = resp.get('logGroups')
-        for lg in logGroups:
-            self.logGroups.append({
+    def getAllLogs(self, logGroups):
+        for lg in Paginator.paginate(self.cwLogClient, 'describe_log_groups', 'logGroups', pageSize=50):
+            logGroups.addRow({
                 'logGroupName': lg['logGroupName'],
-                'storedBytes': lg['storedBytes'],
-                'retentionInDays': lg['retentionInDays'] if 'retentionInDays' in lg else -1,
-                'dataProtectionStatus': lg['dataProtectionStatus'] if 'dataProtectionStatus' in lg else ''
+                'storedBytes': lg.get('storedBytes', 0),
+                'retentionInDays': lg.get('retentionInDays', -1),
+                'dataProtectionStatus': lg.get('dataProtectionStatus', '')
             })
-        
-        if resp.get('nextToken'):
-            self.getAllLogs(resp.get('nextToken'))
     
     def advise(self):
         objs = {}
         
         self.loopTrail()
+        ## metric filters of every trail log group, listed concurrently and once per log group
+        metricFilters = CloudwatchMetricFilters.load(self.cwLogClient, [log[2] for log in self.ctLogs if log[2] is not None])
         for log in self.ctLogs:
             _pi("CloudTrail's CloudWatch Logs", log[0])
-            obj = CloudwatchTrails(log, log[2], self.cwLogClient)
+            obj = CloudwatchTrails(log, log[2], self.cwLogClient, metricFilters.get(log[2]))
             obj.run(self.__class__)
+            obj.finalize()
             
             objs[f"ctLog::{log[0]}"] = obj.getInfo()
             del obj
         
-        self.getAllLogs()
-        for log in self.logGroups:
-            _pi('Cloudwatch Logs', log['logGroupName'])
-            obj = CloudwatchCommon(log, self.cwLogClient)
-            obj.run(self.__class__)
-            
-            objs[f"Log::{log['logGroupName']}"] = obj.getInfo()
-            del obj
+        ## log groups are evaluated in bulk, only the ones with findings are returned
+        logGroups = CloudwatchCommon(self.cwLogClient)
+        self.getAllLogs(logGroups)
+        _pi('Cloudwatch Logs', "{} log groups".format(logGroups.getRowCount()))
+        logGroups.run(self.__class__)
+        logGroups.finalize()
+        
+        objs.update(logGroups.getInfo())
+        del logGroups
             
         return objs
\ No newline at end of file
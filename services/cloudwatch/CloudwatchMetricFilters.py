@@ -0,0 +1,100 @@
+import re
+import botocore
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.Paginator import Paginator
+
+## Matches metric filter patterns against the CIS rule sets of CloudwatchTrails
+## Each rule ["$.eventName", "=", "ConsoleLogin"] becomes a (selector, operator, value) token and a
+## check is a set of tokens, compiled once per process. A filter pattern is parsed once into its
+## token set, a check is covered when one filter of the log group holds all of its tokens
+class CloudwatchCisMatcher():
+    ## $.selector = "value" | 'value' | value, comparisons inside { ... } joined by && / ||
+    TOKEN_REGEX = re.compile(r"""(\$\.[\w.\[\]*-]+)\s*(!=|=)\s*(?:"([^"]*)"|'([^']*)'|([^\s()&|}]+))""")
+
+    def __init__(self, checksMap):
+        '''
+        checksMap: [{check: [[selector, operator, value], ...]}, ...]
+        '''
+        self.checks = []
+        self.ruleSets = {}
+        ## token: [checks using it]
+        self.index = {}
+
+        for lists in checksMap:
+            for check, rules in lists.items():
+                ruleSet = frozenset(self.normalize(*rule) for rule in rules)
+                self.checks.append(check)
+                self.ruleSets[check] = ruleSet
+                for token in ruleSet:
+                    self.index.setdefault(token, []).append(check)
+
+    @staticmethod
+    def normalize(selector, operator, value):
+        ## rule values were written as regex, e.g. "\*UnauthorizedOperation"
+        return (selector, operator, value.replace('\\', '').strip())
+
+    @staticmethod
+    def tokenize(filterPattern):
+        tokens = set()
+        for selector, operator, dquoted, squoted, bare in CloudwatchCisMatcher.TOKEN_REGEX.findall(filterPattern):
+            value = dquoted or squoted or bare
+            tokens.add(CloudwatchCisMatcher.normalize(selector, operator, value))
+        return tokens
+
+    def getMissing(self, filterPatterns):
+        '''
+        return the checks not covered by any of the filter patterns, in map order
+        '''
+        covered = set()
+        for filterPattern in filterPatterns:
+            counts = {}
+            for token in self.tokenize(filterPattern):
+                for check in self.index.get(token, []):
+                    counts[check] = counts.get(check, 0) + 1
+
+            for check, cnt in counts.items():
+                if cnt == len(self.ruleSets[check]):
+                    covered.add(check)
+
+            if len(covered) == len(self.checks):
+                break
+
+        return [check for check in self.checks if check not in covered]
+
+## Metric filter patterns of a log group, errors are raised on access so the
+## CloudwatchTrails check reports them as when it called the API itself
+class CloudwatchMetricFilters():
+    MAX_WORKERS = 8
+
+    def __init__(self, logGroupName):
+        self.logGroupName = logGroupName
+        self.patterns = []
+        self.error = None
+
+    @staticmethod
+    def load(logClient, logGroupNames):
+        '''
+        return {logGroupName: CloudwatchMetricFilters}, each distinct log group is listed once
+        '''
+        filters = {logGroupName: CloudwatchMetricFilters(logGroupName) for logGroupName in set(logGroupNames)}
+        if not filters:
+            return filters
+
+        with ThreadPoolExecutor(max_workers=CloudwatchMetricFilters.MAX_WORKERS) as executor:
+            list(executor.map(lambda obj: obj.fetch(logClient), filters.values()))
+
+        return filters
+
+    def fetch(self, logClient):
+        try:
+            for metricFilter in Paginator.paginate(logClient, 'describe_metric_filters', 'metricFilters', logGroupName=self.logGroupName):
+                self.patterns.append(metricFilter.get('filterPattern', ''))
+        except botocore.exceptions.ClientError as e:
+            self.error = e
+        return self
+
+    def get(self):
+        if self.error is not None:
+            raise self.error
+        return self.patterns
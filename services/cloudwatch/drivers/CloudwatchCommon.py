@@ -2,7 +2,7 @@ import boto3
 import botocore
 import constants as _C
 
-from services.Evaluator import Evaluator
+from services.BulkEvaluator import BulkEvaluator
 
 ###### TO DO #####
 ## Import modules that needed for this driver
@@ -12,27 +12,32 @@ from services.Evaluator import Evaluator
 ###### TO DO #####
 ## Replace ServiceDriver with
 
-class CloudwatchCommon(Evaluator):
+## All log groups of the region as columns, checks compare whole columns
+class CloudwatchCommon(BulkEvaluator):
+    COLUMNS = {
+        'logGroupName': None,
+        'storedBytes': 'q',
+        'retentionInDays': 'l',
+        'dataProtectionStatus': None
+    }
+    NAME_COLUMN = 'logGroupName'
     
-    ###### TO DO #####
-    ## Replace resource variable to meaningful name
-    ## Modify based on your need
-    def __init__(self, log, logClient):
-        super().__init__()
-        self.init()
+    def __init__(self, logClient):
+        super().__init__('Log::')
         
-        self.log = log
         self.logClient = logClient
 
-        self._resourceName = log['logGroupName']
-
         return
     
     ###### TO DO #####
     ## Change the method name to meaningful name
     ## Check methods name must follow _check[Description]
     def _checkRetention(self):
-        if self.log['retentionInDays'] == -1:
-            self.results['SetRetentionDays'] = [-1, "{} MB".format(self.log['storedBytes']/1024/1024)]
-        elif self.log['retentionInDays'] <= 365:
-            self.results['CISRetentionAtLeast1Yr'] = [-1, self.log['retentionInDays']]
\ No newline at end of file
+        retentions = self.getColumn('retentionInDays')
+        storedBytes = self.getColumn('storedBytes')
+        
+        rows = [i for i, days in enumerate(retentions) if days == -1]
+        self.addFindings('SetRetentionDays', rows, ["{} MB".format(storedBytes[i]/1024/1024) for i in rows])
+        
+        rows = [i for i, days in enumerate(retentions) if days != -1 and days <= 365]
+        self.addFindings('CISRetentionAtLeast1Yr', rows, [retentions[i] for i in rows])
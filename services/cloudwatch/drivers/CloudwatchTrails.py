@@ -3,8 +3,7 @@ import botocore
 import constants as _C
 
 from services.Evaluator import Evaluator
-from utils.Config import Config
-import re
+from services.cloudwatch.CloudwatchMetricFilters import CloudwatchCisMatcher, CloudwatchMetricFilters
 
 ###### TO DO #####
 ## Import modules that needed for this driver
@@ -16,8 +15,8 @@ import re
 
 class CloudwatchTrails(Evaluator):
     ## WOMA = without metrics & alarm
-    ## "$.userIdentity.type", "=", "Root" 
-    ## ==> \$.userIdentity.type\s*=\s*[\'\"]*Root[\'\"']*
+    ## "$.userIdentity.type", "=", "Root"
+    ## ==> token ("$.userIdentity.type", "=", "Root"), matched against the tokens of each filter pattern
     CISMetricsMap = [
         {'trailWOMAroot1': [ 
                 ["$.userIdentity.type", "=", "Root"]
@@ -149,73 +148,33 @@ class CloudwatchTrails(Evaluator):
         }
     ]
     
-    CISMetricsMapRegex = {}
-    logMetricsFilterPattern = []
+    ## compiled from CISMetricsMap once per process
+    matcher = None
     
-    def __init__(self, log, logname, logClient):
+    def __init__(self, log, logname, logClient, metricFilters=None):
         super().__init__()
         self.init()
         
         self.logClient = logClient
         self.log = log
         self.logname = logname
+        ## CloudwatchMetricFilters of the trail log group, prefetched by Cloudwatch.advise
+        self.metricFilters = metricFilters
 
         self._resourceName = logname
         
         self.metricsInfo = []
         
-        self.CISMetricsMapRegex = Config.get('Logs::CISMetricsMapRegex', {})
-        if len(self.CISMetricsMapRegex) == 0:
-            for lists in self.CISMetricsMap:
-                for check, rules in lists.items():
-                    self.CISMetricsMapRegex[check] = self.regexBuilder(rules)
-            
-            Config.set('Logs::CISMetricsMapRegex', self.CISMetricsMapRegex)
+        if CloudwatchTrails.matcher is None:
+            CloudwatchTrails.matcher = CloudwatchCisMatcher(self.CISMetricsMap)
     
         return
     
-    def regexBuilder(self, rules):
-        regexPatterns = []
-        for rule in rules:
-            regexPattern = r"\\" + rule[0] + r"\s*\\" + rule[1] + r"\s*[\'\"]*" + rule[2] + r"[\'\"]*"
-            regexPatterns.append(regexPattern)
+    def getFilterPatterns(self):
+        if self.metricFilters is None:
+            self.metricFilters = CloudwatchMetricFilters(self.log[2]).fetch(self.logClient)
         
-        return regexPatterns
-    
-    # Loop available cloudwatch log metrics in logGroup
-    def getAllMetrics(self, nextToken=None):
-        args = {"logGroupName": self.log[2]}
-        if nextToken:
-            args['nextToken'] = nextToken
-
-        resp = self.logClient.describe_metric_filters(**args)
-        metricFilters = resp.get('metricFilters')
-        for filters in metricFilters:
-            self.logMetricsFilterPattern.append(filters['filterPattern'])
-        
-        if resp.get('nextToken'):
-            self.getAllMetrics(resp.get('nextToken'))
-    
-    # write a function to loop through all regex pattern in self.CISMetricsMapRegex, and regex checks again array of string in self.logMetricsFilterPattern
-    def regexFindCISPatterns(self):
-        for check, rules in self.CISMetricsMapRegex.items():
-            self.results[check] = [-1, None]
-            for pattern in self.logMetricsFilterPattern:
-                # print("-=-=-=-=- " + check + "=-=-=-=-=-=-")
-                cnt = 0
-                for rule in rules:
-                    # print('**REGEX**::', rule, pattern)
-                    # print(re.search(rule, pattern))
-                    if re.search(rule, pattern):
-                        cnt = cnt + 1
-                        # self.results[check] = [-1, None]
-                        # break
-                
-                if len(rules) == cnt:
-                    del self.results[check] 
-                    break
-
-        return
+        return self.metricFilters.get()
     
     ###### TO DO #####
     ## Change the method name to meaningful name
@@ -225,16 +184,12 @@ class CloudwatchTrails(Evaluator):
             self.results['trailWithoutCWLogs'] = [-1, None]
             return
         
-        args = {"logGroupNamePrefix": self.log[2]}
-        
-        resp = self.logClient.describe_log_groups(**args)
-        logDetail = resp.get('logGroups')[0]
-        
-        if logDetail['metricFilterCount'] == 0:
+        filterPatterns = self.getFilterPatterns()
+        if len(filterPatterns) == 0:
             self.results['trailWithCWLogsWithoutMetrics'] = [-1, None]
             return
         
-        self.getAllMetrics()
-        self.regexFindCISPatterns()
+        for check in self.matcher.getMissing(filterPatterns):
+            self.results[check] = [-1, None]
 
-        return
\ No newline at end of file
+        return
@@ -2,6 +2,7 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.devopsguru.drivers.DevopsguruCommon import DevopsguruCommon
 
@@ -9,7 +10,7 @@ class Devopsguru(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.devopsguruClient = ssBoto.client('devops-guru', config=self.bConfig)
+        self.devopsguruClient = ClientFactory.getClient(ssBoto, 'devops-guru', config=self.bConfig)
         
     def getResources(self):
         arr = []
@@ -27,6 +28,7 @@ class Devopsguru(Service):
         # DevOps Guru is account-level service
         obj = DevopsguruCommon({}, self.devopsguruClient)
         obj.run(self.__class__)
+        obj.finalize()
         objs['DevOpsGuru::Account'] = obj.getInfo()
         del obj
         
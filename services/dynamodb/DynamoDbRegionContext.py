@@ -0,0 +1,111 @@
+import botocore
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.Paginator import Paginator
+
+## Per table data read by the DynamoDbCommon checks, errors are raised on access
+## so the check prints them the same way as when it called the API itself. BotoCoreError is kept
+## too, e.g. EndpointConnectionError of AWS Backup in a region it is not available in
+class DynamoDbTableView():
+    def __init__(self, tableName):
+        self.tableName = tableName
+        self.data = {}
+        self.errors = {}
+
+    def set(self, name, value):
+        self.data[name] = value
+
+    def setError(self, name, error):
+        self.errors[name] = error
+
+    def get(self, name):
+        if name in self.errors:
+            raise self.errors[name]
+        return self.data.get(name)
+
+## Everything the DynamoDB checks need for a region, loaded ahead of the table drivers
+## describe_table, TTL, continuous backups, tags and recovery points run concurrently per table,
+## service quotas and application-autoscaling policies of the dynamodb namespace are
+## listed once and grouped by table
+class DynamoDbRegionContext():
+    MAX_WORKERS = 8
+
+    ## per table calls made once the table is described
+    TABLE_CALLS = ['ttl', 'continuousBackups', 'tags', 'recoveryPoints']
+
+    def __init__(self, dynamoDbClient, serviceQuotaClient, appScalingPolicyClient, backupClient):
+        self.dynamoDbClient = dynamoDbClient
+        self.serviceQuotaClient = serviceQuotaClient
+        self.appScalingPolicyClient = appScalingPolicyClient
+        self.backupClient = backupClient
+
+        self.tableNames = []
+        self.views = {}
+        self.quotas = None
+        self.quotaError = None
+        self.scalingPolicies = {}
+
+    def load(self, tableNames):
+        self.tableNames = list(tableNames)
+        self.views = {tableName: DynamoDbTableView(tableName) for tableName in self.tableNames}
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            ## describe first, the other per table calls need the TableArn
+            list(executor.map(lambda tableName: self.fetch(tableName, 'table'), self.tableNames))
+
+            tasks = [(tableName, name) for tableName in self.tableNames if self.views[tableName].data.get('table') for name in self.TABLE_CALLS]
+            bulk = [executor.submit(self.loadQuotas), executor.submit(self.loadScaling)]
+            list(executor.map(lambda task: self.fetch(*task), tasks))
+            for future in bulk:
+                future.result()
+
+        return self
+
+    def loadQuotas(self):
+        try:
+            self.quotas = Paginator.list(self.serviceQuotaClient, 'list_service_quotas', 'Quotas', ServiceCode='dynamodb')
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            self.quotaError = e
+
+    def loadScaling(self):
+        try:
+            for policy in Paginator.paginate(self.appScalingPolicyClient, 'describe_scaling_policies', 'ScalingPolicies', ServiceNamespace='dynamodb'):
+                self.scalingPolicies.setdefault(policy['ResourceId'], []).append(policy)
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            for view in self.views.values():
+                view.setError('scalingPolicies', e)
+
+    def fetch(self, tableName, name):
+        view = self.views[tableName]
+        try:
+            if name == 'table':
+                view.set('table', self.dynamoDbClient.describe_table(TableName=tableName))
+            elif name == 'ttl':
+                view.set('ttl', self.dynamoDbClient.describe_time_to_live(TableName=tableName))
+            elif name == 'continuousBackups':
+                view.set('continuousBackups', self.dynamoDbClient.describe_continuous_backups(TableName=tableName))
+            elif name == 'tags':
+                view.set('tags', self.dynamoDbClient.list_tags_of_resource(ResourceArn=view.data['table']['Table']['TableArn']).get('Tags'))
+            elif name == 'recoveryPoints':
+                ## only whether any recovery point exists is checked
+                resp = self.backupClient.list_recovery_points_by_resource(ResourceArn=view.data['table']['Table']['TableArn'], MaxResults=1)
+                view.set('recoveryPoints', resp['RecoveryPoints'])
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            view.setError(name, e)
+
+    def getTables(self):
+        '''
+        describe_table results of the tables which could be described, same order as listed
+        '''
+        return [self.views[tableName].data['table'] for tableName in self.tableNames if self.views[tableName].data.get('table')]
+
+    def getView(self, tableName):
+        view = self.views[tableName]
+        if 'scalingPolicies' not in view.errors:
+            view.set('scalingPolicies', self.scalingPolicies.get('table/' + tableName, []))
+        return view
+
+    def getQuotas(self):
+        if self.quotaError is not None:
+            raise self.quotaError
+        return self.quotas
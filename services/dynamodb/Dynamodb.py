@@ -5,6 +5,9 @@ import math
 
 from services.Service import Service
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
+from services.dynamodb.DynamoDbRegionContext import DynamoDbRegionContext
 from services.dynamodb.drivers.DynamoDbCommon import DynamoDbCommon
 from services.dynamodb.drivers.DynamoDbGeneric import DynamoDbGeneric
 
@@ -17,39 +20,30 @@ class Dynamodb(Service):
         super().__init__(region)
         ssBoto = self.ssBoto
         
-        self.dynamoDbClient = ssBoto.client('dynamodb', config=self.bConfig)
-        self.cloudWatchClient = ssBoto.client('cloudwatch', config=self.bConfig)
-        self.serviceQuotaClient = ssBoto.client('service-quotas', config=self.bConfig)
-        self.appScalingPolicyClient = ssBoto.client('application-autoscaling', config=self.bConfig)
-        self.backupClient = ssBoto.client('backup', config=self.bConfig)
-        self.cloudTrailClient = ssBoto.client('cloudtrail', config=self.bConfig)
+        self.dynamoDbClient = ClientFactory.getClient(ssBoto, 'dynamodb', config=self.bConfig)
+        self.cloudWatchClient = ClientFactory.getClient(ssBoto, 'cloudwatch', config=self.bConfig)
+        self.serviceQuotaClient = ClientFactory.getClient(ssBoto, 'service-quotas', config=self.bConfig)
+        self.appScalingPolicyClient = ClientFactory.getClient(ssBoto, 'application-autoscaling', config=self.bConfig)
+        self.backupClient = ClientFactory.getClient(ssBoto, 'backup', config=self.bConfig)
+        self.cloudTrailClient = ClientFactory.getClient(ssBoto, 'cloudtrail', config=self.bConfig)
+        self.context = None
     
     
     def list_tables(self):
-        tableArr = []
         try:
-            tableNames = self.dynamoDbClient.list_tables()
+            tableNames = Paginator.list(self.dynamoDbClient, 'list_tables', 'TableNames', pageSize=100)
             
-            #append table name to array
-            for tables in tableNames['TableNames']:
-                tableDescription = self.dynamoDbClient.describe_table(TableName = tables)
-                tableArr.append(tableDescription)
-            
-            #loop thru next page of results    
-            while 'LastEvaluatedTableName' in tableNames:
-                tableNames = self.dynamoDbClient.list_tables(ExclusiveStartTableName = tableNames['LastEvaluatedTableName'],Limit = 100)
-                for tables in tableNames['TableNames']:
-                    tableDescription = self.dynamoDbClient.describe_table(TableName = tables)
-                    tableArr.append(tableDescription)
+            #Describe tables, TTL, backups, quotas and autoscaling of the region concurrently
+            self.context = DynamoDbRegionContext(self.dynamoDbClient, self.serviceQuotaClient, self.appScalingPolicyClient, self.backupClient).load(tableNames)
+            tableArr = self.context.getTables()
             
             if not self.tags:
                 return tableArr 
                 
             finalArr = []
             for i, detail in enumerate(tableArr):
-                tableArn = detail['Table']['TableArn']
-                tags = self.dynamoDbClient.list_tags_of_resource(ResourceArn=tableArn)
-                if self.resourceHasTags(tags.get('Tags')):
+                tags = self.context.getView(detail['Table']['TableName']).get('tags')
+                if self.resourceHasTags(tags):
                     finalArr.append(tableArr[i])
                 
             return finalArr
@@ -69,19 +63,23 @@ class Dynamodb(Service):
         try:
             #Run generic checks
             _pi('Dynamodb::Generic')
-            obj = DynamoDbGeneric(listOfTables, self.dynamoDbClient, self.cloudWatchClient, self.serviceQuotaClient, self.appScalingPolicyClient, self.backupClient, self.cloudTrailClient)
+            obj = DynamoDbGeneric(listOfTables, self.dynamoDbClient, self.cloudWatchClient, self.serviceQuotaClient, self.appScalingPolicyClient, self.backupClient, self.cloudTrailClient, self.context)
             obj.run(self.__class__)
+            obj.finalize()
             objs['DynamoDb::Generic'] = obj.getInfo()
             del obj
         
-            #Run table specific checks
+            #Prefetch CloudWatch metrics of all tables in GetMetricData batches
             for eachTable in listOfTables:
+                DynamoDbCommon.registerMetrics(self.cloudWatchClient, eachTable)
+            
+            #Run table specific checks
+            def build(eachTable):
                 objName = 'Dynamodb::' + eachTable['Table']['TableName']
                 _pi('Dynamodb::Table', objName)
-                obj = DynamoDbCommon(eachTable, self.dynamoDbClient, self.cloudWatchClient, self.serviceQuotaClient, self.appScalingPolicyClient, self.backupClient, self.cloudTrailClient)
-                obj.run(self.__class__)
-                objs[objName] = obj.getInfo()
-                del obj
+                return objName, DynamoDbCommon(eachTable, self.dynamoDbClient, self.cloudWatchClient, self.serviceQuotaClient, self.appScalingPolicyClient, self.backupClient, self.cloudTrailClient, self.context)
+            
+            objs.update(self.runDrivers(listOfTables, build))
             
             #Return objs
             return objs
@@ -8,11 +8,24 @@ from services.Service import Service
 from utils.Config import Config
 from utils.Policy import Policy
 from services.Evaluator import Evaluator
+from utils.MetricStore import MetricStore
+from services.dynamodb.DynamoDbRegionContext import DynamoDbRegionContext
 
 
 class DynamoDbCommon(Evaluator):
+    ## (metricName, days, period, statistic, withGsi) read by the _check methods
+    METRIC_QUERIES = [
+        ('ConsumedReadCapacityUnits', 30, 86400, 'Sum', True),
+        ('ConsumedWriteCapacityUnits', 30, 86400, 'Sum', True),
+        ('ConsumedReadCapacityUnits', 7, 3600, 'Average', False),
+        ('ConsumedWriteCapacityUnits', 7, 3600, 'Average', False),
+        ('ConditionalCheckFailedRequests', 7, 900, 'SampleCount', False),
+        ('SystemErrors', 30, 3600, 'SampleCount', False),
+        ('ThrottledRequests', 30, 3600, 'SampleCount', False)
+    ]
 
-    def __init__(self, tables, dynamoDbClient, cloudWatchClient, serviceQuotaClient, appScalingPolicyClient, backupClient, cloudTrailClient):
+    ## view: DynamoDbTableView from DynamoDbRegionContext, loaded for this table alone when not given
+    def __init__(self, tables, dynamoDbClient, cloudWatchClient, serviceQuotaClient, appScalingPolicyClient, backupClient, cloudTrailClient, context=None):
         super().__init__()
         self.tables = tables
         self.tablename = self.tables['Table']['TableName']
@@ -23,8 +36,50 @@ class DynamoDbCommon(Evaluator):
         self.backupClient = backupClient
         self.cloudTrailClient = cloudTrailClient
 
+        if context is None:
+            context = DynamoDbRegionContext(dynamoDbClient, serviceQuotaClient, appScalingPolicyClient, backupClient).load([self.tablename])
+        self.context = context
+        self.view = context.getView(self.tablename)
+
         self._resourceName = self.tablename
 
+    @staticmethod
+    def getMetricParams(table, metricName, days, period, statistic, withGsi=False):
+        dimensions = [
+            {
+                'Name':'TableName',
+                'Value':table['Table']['TableName']
+            }
+        ]
+        if withGsi:
+            dimensions.append({
+                'Name':'GlobalSecondaryIndexName',
+                'Value':table['Table']['GlobalSecondaryIndexes'][0]['IndexName']
+            })
+
+        return {
+            'Namespace': 'AWS/DynamoDB',
+            'MetricName': metricName,
+            'Dimensions': dimensions,
+            'StartTime': datetime.datetime.now() - datetime.timedelta(days),
+            'EndTime': datetime.datetime.now(),
+            'Period': period,
+            'Statistics': [statistic],
+            'Unit': 'Count'
+        }
+
+    ## Queue METRIC_QUERIES of the table into the region MetricStore, fetched in GetMetricData batches
+    @staticmethod
+    def registerMetrics(cloudWatchClient, table):
+        for metricName, days, period, statistic, withGsi in DynamoDbCommon.METRIC_QUERIES:
+            if withGsi and not 'GlobalSecondaryIndexes' in table['Table']:
+                continue
+            MetricStore.register(cloudWatchClient, **DynamoDbCommon.getMetricParams(table, metricName, days, period, statistic, withGsi))
+
+    def getMetricStatistics(self, metricName, days, period, statistic, withGsi=False):
+        params = DynamoDbCommon.getMetricParams(self.tables, metricName, days, period, statistic, withGsi)
+        return MetricStore.getMetricStatistics(self.cloudWatchClient, **params)
+
     # logic to check delete protection    
     def _check_delete_protection(self):
         #print('Checking ' + self.tables['Table']['TableName'] + ' delete protection started')
@@ -42,9 +97,9 @@ class DynamoDbCommon(Evaluator):
         #print('Checking ' + self.tables['Table']['TableName'] + ' for resource tag started')
         try:
             #retrieve tags for specific table by tableARN
-            result = self.dynamoDbClient.list_tags_of_resource(ResourceArn = self.tables['Table']['TableArn'])
+            tags = self.view.get('tags')
             #check tags
-            if not result['Tags']:
+            if not tags:
                 self.results['resourcesWithoutTags'] = [-1, '']
         except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
@@ -58,27 +113,7 @@ class DynamoDbCommon(Evaluator):
         
         try:
             #Count the number active reads on the table on the GSIs
-            result = self.cloudWatchClient.get_metric_statistics(
-                Namespace = 'AWS/DynamoDB',
-                MetricName = 'ConsumedReadCapacityUnits',
-                Dimensions = [
-                       {
-                            'Name':'TableName',
-                            'Value':self.tables['Table']['TableName']
-                        },
-                        {
-                            'Name':'GlobalSecondaryIndexName',
-                            'Value':self.tables['Table']['GlobalSecondaryIndexes'][0]['IndexName']
-                        },
-                    ],
-                StartTime = datetime.datetime.now() - datetime.timedelta(30),
-                EndTime = datetime.datetime.now(),
-                Period = 86400,
-                Statistics = [
-                    'Sum',
-                ],
-                Unit = 'Count'
-            )
+            result = self.getMetricStatistics('ConsumedReadCapacityUnits', 30, 86400, 'Sum', withGsi=True)
             
             #Calculate sum of all occurances within the 30 days period
             sumTotal = 0.0    
@@ -102,27 +137,7 @@ class DynamoDbCommon(Evaluator):
         try:
             
             #Count the number active reads on the table on the GSIs
-            result = self.cloudWatchClient.get_metric_statistics(
-                Namespace = 'AWS/DynamoDB',
-                MetricName = 'ConsumedWriteCapacityUnits',
-                Dimensions = [
-                       {
-                           'Name':'TableName',
-                           'Value':self.tables['Table']['TableName']
-                       },
-                       {
-                            'Name':'GlobalSecondaryIndexName',
-                            'Value':self.tables['Table']['GlobalSecondaryIndexes'][0]['IndexName']
-                       },
-                    ],
-                StartTime = datetime.datetime.now() - datetime.timedelta(30),
-                EndTime = datetime.datetime.now(),
-                Period = 86400,
-                Statistics = [
-                    'Sum',
-                ],
-                Unit = 'Count'
-            )
+            result = self.getMetricStatistics('ConsumedWriteCapacityUnits', 30, 86400, 'Sum', withGsi=True)
             
             #Calculate sum of all occurances within the 30 days period
             sumTotal = 0.0    
@@ -156,7 +171,7 @@ class DynamoDbCommon(Evaluator):
     # logic to check for TTL status
     def _check_time_to_live_status(self):
         try:
-            result = self.dynamoDbClient.describe_time_to_live(TableName = self.tables['Table']['TableName'])
+            result = self.view.get('ttl')
         
             #Check result for TimeToLiveStatus (ENABLED/DISABLED)
             if result['TimeToLiveDescription']['TimeToLiveStatus'] == 'DISABLED':
@@ -170,7 +185,7 @@ class DynamoDbCommon(Evaluator):
     # logic to check Point In Time Recovery backup
     def _check_pitr_backup(self):
         try:
-            result = self.dynamoDbClient.describe_continuous_backups(TableName = self.tables['Table']['TableName'])
+            result = self.view.get('continuousBackups')
             #Check results of ContinuousBackupStatus (ENABLED/DISABLED)
             if result['ContinuousBackupsDescription']['PointInTimeRecoveryDescription']['PointInTimeRecoveryStatus'] == 'DISABLED':                    
                 self.results['disabledPointInTimeRecovery'] = [-1, '']
@@ -183,23 +198,7 @@ class DynamoDbCommon(Evaluator):
     def _check_capacity_mode(self):
         try:
             #Count the number active reads on the table on the GSIs
-            result = self.cloudWatchClient.get_metric_statistics(
-                Namespace = 'AWS/DynamoDB',
-                MetricName = 'ConsumedWriteCapacityUnits',
-                Dimensions = [
-                       {
-                            'Name':'TableName',
-                            'Value':self.tables['Table']['TableName']
-                        },
-                    ],
-                StartTime = datetime.datetime.now() - datetime.timedelta(7),
-                EndTime = datetime.datetime.now(),
-                Period = 3600,
-                Statistics = [
-                    'Average'
-                ], 
-                Unit = 'Count'
-            )
+            result = self.getMetricStatistics('ConsumedWriteCapacityUnits', 7, 3600, 'Average')
         
             #Calculate % of write capacity in the given hour
             _percentageWrite = 0  
@@ -230,28 +229,25 @@ class DynamoDbCommon(Evaluator):
         try:
 
             #Check for autoscaling policy in each table
-            results = self.appScalingPolicyClient.describe_scaling_policies(
-                ServiceNamespace = 'dynamodb',
-                ResourceId = 'table/' + self.tables['Table']['TableName']
-                )
+            scalingPolicies = self.view.get('scalingPolicies')
             
             #If results comes back with record, autoscaling is enabled
-            if len(results['ScalingPolicies']) == 0:
+            if len(scalingPolicies) == 0:
                 if 'BillingModeSummary' in self.tables['Table'] and 'BillingMode' in self.tables['Table']['BillingModeSummary'] and self.tables['Table']['BillingModeSummary']['BillingMode'] == 'PROVISIONED':
                     self.results['autoScalingStatus'] = [-1 , '']
                 
-        except botocore.exceptions as e:
+        except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
             print(ecode)
     
     # logic to check for any existing backup available
     def _check_backup_status(self):
         try:
-            results = self.backupClient.list_recovery_points_by_resource(ResourceArn = self.tables['Table']['TableArn'])
+            recoveryPoints = self.view.get('recoveryPoints')
 
-            if len(results['RecoveryPoints']) < 1:
+            if len(recoveryPoints) < 1:
                 self.results['disabledBackup'] = [-1, '']
-        except botocore.exception as e:
+        except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
             print(ecode)
             
@@ -260,12 +256,9 @@ class DynamoDbCommon(Evaluator):
         if not 'GlobalSecondaryIndexes' in self.tables['Table']:
             return
         
-        serviceQuotasResults = Config.get('QuotaCodeDDB', None)
         try:
-            #Retrieve quota for DynamoDb = L-F98FE922
-            if serviceQuotasResults == None:
-                serviceQuotasResults = self.serviceQuotaClient.list_service_quotas(ServiceCode='dynamodb')['Quotas']
-                Config.set('QuotaCodeDDB', serviceQuotasResults)
+            #Quotas of the region are listed once by DynamoDbRegionContext
+            serviceQuotasResults = self.context.getQuotas()
                 
             for quotas in serviceQuotasResults:
                 #Check for GSI limit / table
@@ -288,23 +281,7 @@ class DynamoDbCommon(Evaluator):
         
         try:
             #Count the number active reads on the table on the GSIs
-            result = self.cloudWatchClient.get_metric_statistics(
-                Namespace = 'AWS/DynamoDB',
-                MetricName = 'ConditionalCheckFailedRequests',
-                Dimensions = [
-                        {
-                            'Name':'TableName',
-                            'Value':self.tables['Table']['TableName']
-                        },
-                    ],
-                StartTime = datetime.datetime.now() - datetime.timedelta(7),
-                EndTime = datetime.datetime.now(),
-                Period = 900,
-                Statistics = [
-                    'SampleCount',
-                ],
-                Unit = 'Count'
-            )
+            result = self.getMetricStatistics('ConditionalCheckFailedRequests', 7, 900, 'SampleCount')
             
             for eachDatapoints in result['Datapoints']:
                 _sumOfConditionalCheckFailedRequest += eachDatapoints['SampleCount']
@@ -321,46 +298,11 @@ class DynamoDbCommon(Evaluator):
     def _check_service_limit_wcu_rcu(self):
         try:
             
-            _startTime = datetime.datetime.now() - datetime.timedelta(7)
-            _endTime = datetime.datetime.now()
-            
             #Count the number active reads on the table RCU
-            rcuResult = self.cloudWatchClient.get_metric_statistics(
-                Namespace = 'AWS/DynamoDB',
-                MetricName = 'ConsumedReadCapacityUnits',
-                Dimensions = [
-                        {
-                            'Name':'TableName',
-                            'Value':self.tables['Table']['TableName']
-                        },
-                    ],
-                StartTime = _startTime,
-                EndTime = _endTime,
-                Period = 3600,
-                Statistics = [
-                    'Average',
-                ],
-                Unit = 'Count'
-            )
+            rcuResult = self.getMetricStatistics('ConsumedReadCapacityUnits', 7, 3600, 'Average')
             
             #Count the number active reads on the table WCU
-            wcuResult = self.cloudWatchClient.get_metric_statistics(
-                Namespace = 'AWS/DynamoDB',
-                MetricName = 'ConsumedWriteCapacityUnits',
-                Dimensions = [
-                        {
-                            'Name':'TableName',
-                            'Value':self.tables['Table']['TableName']
-                        },
-                    ],
-                StartTime = _startTime,
-                EndTime = _endTime,
-                Period = 3600,
-                Statistics = [
-                    'Average',
-                ],
-                Unit = 'Count'
-            )
+            wcuResult = self.getMetricStatistics('ConsumedWriteCapacityUnits', 7, 3600, 'Average')
             
             _rcuLimitCount = 0
             _wcuLimitCount = 0
@@ -387,18 +329,14 @@ class DynamoDbCommon(Evaluator):
     # logic to check autoscaling aggresiveness
     def _check_autoscaling_aggresiveness(self):
         try:
-            results = self.appScalingPolicyClient.describe_scaling_policies(
-                ServiceNamespace = 'dynamodb',
-                ResourceId = 'table/' + self.tables['Table']['TableName']
-            )
+            scalingPolicies = self.view.get('scalingPolicies')
             
-            
-            if len(results['ScalingPolicies']) > 0:
+            if len(scalingPolicies) > 0:
             
                 _wcuTarget = 0
                 _rcuTarget = 0
                 
-                for eachScalingPolicies in results['ScalingPolicies']:
+                for eachScalingPolicies in scalingPolicies:
                     if eachScalingPolicies['ScalableDimension'] == 'dynamodb:table:WriteCapacityUnits':
                         _wcuTarget = eachScalingPolicies['TargetTrackingScalingPolicyConfiguration']['TargetValue']
                     elif eachScalingPolicies['ScalableDimension'] == 'dynamodb:table:ReadCapacityUnits':
@@ -416,7 +354,7 @@ class DynamoDbCommon(Evaluator):
                 if _wcuTarget <= 50.0:
                     self.results['autoScalingLowUtil'] = [-1, 'WCU = ' + str(_wcuTarget)]
                    
-        except botocore.exceptions as e:
+        except botocore.exceptions.ClientError as e:
             ecode = e.response['Error']['Code']
             print(ecode)
     
@@ -424,23 +362,7 @@ class DynamoDbCommon(Evaluator):
     def _check_system_errors(self):
         try:
             #Count the number active reads on the table on the GSIs
-            result = self.cloudWatchClient.get_metric_statistics(
-                Namespace = 'AWS/DynamoDB',
-                MetricName = 'SystemErrors',
-                Dimensions = [
-                       {
-                            'Name':'TableName',
-                            'Value':self.tables['Table']['TableName']
-                        },
-                    ],
-                StartTime = datetime.datetime.now() - datetime.timedelta(30),
-                EndTime = datetime.datetime.now(),
-                Period = 3600,
-                Statistics = [
-                    'SampleCount',
-                ],
-                Unit = 'Count'
-            )
+            result = self.getMetricStatistics('SystemErrors', 30, 3600, 'SampleCount')
             
             _systemErrorsCount = 0
             
@@ -459,23 +381,7 @@ class DynamoDbCommon(Evaluator):
     def _check_throttled_request(self):
         try:
             #Count the number active reads on the table on the GSIs
-            result = self.cloudWatchClient.get_metric_statistics(
-                Namespace = 'AWS/DynamoDB',
-                MetricName = 'ThrottledRequests',
-                Dimensions = [
-                       {
-                            'Name':'TableName',
-                            'Value': self.tables['Table']['TableName']
-                        },
-                    ],
-                StartTime = datetime.datetime.now() - datetime.timedelta(30),
-                EndTime = datetime.datetime.now(),
-                Period = 3600,
-                Statistics = [
-                    'SampleCount',
-                ],
-                Unit = 'Count'
-            )
+            result = self.getMetricStatistics('ThrottledRequests', 30, 3600, 'SampleCount')
             
             _throttledRequestErrors = 0
             
@@ -11,7 +11,7 @@ from services.Evaluator import Evaluator
 
 class DynamoDbGeneric(Evaluator):
     
-    def __init__(self, tables, dynamoDbClient, cloudWatchClient, serviceQuotaClient, appScalingPolicyClient, backupClient, cloudTrailClient):
+    def __init__(self, tables, dynamoDbClient, cloudWatchClient, serviceQuotaClient, appScalingPolicyClient, backupClient, cloudTrailClient, context=None):
         super().__init__()
         self.tables = tables
         self.dynamoDbClient = dynamoDbClient
@@ -20,17 +20,18 @@ class DynamoDbGeneric(Evaluator):
         self.appScalingPolicyClient = appScalingPolicyClient
         self.backupClient = backupClient
         self.cloudTrailClient = cloudTrailClient
+        self.context = context
 
         self._resourceName = 'General'
         
     # logic to check service limits Max table / region
     def _check_service_limits_max_table_region(self):
-        serviceQuotasResults = Config.get('QuotaCodeDDB', None)
         try:
             #Retrieve quota for DynamoDb = L-F98FE922
-            if serviceQuotasResults == None:
+            if self.context is not None:
+                serviceQuotasResults = self.context.getQuotas()
+            else:
                 serviceQuotasResults = self.serviceQuotaClient.list_service_quotas(ServiceCode='dynamodb')['Quotas']
-                Config.set('QuotaCodeDDB', serviceQuotasResults)
                 
             for quotas in serviceQuotasResults:
                 #Check for max table / region
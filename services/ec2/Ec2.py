@@ -9,9 +9,14 @@ import re
 import json
 import time
 
-from utils.Tools import _pi
+from utils.Tools import _pi, _warn
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.WorkUnitScheduler import WorkUnitScheduler
+from utils.Paginator import Paginator
+from utils.InstanceTypeCatalog import InstanceTypeCatalog
+from utils.CostExplorerCache import CostExplorerCache
 from services.Service import Service
 from services.ec2.drivers.Ec2Instance import Ec2Instance
 from services.ec2.drivers.Ec2CompOpt import Ec2CompOpt
@@ -25,6 +30,8 @@ from services.ec2.drivers.Ec2AutoScaling import Ec2AutoScaling
 from services.ec2.drivers.Ec2EbsSnapshot import Ec2EbsSnapshot
 from services.ec2.drivers.Ec2Vpc import Ec2Vpc
 from services.ec2.drivers.Ec2NACL import Ec2NACL
+from services.ec2.Ec2RegionSnapshot import Ec2RegionSnapshot
+from services.ec2.Ec2SnapshotIndex import Ec2SnapshotIndex
 
 class Ec2(Service):
     CHARTSTYPE = {
@@ -36,15 +43,15 @@ class Ec2(Service):
         super().__init__(region)
         ssBoto = self.ssBoto
         
-        self.ec2Client = ssBoto.client('ec2', config=self.bConfig)
-        self.ssmClient = ssBoto.client('ssm', config=self.bConfig)
-        self.compOptClient = ssBoto.client('compute-optimizer', config=self.bConfig)
-        self.ceClient = ssBoto.client('ce', config=self.bConfig)
-        self.elbClient = ssBoto.client('elbv2', config=self.bConfig)
-        self.elbClassicClient = ssBoto.client('elb', config=self.bConfig)
-        self.asgClient = ssBoto.client('autoscaling', config=self.bConfig)
-        self.wafv2Client = ssBoto.client('wafv2', config=self.bConfig)
-        self.cwClient = ssBoto.client('cloudwatch', config=self.bConfig)
+        self.ec2Client = ClientFactory.getClient(ssBoto, 'ec2', config=self.bConfig)
+        self.ssmClient = ClientFactory.getClient(ssBoto, 'ssm', config=self.bConfig)
+        self.compOptClient = ClientFactory.getClient(ssBoto, 'compute-optimizer', config=self.bConfig)
+        self.ceClient = ClientFactory.getClient(ssBoto, 'ce', config=self.bConfig)
+        self.elbClient = ClientFactory.getClient(ssBoto, 'elbv2', config=self.bConfig)
+        self.elbClassicClient = ClientFactory.getClient(ssBoto, 'elb', config=self.bConfig)
+        self.asgClient = ClientFactory.getClient(ssBoto, 'autoscaling', config=self.bConfig)
+        self.wafv2Client = ClientFactory.getClient(ssBoto, 'wafv2', config=self.bConfig)
+        self.cwClient = ClientFactory.getClient(ssBoto, 'cloudwatch', config=self.bConfig)
         
         self.getOutdateSQLVersion()
         self.getWindowsVersion()
@@ -60,6 +67,7 @@ class Ec2(Service):
         })
 
         self.chartGen = None
+        self.snapshot = None
     
     def getOutdateSQLVersion(self):
         outdateVersion = Config.get('SQLEolVersion', None)
@@ -116,21 +124,9 @@ class Ec2(Service):
         filters = []
         if self.tags:
             filters = self.tags
-                
-        results = self.ec2Client.describe_instances(
-            Filters = filters
-        )
-        
-        arrs = results.get('Reservations')
-        while results.get('NextToken') is not None:
-            results = self.ec2Client.describe_instances(
-                Filters = filters,
-                NextToken = results.get('NextToken')
-            )    
-            arrs = arrs + results.get('Reservations')
         
         resources = []
-        for arr in arrs:
+        for arr in Paginator.paginate(self.ec2Client, 'describe_instances', 'Reservations', Filters=filters):
             for instance in arr['Instances']:
                 if instance['State']['Name'] != 'terminated':
                     resources.append(arr)
@@ -138,33 +134,29 @@ class Ec2(Service):
         
         return resources
     
+    def getSnapshot(self, instances=None):
+        if self.snapshot is None:
+            self.snapshot = Ec2RegionSnapshot(self.ec2Client).load(instances)
+        return self.snapshot
+    
+    def fromSnapshot(self, method, *args):
+        ## a denied listing only leaves its resources out, the drivers' checks raise it themselves
+        try:
+            return getattr(self.getSnapshot(), method)(*args)
+        except botocore.exceptions.ClientError as e:
+            _warn("EC2 {}: {}".format(method, e.response['Error']['Code']))
+            return None
+    
     def getEC2SecurityGroups(self,instance):
         if 'SecurityGroups' not in instance:
             print(f"Security Group not found in {instance['InstanceId']}")
             return {}
         
-        arr = []    
-        filters = []
         groupIds = []
-        if self.tags:
-            filters = self.tags
-        
         for group in instance['SecurityGroups']:
             groupIds.append(group['GroupId'])
         
-        results = self.ec2Client.describe_security_groups(
-            GroupIds=groupIds,
-            Filters=filters
-        )
-        arr = results.get('SecurityGroups')
-        
-        while results.get('NextToken') is not None:
-            results = self.ec2Client.describe_security_groups(
-                GroupIds = groupIds,
-                Filters=filters,
-                NextToken = results.get('NextToken')
-                )
-            arr = arr + results.get('SecurityGroups')
+        arr = self.fromSnapshot('getSecurityGroups', groupIds) or []
         
         if not self.tags:
             return arr
@@ -182,29 +174,10 @@ class Ec2(Service):
         if self.tags:
             filters = self.tags
         
-        results = self.ec2Client.describe_volumes(
-            Filters = filters
-        )
-        
-        arr = results.get('Volumes')
-        while results.get('NextToken') is not None:
-            results = self.ec2Client.describe_volumes(
-                Filters = filters,
-                NextToken = results.get('NextToken')
-            )    
-            arr = arr + results.get('Reservations')
-
-        return arr
+        return Paginator.list(self.ec2Client, 'describe_volumes', 'Volumes', Filters=filters)
         
     def getELB(self):
-        results = self.elbClient.describe_load_balancers()
-        
-        arr = results.get('LoadBalancers')
-        while results.get('NextMarker') is not None:
-            results = self.elbClient.describe_load_balancers(
-                Marker = results.get('NextMarker')
-            )
-            arr = arr + results.get('LoadBalancers')
+        arr = Paginator.list(self.elbClient, 'describe_load_balancers', 'LoadBalancers')
             
         ## TO DO: support tagging later
         
@@ -226,17 +199,7 @@ class Ec2(Service):
         return filteredResults
         
     def getELBClassic(self):
-        results = self.elbClassicClient.describe_load_balancers()
-        
-        arr = results.get('LoadBalancerDescriptions')
-        while results.get('NextMarker') is not None:
-            results = self.elbClient.describe_load_balancers(
-                Marker = results.get('NextMarker')
-            )
-            
-            arr = arr + results.get('LoadBalancerDescriptions')
-            
-        return arr
+        return Paginator.list(self.elbClassicClient, 'describe_load_balancers', 'LoadBalancerDescriptions')
         
     def getELBSecurityGroup(self, elb):
         if 'SecurityGroups' not in elb:
@@ -251,62 +214,27 @@ class Ec2(Service):
         if len(groupIds) == 0:
             return arr
         
-        filters = []  
-        if self.tags is not None:
-            filters = self.tags
-            
-        results = self.ec2Client.describe_security_groups(
-            GroupIds = groupIds,
-            Filters = filters
-        )
-        
-        arr = results.get('SecurityGroups')
-        while results.get('NextToken') is not None:
-            results = self.ec2Client.describe_security_groups(
-                GroupIds = groupIds,
-                Filters = filters,
-                NextToken = results.get('NextToken')
-            )
-            arr = arr + results.get('SecurityGroups')
+        arr = self.fromSnapshot('getSecurityGroups', groupIds) or []
         
         if not self.tags:
             return arr
         
         finalArr = []
         for i, detail in enumerate(arr):
-            if self.resourceHasTags(detail['Tags']):
+            if 'Tags' in detail and self.resourceHasTags(detail['Tags']):
                 finalArr.append(arr[i])
             
-        return arr
+        return finalArr
         
     def getASGResources(self):
         filters = []
         if self.tags:
             filters = self.tags
         
-        results = self.asgClient.describe_auto_scaling_groups(
-            Filters = filters
-        )
-        arr = results.get('AutoScalingGroups')
-        while results.get('NextToken') is not None:
-            results = self.asgClient.describe_auto_scaling_groups(
-                Filters = filters,
-                NextToken = results.get('NextToken')
-            )
-            
-            arr = arr + results.get('AutoScalingGroups')
-        
-        return arr
+        return Paginator.list(self.asgClient, 'describe_auto_scaling_groups', 'AutoScalingGroups', Filters=filters)
         
     def getEIPResources(self):
-        filters = []
-        if self.tags:
-            filters = self.tags
-            
-        result = self.ec2Client.describe_addresses(
-            Filters = filters    
-        )
-        arr = result.get('Addresses')
+        arr = self.fromSnapshot('getAddresses') or []
         
         if not self.tags:
             return arr
@@ -319,28 +247,16 @@ class Ec2(Service):
         return finalArr    
         
     def getDefaultSG(self):
-        defaultSGs = {}
-        result = self.ec2Client.describe_security_groups()
-        for group in result.get('SecurityGroups'):
-            if group.get('GroupName') == 'default':
-                defaultSGs[group.get('GroupId')] = group
-                
-        while result.get('NextToken') is not None:
-            result = self.ec2Client.describe_security_groups(
-                NextToken = result.get('NextToken')
-            )
-            for group in result.get('SecurityGroups'):
-                if group.get('GroupName') == 'default':
-                    defaultSGs[group.get('GroupId')] = group
+        defaultSGs = self.fromSnapshot('getDefaultSecurityGroups') or {}
         
         if not self.tags:
             return defaultSGs
         
-        finalArr = []
+        finalArr = {}
         
         for i, detail in defaultSGs.items():
             if 'Tags' in detail and self.resourceHasTags(detail['Tags']):
-                finalArr.append(defaultSGs[i])
+                finalArr[i] = defaultSGs[i]
         
         return finalArr
         
@@ -349,43 +265,14 @@ class Ec2(Service):
         if self.tags is not None:
             filters = self.tags
             
-        result = self.ec2Client.describe_vpcs(
-            Filters = filters
-        )
-        
-        vpcList = result.get('Vpcs')
-        while result.get('NextToken') is not None:
-            result = self.ec2Client.describe_vpcs(
-                Filters = filters,
-                NextToken = result.get('NextToken')
-            )
-            vpcList = vpcList + result.get('Vpcs')
-        
-        return vpcList
+        return Paginator.list(self.ec2Client, 'describe_vpcs', 'Vpcs', Filters=filters)
         
     def getFlowLogs(self):
         ## No filter check in flow logs because the filter should be applied on VPC level
-        result = self.ec2Client.describe_flow_logs()
-        
-        flowLogList = result.get('FlowLogs')
-        while result.get('NextToken') is not None:
-            result = self.ec2Client.describe_flow_logs(
-                NextToken = result.get('NextToken')
-            )
-            flowLogList = flowLogList + result.get('FlowLogs')
-        
-        return flowLogList
+        return Paginator.list(self.ec2Client, 'describe_flow_logs', 'FlowLogs')
         
     def getNetworkACLs(self):
-        result = self.ec2Client.describe_network_acls()
-        
-        networkACLs = result.get('NetworkAcls')
-        while result.get('NextToken') is not None:
-            result = self.ec2Client.describe_network_acls(
-                NextToken = result.get('NextToken')
-            )
-            networkACLs = networkACLs + result.get('NetworkAcls')
-        return networkACLs
+        return Paginator.list(self.ec2Client, 'describe_network_acls', 'NetworkAcls')
 
 
     def getChartGenCost(self):
@@ -393,19 +280,6 @@ class Ec2(Service):
         Generate Chart by EC2 Instance Type & Region
         Provide customer insight on percentage of older generation EC2 Instance Type
         '''
-        def get_next_gen(instance_family):
-            # Extract the numeric part from the instance family
-            numeric_part = re.search(r'\d+', instance_family)
-            if numeric_part:
-                numeric_value = int(numeric_part.group())
-                new_numeric_value = numeric_value + 1
-                new_instance_family = re.sub(r'\d+', str(new_numeric_value), instance_family)
-            else:
-                # If no numeric part is found, assume it's the first generation
-                new_instance_family = instance_family + '1'
-
-            return new_instance_family
-
         # Define the time period for the this month
         end_date = datetime.now()
         start_date = end_date - timedelta(days=30)
@@ -418,7 +292,7 @@ class Ec2(Service):
         ec2_response = {}
         
         try:
-            ec2_response = self.ceClient.get_cost_and_usage(
+            ec2_response = CostExplorerCache.call(self.ceClient, 'get_cost_and_usage',
             TimePeriod=time_period,
             Granularity='MONTHLY',
             Metrics=['UnblendedCost'],
@@ -478,27 +352,9 @@ class Ec2(Service):
         else:
             instance_dict = region_instance_dict.get(self.region, None)
 
-        # Get all available instance types
-        all_instance_types = []
-        response = self.ec2Client.describe_instance_types()
-        all_instance_types.extend(response['InstanceTypes'])
-
-        while 'NextToken' in response:
-            response = self.ec2Client.describe_instance_types(NextToken=response['NextToken'])
-            all_instance_types.extend(response['InstanceTypes'])
-
+        catalog = InstanceTypeCatalog.get(self.region)
         for instance, metadata in instance_dict.items():
-            latest_gen = instance
-            has_next_gen = True
-            while has_next_gen:
-                instance_type_to_check = get_next_gen(latest_gen)
-                if instance_type_to_check in [instance_type['InstanceType'].split('.')[0] for instance_type in all_instance_types]:
-                    latest_gen = instance_type_to_check
-                else:
-                    has_next_gen = False
-        
-            if latest_gen != instance:
-                metadata['latest_gen'] = False
+            metadata['latest_gen'] = catalog.isLatestGeneration(instance)
         
         formatted_instance_dict = dict()
         for instance_family, metadata in instance_dict.items():
@@ -523,10 +379,12 @@ class Ec2(Service):
                     Path = compOptPath    
                 )
                 
-                if 'Parameters' in compOptCheck and len(compOptCheck['Parameters']) > 0:
+                ## regions are scanned by different workers, only the first one runs it
+                if 'Parameters' in compOptCheck and len(compOptCheck['Parameters']) > 0 and WorkUnitScheduler.claimOnce('EC2_HasRunComputeOpt'):
                     _pi('Compute Optimizer Recommendations')
                     obj = Ec2CompOpt(self.compOptClient)
                     obj.run(self.__class__)
+                    obj.finalize()
                     objs['ComputeOptimizer'] = obj.getInfo()
                     Config.set('EC2_HasRunComputeOpt', True)
                     
@@ -541,45 +399,56 @@ class Ec2(Service):
         
         #EC2 Cost Explorer checks
         hasRunRISP = Config.get('EC2_HasRunRISP', False)
-        if hasRunRISP == False:
+        if hasRunRISP == False and WorkUnitScheduler.claimOnce('EC2_HasRunRISP'):
             _pi('Cost Explorer Recommendations')
             obj = Ec2CostExplorerRecs(self.ceClient)
             obj.run(self.__class__)
+            obj.finalize()
     
             objs['CostExplorer'] = obj.getInfo()
             Config.set('EC2_HasRunRISP', True)
         
-        # EC2 instance checks
         instances = self.getResources()
+        volumes = self.getEBSResources()
+        snapshot = self.getSnapshot(instances)
+        snapshotIndex = Ec2SnapshotIndex(self.ec2Client).load()
+
+        ## Prefetch CloudWatch metrics of all instances and volumes in GetMetricData batches
         for instanceArr in instances:
             for instanceData in instanceArr['Instances']:
-                _pi('EC2', instanceData['InstanceId'])
-                obj = Ec2Instance(instanceData,self.ec2Client, self.cwClient)
-                obj.run(self.__class__)
-                
-                objs[f"EC2::{instanceData['InstanceId']}"] = obj.getInfo()
-                self.setChartData(obj.getChartData())
-                
-                ## Gather SecGroups in dict first to prevent check same sec groups multiple time
-                instanceSG = self.getEC2SecurityGroups(instanceData)
-                for group in instanceSG:
-                    secGroups[group['GroupId']] = group
+                Ec2Instance.registerMetrics(self.cwClient, instanceData)
+        for volume in volumes:
+            Ec2EbsVolume.registerMetrics(self.cwClient, volume)
+
+        # EC2 instance checks
+        def buildInstance(instanceData):
+            _pi('EC2', instanceData['InstanceId'])
+            return f"EC2::{instanceData['InstanceId']}", Ec2Instance(instanceData,self.ec2Client, self.cwClient, snapshot)
+        
+        instancesData = [instanceData for instanceArr in instances for instanceData in instanceArr['Instances']]
+        objs.update(self.runDrivers(instancesData, buildInstance))
+        
+        ## Gather SecGroups in dict first to prevent check same sec groups multiple time
+        for instanceData in instancesData:
+            instanceSG = self.getEC2SecurityGroups(instanceData)
+            for group in instanceSG:
+                secGroups[group['GroupId']] = group
         
             
         #EBS checks
-        volumes = self.getEBSResources()
-        for volume in volumes:
+        def buildVolume(volume):
             _pi('EBS', volume['VolumeId'])
-            obj = Ec2EbsVolume(volume,self.ec2Client, self.cwClient)
-            obj.run(self.__class__)
-            objs[f"EBS::{volume['VolumeId']}"] = obj.getInfo()
+            return f"EBS::{volume['VolumeId']}", Ec2EbsVolume(volume,self.ec2Client, self.cwClient, snapshotIndex)
+        
+        objs.update(self.runDrivers(volumes, buildVolume))
 
         #EBS Snapshots
         _pi('EBS::Snapshots')
         volume_ids = [volume['VolumeId'] for volume in volumes]
-        obj = Ec2EbsSnapshot(volume_ids, self.ec2Client)
+        obj = Ec2EbsSnapshot(volume_ids, self.ec2Client, snapshotIndex)
 
         obj.run(self.__class__)
+        obj.finalize()
         objs["EBS::Snapshots"] = obj.getInfo()
         
         
@@ -593,6 +462,7 @@ class Ec2(Service):
             _pi('ELB::Load Balancer', lb['LoadBalancerName'])
             obj = Ec2ElbCommon(lb, elbSGList, self.elbClient, self.wafv2Client)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"ELB::{lb['LoadBalancerName']}"] = obj.getInfo()
             
         
@@ -602,6 +472,7 @@ class Ec2(Service):
             _pi('ELB::Load Balancer Classic', lb['LoadBalancerName'])
             obj = Ec2ElbClassic(lb, self.elbClassicClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"ELB Classic::{lb['LoadBalancerName']}"] = obj.getInfo()
             
             elbSGList = self.getELBSecurityGroup(lb)
@@ -614,23 +485,28 @@ class Ec2(Service):
             _pi('ASG::Auto Scaling Group', group['AutoScalingGroupName']);
             obj = Ec2AutoScaling(group, self.asgClient, self.elbClient, self.elbClassicClient, self.ec2Client)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"ASG::{group['AutoScalingGroupName']}"] = obj.getInfo()
         
         defaultSGs = self.getDefaultSG()
         if defaultSGs:
             for groupId in defaultSGs.keys():
-                if groupId not in secGroups:
+                ## None when network interfaces could not be listed, keep the group as in use
+                attached = self.fromSnapshot('isSecurityGroupAttached', groupId) if groupId not in secGroups else True
+                if attached is False:
                     secGroups[groupId] = defaultSGs[groupId]
                     secGroups[groupId]['inUsed'] = 'False'
+                elif groupId not in secGroups:
+                    ## attached to network interfaces of other services, e.g. Lambda, RDS
+                    secGroups[groupId] = defaultSGs[groupId]
             
         # SG checks
         if secGroups:
-            for group in secGroups.values():
+            def buildSecGroup(group):
                 _pi('EC2::Security Group', group['GroupId'])
-                obj = Ec2SecGroup(group, self.ec2Client)
-                obj.run(self.__class__)
-                
-                objs[f"SG::{group['GroupId']}"] = obj.getInfo()
+                return f"SG::{group['GroupId']}", Ec2SecGroup(group, self.ec2Client)
+            
+            objs.update(self.runDrivers(secGroups.values(), buildSecGroup))
         
         # EIP checks    
         eips = self.getEIPResources()
@@ -638,6 +514,7 @@ class Ec2(Service):
             _pi('Elastic IP Recommendations', eip['PublicIp'])
             obj = Ec2EIP(eip)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"ElasticIP::{eip['AllocationId']}"] = obj.getInfo()
             
         # VPC Checks
@@ -647,6 +524,7 @@ class Ec2(Service):
             _pi('VPC::Virtual Private Cloud', vpc['VpcId'])
             obj = Ec2Vpc(vpc, flowLogs, self.ec2Client)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"VPC::{vpc['VpcId']}"] = obj.getInfo()
             
         # NACL Checks
@@ -655,10 +533,12 @@ class Ec2(Service):
             _pi('NACL::Network ACL', nacl['NetworkAclId'])
             obj = Ec2NACL(nacl, self.ec2Client)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"NACL::{nacl['NetworkAclId']}"] = obj.getInfo()
         
         
-        if self.getChartGenCost():
-            self.setChartData({"EC2 Instance Family Pricing": self.getChartGenCost()})
+        chartGen = self.getChartGenCost()
+        if chartGen:
+            self.setChartData({"EC2 Instance Family Pricing": chartGen})
 
         return objs
\ No newline at end of file
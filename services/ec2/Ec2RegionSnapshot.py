@@ -0,0 +1,105 @@
+import botocore
+
+from utils.Paginator import Paginator
+
+## Region wide EC2 inventory loaded in a few paginated calls and indexed by id
+## Ec2 service and its drivers resolve security groups, subnets, AMIs, Elastic IPs and
+## network interfaces from here instead of issuing describe_* calls for every instance.
+## A ClientError of one listing is kept and raised again where its data is read, so a denied
+## describe_* only fails the checks which need it
+class Ec2RegionSnapshot():
+    ## image-id filter values per describe_images call
+    IMAGE_BATCH = 200
+
+    def __init__(self, ec2Client):
+        self.ec2Client = ec2Client
+        self.securityGroups = {}
+        self.subnets = {}
+        self.images = {}
+        self.addresses = {}
+        self.networkInterfaces = {}
+        self.attachedGroups = set()
+        ## listing: ClientError
+        self.errors = {}
+
+    def load(self, instances):
+        '''
+        instances: describe_instances Reservations, AMIs are only loaded for these instances
+        '''
+        self.fetch('securityGroups', self.loadSecurityGroups)
+        self.fetch('subnets', self.loadSubnets)
+        self.fetch('addresses', self.loadAddresses)
+        self.fetch('networkInterfaces', self.loadNetworkInterfaces)
+
+        imageIds = set()
+        for reservation in instances or []:
+            for instance in reservation['Instances']:
+                imageIds.add(instance['ImageId'])
+        self.fetch('images', self.loadImages, list(imageIds))
+
+        return self
+
+    def fetch(self, name, loader, *args):
+        try:
+            loader(*args)
+        except botocore.exceptions.ClientError as e:
+            self.errors[name] = e
+
+    def get(self, name):
+        if name in self.errors:
+            raise self.errors[name]
+        return getattr(self, name)
+
+    def loadSecurityGroups(self):
+        for group in Paginator.paginate(self.ec2Client, 'describe_security_groups', 'SecurityGroups'):
+            self.securityGroups[group['GroupId']] = group
+
+    def loadSubnets(self):
+        for subnet in Paginator.paginate(self.ec2Client, 'describe_subnets', 'Subnets'):
+            self.subnets[subnet['SubnetId']] = subnet
+
+    def loadAddresses(self):
+        for address in Paginator.paginate(self.ec2Client, 'describe_addresses', 'Addresses'):
+            if 'PublicIp' in address:
+                self.addresses[address['PublicIp']] = address
+
+    def loadNetworkInterfaces(self):
+        for eni in Paginator.paginate(self.ec2Client, 'describe_network_interfaces', 'NetworkInterfaces'):
+            self.networkInterfaces[eni['NetworkInterfaceId']] = eni
+            for group in eni.get('Groups', []):
+                self.attachedGroups.add(group['GroupId'])
+
+    def loadImages(self, imageIds):
+        ## image-id filter skips deregistered AMIs instead of failing the whole call like ImageIds
+        for i in range(0, len(imageIds), self.IMAGE_BATCH):
+            images = Paginator.paginate(self.ec2Client, 'describe_images', 'Images',
+                Filters = [{'Name': 'image-id', 'Values': imageIds[i:i + self.IMAGE_BATCH]}],
+                IncludeDeprecated = True
+            )
+            for image in images:
+                self.images[image['ImageId']] = image
+
+    def getSecurityGroups(self, groupIds):
+        return [self.get('securityGroups')[groupId] for groupId in groupIds if groupId in self.securityGroups]
+
+    def getDefaultSecurityGroups(self):
+        return {groupId: group for groupId, group in self.get('securityGroups').items() if group.get('GroupName') == 'default'}
+
+    def isSecurityGroupAttached(self, groupId):
+        self.get('networkInterfaces')
+        return groupId in self.attachedGroups
+
+    def getSubnet(self, subnetId):
+        return self.get('subnets').get(subnetId)
+
+    def getImage(self, imageId):
+        return self.get('images').get(imageId)
+
+    def getAddress(self, publicIp):
+        return self.get('addresses').get(publicIp)
+
+    def getAddresses(self):
+        return list(self.get('addresses').values())
+
+    def getNetworkInterface(self, networkInterfaceId):
+        return self.get('networkInterfaces').get(networkInterfaceId)
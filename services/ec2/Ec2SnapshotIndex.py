@@ -0,0 +1,88 @@
+import botocore
+import datetime
+from array import array
+
+from utils.Paginator import Paginator
+
+## EBS snapshots owned by the account, listed once per region
+## Rows are kept column wise (id, volume, start time, age) instead of the
+## full describe_snapshots dicts, with a per volume timeline sorted by StartTime.
+## Ec2EbsVolume and Ec2EbsSnapshot checks query this index instead of describe_snapshots.
+## As in Ec2RegionSnapshot, a ClientError of one listing is raised again by the checks reading it
+class Ec2SnapshotIndex():
+    def __init__(self, ec2Client):
+        self.ec2Client = ec2Client
+
+        ## columns, one row per snapshot
+        self.snapshotIds = []
+        self.volumeIds = []
+        self.startTimes = []
+        self.ages = array('d')
+
+        self.timelines = {}
+        self.publicSnapshotIds = []
+        self.fastRestoreSnapshotIds = set()
+        ## listing: ClientError
+        self.errors = {}
+
+    def load(self):
+        self.fetch('timelines', self.loadSnapshots)
+        self.fetch('publicSnapshotIds', self.loadPublicSnapshots)
+        self.fetch('fastRestoreSnapshotIds', self.loadFastRestores)
+        return self
+
+    def fetch(self, name, loader):
+        try:
+            loader()
+        except botocore.exceptions.ClientError as e:
+            self.errors[name] = e
+
+    def get(self, name):
+        if name in self.errors:
+            raise self.errors[name]
+        return getattr(self, name)
+
+    def loadSnapshots(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for snapshot in Paginator.paginate(self.ec2Client, 'describe_snapshots', 'Snapshots', pageSize=1000, OwnerIds=['self']):
+            row = len(self.snapshotIds)
+            startTime = snapshot['StartTime']
+
+            self.snapshotIds.append(snapshot['SnapshotId'])
+            self.volumeIds.append(snapshot.get('VolumeId'))
+            self.startTimes.append(startTime)
+            self.ages.append((now - startTime).total_seconds() / (60*60*24))
+
+            if snapshot.get('VolumeId') not in self.timelines:
+                self.timelines[snapshot.get('VolumeId')] = []
+            self.timelines[snapshot.get('VolumeId')].append(row)
+
+        for rows in self.timelines.values():
+            rows.sort(key=lambda row: self.startTimes[row])
+
+    def loadPublicSnapshots(self):
+        ## createVolumePermission is not part of describe_snapshots output, public ones need their own listing
+        for snapshot in Paginator.paginate(self.ec2Client, 'describe_snapshots', 'Snapshots', OwnerIds=['self'], RestorableByUserIds=['all']):
+            self.publicSnapshotIds.append(snapshot['SnapshotId'])
+
+    def loadFastRestores(self):
+        for restore in Paginator.paginate(self.ec2Client, 'describe_fast_snapshot_restores', 'FastSnapshotRestores'):
+            self.fastRestoreSnapshotIds.add(restore['SnapshotId'])
+
+    def getLatestAgeInDays(self, volumeId):
+        rows = self.get('timelines').get(volumeId)
+        if not rows:
+            return None
+        return self.ages[rows[-1]]
+
+    def getFastRestoreSnapshotIds(self, volumeId):
+        fastRestoreSnapshotIds = self.get('fastRestoreSnapshotIds')
+        return [self.snapshotIds[row] for row in self.get('timelines').get(volumeId, []) if self.snapshotIds[row] in fastRestoreSnapshotIds]
+
+    def getPublicSnapshotIds(self):
+        return self.get('publicSnapshotIds')
+
+    def getSnapshotIdsWithoutVolume(self, volumeIds):
+        self.get('timelines')
+        volumeIds = set(volumeIds)
+        return [self.snapshotIds[row] for row in range(len(self.snapshotIds)) if self.volumeIds[row] not in volumeIds]
@@ -2,6 +2,7 @@ import boto3
 import botocore
 
 from services.Evaluator import Evaluator
+from utils.CostExplorerCache import CostExplorerCache
 
 class Ec2CostExplorerRecs(Evaluator):
 
@@ -18,7 +19,7 @@ class Ec2CostExplorerRecs(Evaluator):
     def _checkRIRecommendations(self):
         results = {}
         try:
-            results = self.ceClient.get_reservation_purchase_recommendation(
+            results = CostExplorerCache.call(self.ceClient, 'get_reservation_purchase_recommendation',
                 Service = 'Amazon Elastic Compute Cloud - Compute'
             )
             
@@ -36,7 +37,7 @@ class Ec2CostExplorerRecs(Evaluator):
 
     def _checkSPRecommendations(self):
         try:
-            results = self.ceClient.get_savings_plans_purchase_recommendation(
+            results = CostExplorerCache.call(self.ceClient, 'get_savings_plans_purchase_recommendation',
                 LookbackPeriodInDays = 'THIRTY_DAYS',
                 PaymentOption = 'NO_UPFRONT',
                 SavingsPlansType = 'COMPUTE_SP',
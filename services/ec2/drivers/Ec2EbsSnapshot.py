@@ -8,24 +8,18 @@ from services.Service import Service
 from services.Evaluator import Evaluator
 
 class Ec2EbsSnapshot(Evaluator):
-    def __init__(self, ebsVolumeIds, ec2Client):
+    def __init__(self, ebsVolumeIds, ec2Client, snapshotIndex):
         super().__init__()
         self.ebsVolumeIds = ebsVolumeIds
         self.ec2Client = ec2Client
+        self.snapshotIndex = snapshotIndex
 
         self._resourceName = 'AllEC2Snapshots'
 
         self.init()
 
     def _checkSnapshotPublic(self):
-        snapshotData = self.ec2Client.describe_snapshots(
-            OwnerIds = ["self"],
-            RestorableByUserIds = ["all"]
-        )
-        
-        publicSnapshotList = []
-        for snapshot in snapshotData['Snapshots']:
-            publicSnapshotList.append(snapshot.get('SnapshotId'))
+        publicSnapshotList = self.snapshotIndex.getPublicSnapshotIds()
         
         if len(publicSnapshotList) > 0:
             self.results['EBSSnapshotIsPublic'] = [-1, ', '.join(publicSnapshotList)]
@@ -33,14 +27,7 @@ class Ec2EbsSnapshot(Evaluator):
         return
 
     def _checkDeletedVolumeSnapshotList(self):
-        snapshotData = self.ec2Client.describe_snapshots(
-            OwnerIds = ["self"],
-        )
-
-        deletedVolumeSnapshotList = []
-        for snapshot in snapshotData['Snapshots']:
-            if snapshot['VolumeId'] not in self.ebsVolumeIds:
-                deletedVolumeSnapshotList.append(snapshot['SnapshotId'])
+        deletedVolumeSnapshotList = self.snapshotIndex.getSnapshotIdsWithoutVolume(self.ebsVolumeIds)
         
         if len(deletedVolumeSnapshotList) > 0:
             self.results['EBSSnapshotDeletedVolume'] = [-1, ', '.join(deletedVolumeSnapshotList)]
@@ -6,13 +6,18 @@ from utils.Config import Config
 from services.Service import Service
 
 from services.Evaluator import Evaluator
+from utils.MetricStore import MetricStore
 
 class Ec2EbsVolume(Evaluator):
     OLDGENBLOCK = ('gp2', 'io1')
+    IOPS_CHECK_DAYS = 7
+    IOPS_PERIOD = 60 * 60
+    LOW_UTILIZATION_VERIFY_DAY = 7
     
-    def __init__(self, ebsVolumeData,ec2Client,cwClient):
+    def __init__(self, ebsVolumeData,ec2Client,cwClient, snapshotIndex):
         super().__init__()
         self.ec2Client = ec2Client
+        self.snapshotIndex = snapshotIndex
         self.ebsVolumeData = ebsVolumeData
         self.cwClient = cwClient
 
@@ -22,6 +27,34 @@ class Ec2EbsVolume(Evaluator):
         self.init()
         
     # helper functions
+    @staticmethod
+    def getOpsParams(volumeId, metric, days, period, statistic):
+        return {
+            'Namespace': 'AWS/EBS',
+            'MetricName': metric,
+            'Dimensions': [
+                {'Name': 'VolumeId', 'Value': volumeId}
+            ],
+            'StartTime': datetime.datetime.utcnow() - datetime.timedelta(days=days),
+            'EndTime': datetime.datetime.utcnow(),
+            'Period': period,
+            'Statistics': [statistic]
+        }
+
+    ## Queue the ops metrics used by _checkEBSIops and _checkLowEBSLowUtilization into the region MetricStore
+    @staticmethod
+    def registerMetrics(cwClient, ebsVolumeData):
+        volumeId = ebsVolumeData['VolumeId']
+        if ebsVolumeData['VolumeType'] in ('io1', 'io2', 'gp3'):
+            for metric in ['VolumeReadOps', 'VolumeWriteOps']:
+                MetricStore.register(cwClient, **Ec2EbsVolume.getOpsParams(volumeId, metric, Ec2EbsVolume.IOPS_CHECK_DAYS, Ec2EbsVolume.IOPS_PERIOD, 'Sum'))
+
+        verifyDay = Ec2EbsVolume.LOW_UTILIZATION_VERIFY_DAY
+        createDay = (datetime.datetime.now().timestamp() - ebsVolumeData['CreateTime'].timestamp()) / (60*60*24)
+        if createDay >= verifyDay:
+            for metric in ['VolumeReadOps', 'VolumeWriteOps']:
+                MetricStore.register(cwClient, **Ec2EbsVolume.getOpsParams(volumeId, metric, verifyDay, verifyDay * 24 * 60 * 60, 'Average'))
+
     def setCreateTimeDeltaInDays(self):
         launchTimeData = self.ebsVolumeData['CreateTime']
         
@@ -43,23 +76,11 @@ class Ec2EbsVolume(Evaluator):
         total_iops = 0
         max_iops = 0
 
-        check_days = 7 # number of days checked
-        period = 60 * 60 # 1hr interval
-        end_time = datetime.datetime.now()
-        start_time = end_time - datetime.timedelta(days=check_days)
+        check_days = Ec2EbsVolume.IOPS_CHECK_DAYS # number of days checked
+        period = Ec2EbsVolume.IOPS_PERIOD # 1hr interval
 
         for metric in metrics:
-            response = self.cwClient.get_metric_statistics(
-                Namespace='AWS/EBS',
-                MetricName=metric,
-                Dimensions=[
-                    {'Name': 'VolumeId', 'Value': volume_id}
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=period,
-                Statistics=['Sum']
-            )
+            response = MetricStore.getMetricStatistics(self.cwClient, **Ec2EbsVolume.getOpsParams(volume_id, metric, check_days, period, 'Sum'))
 
             # Sum up the IOPS from read and write operations
             for datapoint in response['Datapoints']:
@@ -125,22 +146,15 @@ class Ec2EbsVolume(Evaluator):
         return
     
     def _checkSnapshot(self):
-        filterData = [{
-            'Name': 'volume-id',
-            'Values': [self.ebsVolumeData['VolumeId']]
-        }]
-        
-        snapshotData = self.ec2Client.describe_snapshots(
-            Filters = filterData
-        )
-        
-        if len(snapshotData['Snapshots']) > 0:
-            self.hasFastSnapshot(snapshotData['Snapshots'])
-
-            # take latest snapshot to calculate how recently it was created
-            snapshotStartTime = snapshotData['Snapshots'][0]['StartTime']
-            timeDelta = datetime.datetime.now().timestamp() - snapshotStartTime.timestamp()
-            launchDay = int(timeDelta / (60*60*24))
+        volumeId = self.ebsVolumeData['VolumeId']
+        
+        # age of the latest snapshot, None when the volume has none
+        latestAge = self.snapshotIndex.getLatestAgeInDays(volumeId)
+        
+        if latestAge is not None:
+            self.hasFastSnapshot(volumeId)
+
+            launchDay = int(latestAge)
             
             if launchDay > 7:
                 self.results['EBSUpToDateSnapshot'] = [-1,'']
@@ -151,53 +165,26 @@ class Ec2EbsVolume(Evaluator):
         
         return
     
-    def hasFastSnapshot(self, snapshots):
-        items = [snapshot['SnapshotId'] for snapshot in snapshots]
-
-        filterData = [{
-            'Name': 'snapshot-id',
-            'Values': items
-        }]
-        
-        result = self.ec2Client.describe_fast_snapshot_restores(
-            Filters=filterData
-        )
-
-        fastSnapshots = result.get('FastSnapshotRestores')
-        
-        items = []
-        if len(fastSnapshots) > 0:
-            items = list(set(snapshot['SnapshotId'] for snapshot in fastSnapshots))
+    def hasFastSnapshot(self, volumeId):
+        items = self.snapshotIndex.getFastRestoreSnapshotIds(volumeId)
+        if len(items) > 0:
             self.results['EBSFastSnapshot'] = [-1, ('|').join(items)] 
         
         return
     
     def _checkLowEBSLowUtilization(self):
         cwClient = self.cwClient
-        verifyDay = 7
+        verifyDay = Ec2EbsVolume.LOW_UTILIZATION_VERIFY_DAY
         
         #if created within the last 7 days, ignore this check
         if self.launchTimeDeltaInDays < verifyDay:
             return
         
         
-        dimensions = [
-            {
-                'Name': 'VolumeId',
-                'Value': self.ebsVolumeData['VolumeId']
-            }
-        ]
+        volumeId = self.ebsVolumeData['VolumeId']
         
         #check volume read ops
-        readOpsResult = cwClient.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/EBS',
-            MetricName='VolumeReadOps',
-            StartTime=datetime.datetime.utcnow() - datetime.timedelta(days=verifyDay),
-            EndTime=datetime.datetime.utcnow(),
-            Period=verifyDay * 24 * 60 * 60,
-            Statistics=['Average']
-        )
+        readOpsResult = MetricStore.getMetricStatistics(cwClient, **Ec2EbsVolume.getOpsParams(volumeId, 'VolumeReadOps', verifyDay, verifyDay * 24 * 60 * 60, 'Average'))
         
         cnt = 0
         readDatapoints = readOpsResult['Datapoints']
@@ -212,15 +199,7 @@ class Ec2EbsVolume(Evaluator):
             return
         
         #check volume write ops
-        writeOpsResult = cwClient.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/EBS',
-            MetricName='VolumeWriteOps',
-            StartTime=datetime.datetime.utcnow() - datetime.timedelta(days=verifyDay),
-            EndTime=datetime.datetime.utcnow(),
-            Period=verifyDay * 24 * 60 * 60,
-            Statistics=['Average']
-        )
+        writeOpsResult = MetricStore.getMetricStatistics(cwClient, **Ec2EbsVolume.getOpsParams(volumeId, 'VolumeWriteOps', verifyDay, verifyDay * 24 * 60 * 60, 'Average'))
         
         writeDatapoints = writeOpsResult['Datapoints']
         if len(writeDatapoints) < verifyDay:
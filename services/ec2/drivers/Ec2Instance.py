@@ -5,8 +5,10 @@ import time
 from utils.Config import Config
 
 from datetime import timedelta
-from utils.Tools import aws_parseInstanceFamily, _warn
+from utils.Tools import _warn
 from services.Evaluator import Evaluator
+from utils.MetricStore import MetricStore
+from utils.InstanceTypeCatalog import InstanceTypeCatalog
 
 import constants as _C
 
@@ -22,10 +24,13 @@ class DateTimeEncoder(json.JSONEncoder):
 
 
 class Ec2Instance(Evaluator):
-    def __init__(self, ec2InstanceData,ec2Client, cwClient):
+    UTILIZATION_VERIFY_DAY = 14
+
+    def __init__(self, ec2InstanceData,ec2Client, cwClient, snapshot=None):
         super().__init__()
         self.ec2Client = ec2Client
         self.cwClient = cwClient
+        self.snapshot = snapshot
         self.ec2InstanceData = ec2InstanceData
         self.setTimeDeltaInDays()
 
@@ -42,28 +47,40 @@ class Ec2Instance(Evaluator):
     def getCPUUtil(self):
         return self.ec2Util
     
+    @staticmethod
+    def getUtilizationParams(instanceId, metricName, verifyDay, statistics=['Average']):
+        return {
+            'Dimensions': [
+                {
+                    'Name': 'InstanceId',
+                    'Value': instanceId
+                },
+            ],
+            'Namespace': 'AWS/EC2',
+            'MetricName': metricName,
+            'StartTime': datetime.datetime.utcnow() - timedelta(days=verifyDay),
+            'EndTime': datetime.datetime.utcnow(),
+            'Period': 24 * 60 * 60,
+            'Statistics': statistics
+        }
+
+    ## Queue the utilization metrics of the instance into the region MetricStore
+    ## so they are fetched in GetMetricData batches before the checks run
+    @staticmethod
+    def registerMetrics(cwClient, ec2InstanceData):
+        verifyDay = Ec2Instance.UTILIZATION_VERIFY_DAY
+        launchDay = (datetime.datetime.now().timestamp() - ec2InstanceData['LaunchTime'].timestamp()) / (60*60*24)
+        if launchDay < verifyDay:
+            return
+
+        instanceId = ec2InstanceData['InstanceId']
+        MetricStore.register(cwClient, **Ec2Instance.getUtilizationParams(instanceId, 'CPUUtilization', verifyDay, ['Average', 'Maximum']))
+        MetricStore.register(cwClient, **Ec2Instance.getUtilizationParams(instanceId, 'NetworkOut', verifyDay))
+        MetricStore.register(cwClient, **Ec2Instance.getUtilizationParams(instanceId, 'NetworkIn', verifyDay))
+
     def getEC2UtilizationMetrics(self, metricName, verifyDay, statistics=['Average']):
-        cwClient = self.cwClient
-        instance = self.ec2InstanceData
-        
-        dimensions = [
-            {
-                'Name': 'InstanceId',
-                'Value': instance['InstanceId']
-            },
-        ]
-        
-        results = cwClient.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/EC2',
-            MetricName=metricName,
-            StartTime=datetime.datetime.utcnow() - timedelta(days=verifyDay),
-            EndTime=datetime.datetime.utcnow(),
-            Period=24 * 60 * 60,
-            Statistics=statistics,
-        )
-        
-        return results
+        params = Ec2Instance.getUtilizationParams(self.ec2InstanceData['InstanceId'], metricName, verifyDay, statistics)
+        return MetricStore.getMetricStatistics(self.cwClient, **params)
     
     def checkMetricsLowUsage(self, metricName, verifyDay, thresholdDay, thresholdValue):
         result = self.getEC2UtilizationMetrics(metricName, verifyDay)
@@ -121,17 +138,27 @@ class Ec2Instance(Evaluator):
         
     def getImageInfo(self):
         self.ec2ImageInfo = None
+        self.ec2ImageError = None
         imageId = self.ec2InstanceData['ImageId']
+        if self.snapshot is not None:
+            ## describe_images failed for the region, raised again by the image checks
+            try:
+                self.ec2ImageInfo = self.snapshot.getImage(imageId)
+            except botocore.exceptions.ClientError as e:
+                self.ec2ImageError = e
+            return
+        
         resp = self.ec2Client.describe_images(ImageIds=[imageId])
         images = resp.get('Images')
         
-        self.ec2ImageInfo = None
         for image in images:
             self.ec2ImageInfo = image
     
     # checks
     def _checkSQLServerEdition(self):
         EolVersion = Config.get('SQLEolVersion', 2012)
+        if self.ec2ImageError is not None:
+            raise self.ec2ImageError
 
         if self.ec2ImageInfo == None:
             return 
@@ -147,6 +174,9 @@ class Ec2Instance(Evaluator):
                     self.results['SQLServerEOL'] = [-1, image['Name']]
     
     def _checkWindowsServerEdition(self):
+        if self.ec2ImageError is not None:
+            raise self.ec2ImageError
+
         if self.ec2ImageInfo == None:
             return
         
@@ -176,19 +206,8 @@ class Ec2Instance(Evaluator):
                         return
         
     def _checkInstanceTypeGeneration(self):
-        instanceArr = aws_parseInstanceFamily(self.ec2InstanceData['InstanceType'], region=self.ec2Client.meta.region_name)
-        instancePrefixArr = instanceArr['prefixDetail']
-        
-        instancePrefixArr['version'] = int(instancePrefixArr['version'])+1
-        size = instanceArr['suffix']
-        newFamily = instancePrefixArr['family'] + str(instancePrefixArr['version']) + instancePrefixArr['attributes']
-       
-        try:
-            results = self.ec2Client.describe_instance_types(
-                InstanceTypes=[newFamily + '.' + size],
-                MaxResults=1
-            )
-        except Exception as e:
+        catalog = InstanceTypeCatalog.get(self.ec2Client.meta.region_name)
+        if catalog.getNextGeneration(self.ec2InstanceData['InstanceType']) is None:
             self.results['EC2NewGen'] = [1, self.ec2InstanceData['InstanceType']]
             return
     
@@ -317,7 +336,7 @@ class Ec2Instance(Evaluator):
         instance = self.ec2InstanceData
         launchDay = self.launchTimeDeltaInDays
     
-        verifyDay = 14
+        verifyDay = Ec2Instance.UTILIZATION_VERIFY_DAY
         thresholdDay = 4
         
         if launchDay < verifyDay:
@@ -349,7 +368,7 @@ class Ec2Instance(Evaluator):
         instance = self.ec2InstanceData
         launchDay = self.launchTimeDeltaInDays
     
-        verifyDay = 14
+        verifyDay = Ec2Instance.UTILIZATION_VERIFY_DAY
         thresholdDay = 4
         
         if launchDay < verifyDay:
@@ -368,7 +387,7 @@ class Ec2Instance(Evaluator):
         instance = self.ec2InstanceData
         launchDay = self.launchTimeDeltaInDays
 
-        verifyDay = 14
+        verifyDay = Ec2Instance.UTILIZATION_VERIFY_DAY
         thresholdDay = 4
 
         if launchDay < verifyDay:
@@ -392,6 +411,11 @@ class Ec2Instance(Evaluator):
         
         self.results['EC2InstancePublicIP'] = [-1, instance.get('PublicIpAddress')]
         
+        if self.snapshot is not None:
+            if self.snapshot.getAddress(instance.get('PublicIpAddress')) is None:
+                self.results['EC2InstanceAutoPublicIP'] = [-1, instance.get('PublicIpAddress')]
+            return
+        
         try:
             addrResp = self.ec2Client.describe_addresses(
                 PublicIps=[instance.get('PublicIpAddress')]
@@ -407,11 +431,16 @@ class Ec2Instance(Evaluator):
     def _checkEC2SubnetAutoPublicIP(self):
         instance = self.ec2InstanceData
         
-        results = self.ec2Client.describe_subnets(
-            SubnetIds = [instance.get('SubnetId')]
-        )
+        if self.snapshot is not None:
+            subnet = self.snapshot.getSubnet(instance.get('SubnetId'))
+            subnets = [subnet] if subnet is not None else []
+        else:
+            results = self.ec2Client.describe_subnets(
+                SubnetIds = [instance.get('SubnetId')]
+            )
+            subnets = results.get('Subnets')
         
-        for subnet in results.get('Subnets'):
+        for subnet in subnets:
             if subnet.get('MapPublicIpOnLaunch'):
                 self.results['EC2SubnetAutoPublicIP'] = [-1, subnet.get('SubnetId')]
         
@@ -422,42 +451,14 @@ class Ec2Instance(Evaluator):
             self.results['EC2HasTag'] = [-1, '']
         return
     
-    def checkInstanceTypeAvailable(self, instanceType):
-        resp = self.ec2Client.describe_instance_type_offerings(
-            LocationType='region',
-            Filters=[
-                {
-                    'Name': 'instance-type',
-                    'Values': [
-                        instanceType,
-                    ]
-                },
-                {
-                    'Name': 'location',
-                    'Values': [
-                        self.ec2Client.meta.region_name,
-                    ]
-                }
-            ]
-        )
-        if len(resp['InstanceTypeOfferings']) > 0:
-            return True
-    
     def _checkEC2AMD(self):
         osType = self.getII('platform')
         if osType == 'linux':
             return
         
-        instanceArr = aws_parseInstanceFamily(self.ec2InstanceData['InstanceType'], region=self.ec2Client.meta.region_name)
-        prefixDetail = instanceArr['prefixDetail']
-
-        if 'a' not in prefixDetail['attributes']:
-            amdInstanceType = prefixDetail['family'] + prefixDetail['version'] + 'a.' + instanceArr['suffix']
-            nextVersion = str(int(prefixDetail['version']) + 1)
-            nextVerInstanceType = prefixDetail['family'] + nextVersion + 'a.' + instanceArr['suffix']
-            
-            if self.checkInstanceTypeAvailable(amdInstanceType) or self.checkInstanceTypeAvailable(nextVerInstanceType):
-                self.results['EC2AMD'] = [-1, self.ec2InstanceData['InstanceType']]
+        catalog = InstanceTypeCatalog.get(self.ec2Client.meta.region_name)
+        if catalog.getAmdAlternative(self.ec2InstanceData['InstanceType']) is not None:
+            self.results['EC2AMD'] = [-1, self.ec2InstanceData['InstanceType']]
                 
         return
     
@@ -466,16 +467,9 @@ class Ec2Instance(Evaluator):
         if osType != 'linux':
             return
         
-        instanceArr = aws_parseInstanceFamily(self.ec2InstanceData['InstanceType'], region=self.ec2Client.meta.region_name)
-        prefixDetail = instanceArr['prefixDetail']
-
-        if 'g' not in prefixDetail['attributes']:
-            gInstanceType = prefixDetail['family'] + prefixDetail['version'] + 'g.' + instanceArr['suffix']
-            nextVersion = str(int(prefixDetail['version']) + 1)
-            nextVerInstanceType = prefixDetail['family'] + nextVersion + 'g.' + instanceArr['suffix']
-            
-            if self.checkInstanceTypeAvailable(gInstanceType) or self.checkInstanceTypeAvailable(nextVerInstanceType):
-                self.results['EC2Graviton'] = [-1, self.ec2InstanceData['InstanceType']]
+        catalog = InstanceTypeCatalog.get(self.ec2Client.meta.region_name)
+        if catalog.getGravitonAlternative(self.ec2InstanceData['InstanceType']) is not None:
+            self.results['EC2Graviton'] = [-1, self.ec2InstanceData['InstanceType']]
                 
         return
     
@@ -1,5 +1,6 @@
 import botocore
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.ecs.drivers.EcsCluster import EcsCluster
 from services.ecs.drivers.EcsService import EcsService
@@ -9,7 +10,7 @@ class Ecs(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.ecsClient = ssBoto.client('ecs', config=self.bConfig)
+        self.ecsClient = ClientFactory.getClient(ssBoto, 'ecs', config=self.bConfig)
         
     def getClusters(self):
         clusters = []
@@ -53,6 +54,7 @@ class Ecs(Service):
             
             obj = EcsCluster(cluster, self.ecsClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"Cluster::{cluster_name}"] = obj.getInfo()
             del obj
             
@@ -64,6 +66,7 @@ class Ecs(Service):
                 
                 obj = EcsService(service, cluster, self.ecsClient)
                 obj.run(self.__class__)
+                obj.finalize()
                 objs[f"Service::{cluster_name}/{service_name}"] = obj.getInfo()
                 del obj
         
@@ -4,6 +4,8 @@ import boto3
 # from botocore.config import Config
 from services.Service import Service
 from utils.Config import Config as Config_int
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 
 from services.efs.drivers.EfsDriver import EfsDriver
 
@@ -14,11 +16,10 @@ class Efs(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.efs_client = ssBoto.client('efs', config=self.bConfig)
+        self.efs_client = ClientFactory.getClient(ssBoto, 'efs', config=self.bConfig)
 
     def get_resources(self):
-        resources = self.efs_client.describe_file_systems()
-        results = resources['FileSystems']
+        results = Paginator.list(self.efs_client, 'describe_file_systems', 'FileSystems')
 
         if not self.tags:
             return results
@@ -40,6 +41,7 @@ class Efs(Service):
                 _pi('EFS', efs['FileSystemId'])
                 obj = globals()[driver](efs, self.efs_client)
                 obj.run(self.__class__)
+                obj.finalize()
 
                 objs['EFS::' + efs['FileSystemId']] = obj.getInfo()
                 del obj
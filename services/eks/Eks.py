@@ -5,6 +5,8 @@ import botocore
 
 from botocore.config import Config as AWSConfig
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from services.Service import Service
 from services.eks.drivers.EksCommon import EksCommon
 
@@ -15,22 +17,12 @@ class Eks(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.eksClient = ssBoto.client('eks', config=self.bConfig)
-        self.ec2Client = ssBoto.client('ec2', config=self.bConfig)
-        self.iamClient = ssBoto.client('iam')
+        self.eksClient = ClientFactory.getClient(ssBoto, 'eks', config=self.bConfig)
+        self.ec2Client = ClientFactory.getClient(ssBoto, 'ec2', config=self.bConfig)
+        self.iamClient = ClientFactory.getClient(ssBoto, 'iam')
         
     def getClusters(self):
-        arr = []
-        results = self.eksClient.list_clusters()
-        arr = results.get('clusters')
-        
-        while results.get('nextToken') is not None:
-            results = self.eksClient.list_clusters(
-                nextToken = results.get('nextToken')
-            )
-            arr = arr + results.get('clusters')
-        
-        return arr
+        return Paginator.list(self.eksClient, 'list_clusters', 'clusters')
         
     def describeCluster(self, clusterName):
         response = self.eksClient.describe_cluster(
@@ -59,6 +51,7 @@ class Eks(Service):
             
             obj = EksCommon(cluster, clusterInfo, self.eksClient, self.ec2Client, self.iamClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs['Cluster::' + cluster] = obj.getInfo()
             
         return objs
@@ -3,6 +3,8 @@ import botocore
 from packaging.version import Version
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from utils.Tools import _pr, aws_get_latest_instance_generations
 from services.Service import Service
 from services.elasticache.drivers.ElasticacheMemcached import ElasticacheMemcached
@@ -16,26 +18,13 @@ class Elasticache(Service):
     def __init__(self, region) -> None:
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.elasticacheClient = ssBoto.client('elasticache', config=self.bConfig)
+        self.elasticacheClient = ClientFactory.getClient(ssBoto, 'elasticache', config=self.bConfig)
 
     def getECClusterInfo(self):
         # list all Elasticahe clusters
         arr = []
         try:
-            while True:
-                if len(arr) == 0:
-                    # init
-                    resp = self.elasticacheClient.describe_cache_clusters(
-                        ShowCacheNodeInfo=True)
-                else:
-                    # subsequent
-                    resp = self.elasticacheClient.describe_cache_clusters(
-                        ShowCacheNodeInfo=True, Marker=resp.get('Marker'))
-
-                arr.extend(resp.get('CacheClusters'))
-
-                if resp.get('Marker') is None:
-                    break
+            arr = Paginator.list(self.elasticacheClient, 'describe_cache_clusters', 'CacheClusters', ShowCacheNodeInfo=True)
         except botocore.exceptions.ClientError as e:
             # print out error to console for now
             print(e)
@@ -53,7 +42,7 @@ class Elasticache(Service):
             tag = self.elasticacheClient.list_tags_for_resource(ResourceName=detail['ARN'])
             nTag = tag.get('TagList')
             if self.resourceHasTags(nTag):
-                finalArr.append(arr[i])
+                finalArr.append(detail)
                 
         return finalArr    
 
@@ -79,25 +68,13 @@ class Elasticache(Service):
     def getAllInstanceOfferings(self) -> Dict[str, Set[str]]:
         offering = {}
 
-        while True:
-            if len(offering) == 0:
-                # init
-                resp = self.elasticacheClient.describe_reserved_cache_nodes_offerings()
+        for i in Paginator.paginate(self.elasticacheClient, 'describe_reserved_cache_nodes_offerings', 'ReservedCacheNodesOfferings'):
+            if i.get('ProductDescription') not in offering.keys():
+                offering[i.get('ProductDescription')] = set(
+                    [i.get('CacheNodeType')])
             else:
-                # subsequent
-                resp = self.elasticacheClient.describe_reserved_cache_nodes_offerings(
-                    Marker=resp.get('Marker'))
-
-            for i in resp.get('ReservedCacheNodesOfferings'):
-                if i.get('ProductDescription') not in offering.keys():
-                    offering[i.get('ProductDescription')] = set(
-                        [i.get('CacheNodeType')])
-                else:
-                    offering[i.get('ProductDescription')].add(
-                        i.get('CacheNodeType'))
-
-            if resp.get('Marker') is None:
-                break
+                offering[i.get('ProductDescription')].add(
+                    i.get('CacheNodeType'))
 
         return offering
 
@@ -108,14 +85,7 @@ class Elasticache(Service):
         return ({k: aws_get_latest_instance_generations(v) for (k, v) in families.items()})
 
     def getReplicationGroupInfo(self):
-        results = self.elasticacheClient.describe_replication_groups()
-        
-        arr = results.get("ReplicationGroups")
-        while results.get("Marker") is not None:
-            results = self.elasticacheClient.describe_replication_groups(
-                Marker=results.get("Marker")
-            )
-            arr = arr + results.get("ReplicationGroups")
+        arr = Paginator.list(self.elasticacheClient, 'describe_replication_groups', 'ReplicationGroups')
         
         fArr = []    
         for i, detail in enumerate(arr):
@@ -130,7 +100,7 @@ class Elasticache(Service):
             tag = self.elasticacheClient.list_tags_for_resource(ResourceName=detail['ARN'])
             nTag = tag.get('TagList')
             if self.resourceHasTags(nTag):
-                finalArr.append(arr[i])
+                finalArr.append(detail)
         
         return finalArr
 
@@ -139,28 +109,16 @@ class Elasticache(Service):
         replicationGroupId = set()
         last_updated = {}
         try:
-            while True:
-                if len(replicationGroupId) == 0:
-                    # init
-                    resp = self.elasticacheClient.describe_snapshots()
-                else:
-                    # subsequent
-                    resp = self.elasticacheClient.describe_snapshots(
-                        Marker=resp.get('Marker'))
-
-                for i in resp.get('Snapshots'):
-                    if i['ReplicationGroupId'] not in replicationGroupId:
-                        replicationGroupId.add(i['ReplicationGroupId'])
+            for i in Paginator.paginate(self.elasticacheClient, 'describe_snapshots', 'Snapshots'):
+                if i['ReplicationGroupId'] not in replicationGroupId:
+                    replicationGroupId.add(i['ReplicationGroupId'])
+                    last_updated[i['ReplicationGroupId']
+                                 ] = i['NodeSnapshots'][0]['SnapshotCreateTime']
+
+                for j in i['NodeSnapshots']:
+                    if j['SnapshotCreateTime'] > last_updated[i['ReplicationGroupId']]:
                         last_updated[i['ReplicationGroupId']
-                                     ] = i['NodeSnapshots'][0]['SnapshotCreateTime']
-
-                    for j in i['NodeSnapshots']:
-                        if j['SnapshotCreateTime'] > last_updated[i['ReplicationGroupId']]:
-                            last_updated[i['ReplicationGroupId']
-                                         ] = j['NodeSnapshot']['SnapshotCreateTime']
-
-                if resp.get('Marker') is None:
-                    break
+                                     ] = j['NodeSnapshot']['SnapshotCreateTime']
         except botocore.exceptions.ClientError as e:
             # print out error to console for now
             print(e)
@@ -175,6 +133,7 @@ class Elasticache(Service):
             _pi("ElastiCache::ReplicationGroup", group.get('ReplicationGroupId'))
             obj = ElasticacheReplicationGroup(group, self.elasticacheClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"ElastiCache::{group.get('ReplicationGroupId')}"] = obj.getInfo()
         
         self.cluster_info = self.getECClusterInfo()
@@ -201,6 +160,7 @@ class Elasticache(Service):
                 objName = cluster.get('Engine') + f"{cluster.get('ARN')}"
                 _pi("ElastiCache:" + cluster.get('Engine'), cluster.get('ARN'))
                 obj.run(self.__class__)
+                obj.finalize()
                 objs[objName] = obj.getInfo()
                 del obj
             else:
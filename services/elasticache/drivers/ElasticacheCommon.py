@@ -42,12 +42,12 @@ class ElasticacheCommon(Evaluator):
             self.results['DefaultParamGroup'] = [-1, ""]
 
     def _checkRInstanceFamily(self):
-        instance_type = self.cluster.get('CacheNodeType').lstrip('cache.')
+        instance_type = self.cluster.get('CacheNodeType').replace('cache.', '', 1)
         if instance_type[0] != 'r':
             self.results['RInstanceType'] = [-1, instance_type]
 
     def _checkLatestInstanceFamily(self):
-        instance_type = self.cluster.get('CacheNodeType').lstrip('cache.')
+        instance_type = self.cluster.get('CacheNodeType').replace('cache.', '', 1)
         if instance_type.split('.')[0] not in self.driver_info.get('latest_instances').get(self.cluster.get('Engine')):
             self.results['LatestInstance'] = [-1, instance_type]
 
@@ -3,6 +3,8 @@ from utils.Tools import _warn
 from botocore.exceptions import ClientError, EndpointConnectionError
 import boto3
 from services.Service import Service
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from services.guardduty.drivers.GuarddutyDriver import GuarddutyDriver
 
 from utils.Tools import _pi
@@ -12,12 +14,11 @@ class Guardduty(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.guardduty_client = ssBoto.client('guardduty', config=self.bConfig)
+        self.guardduty_client = ClientFactory.getClient(ssBoto, 'guardduty', config=self.bConfig)
 
     def get_resources(self):
         try:
-            results = self.guardduty_client.list_detectors()
-            detector_ids = results['DetectorIds']
+            detector_ids = Paginator.list(self.guardduty_client, 'list_detectors', 'DetectorIds')
         except ClientError as e:
             _warn("(Not showstopper: Services not available: {}".format(e))
             return []
@@ -30,5 +31,6 @@ class Guardduty(Service):
             _pi("GuardDuty", detector)
             obj = GuarddutyDriver(detector, self.guardduty_client, self.region)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"Detector::{detector}"] = obj.getInfo()
         return objs
\ No newline at end of file
@@ -1,11 +1,12 @@
-import botocore
-
 import json
-import time
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from utils.Tools import _pr
 from services.Service import Service
+from services.iam.IamSnapshot import IamSnapshot
+from services.iam.IamCredentialReport import IamCredentialReport
 from services.iam.drivers.IamRole import IamRole
 from services.iam.drivers.IamGroup import IamGroup
 from services.iam.drivers.IamUser import IamUser
@@ -18,54 +19,41 @@ class Iam(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.iamClient = ssBoto.client('iam', config=self.bConfig)
+        self.iamClient = ClientFactory.getClient(ssBoto, 'iam', config=self.bConfig)
+        self.snapshot = None
         
         self.awsClients = {
             'iamClient': self.iamClient,
-            'orgClient': ssBoto.client('organizations'),
-            'accClient': ssBoto.client('account', config=self.bConfig),
-            'sppClient': ssBoto.client('support', config=self.bConfig),
-            # 'gdClient': ssBoto.client('guardduty', config=self.bConfig),
-            'budgetClient': ssBoto.client('budgets', config=self.bConfig),
-            'curClient': ssBoto.client('cur', config=self.bConfig),
-            'ctClient': ssBoto.client('cloudtrail', config=self.bConfig)
+            'orgClient': ClientFactory.getClient(ssBoto, 'organizations'),
+            'accClient': ClientFactory.getClient(ssBoto, 'account', config=self.bConfig),
+            'sppClient': ClientFactory.getClient(ssBoto, 'support', config=self.bConfig),
+            # 'gdClient': ClientFactory.getClient(ssBoto, 'guardduty', config=self.bConfig),
+            'budgetClient': ClientFactory.getClient(ssBoto, 'budgets', config=self.bConfig),
+            'curClient': ClientFactory.getClient(ssBoto, 'cur', config=self.bConfig),
+            'ctClient': ClientFactory.getClient(ssBoto, 'cloudtrail', config=self.bConfig)
         }
     
     ## Groups has no TAG attribute
     ## Unable to implement "TAG" filter
     def getGroups(self):
-        arr = []
-        results = self.iamClient.list_groups()
-        arr = results.get('Groups')
-        
-        while results.get('Marker') is not None:
-            results = self.iamClient.list_groups(
-                Marker = results.get('Marker')
-            )
-            arr = arr + results.get('Groups')
-            
-        return arr
+        if self.snapshot is not None:
+            return self.snapshot.getGroups()
+        return Paginator.list(self.iamClient, 'list_groups', 'Groups')
+    
+    ## authorization details have no MaxSessionDuration, roles are still listed with list_roles
     
     def getRoles(self):
         arr = []
-        results = self.iamClient.list_roles()
-        for v in results.get('Roles'):
+        for v in Paginator.paginate(self.iamClient, 'list_roles', 'Roles'):
             if (v['Path'] != '/service-role/' and v['Path'][0:18] != '/aws-service-role/') and (self._roleFilterByName(v['RoleName'])):
                 arr.append(v)
-                
-        while results.get('Marker') is not None:
-            results = self.iamClient.list_roles(Marker=results.get('Marker'))
-            for v in results.get('Roles'):
-                if (v['Path'] != '/service-role/' and v['Path'][0:18] != '/aws-service-role/') and (self._roleFilterByName(v['RoleName'])):
-                    arr.append(v)
         
         if not self.tags:
             return arr
             
         finalArr = []
         for i, detail in enumerate(arr):
-            tag = self.iamClient.list_role_tags(RoleName=detail['RoleName'])
-            nTag = tag.get('Tags')
+            nTag = self.getTags('role', detail['RoleName'])
             if self.resourceHasTags(nTag):
                 finalArr.append(arr[i])
             
@@ -73,46 +61,14 @@ class Iam(Service):
         
     def getUsers(self):
         self.getUserFlag = True
-        arr = []
         
-        try: 
-            results = self.iamClient.get_credential_report()
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] == 'ReportNotPresent' or e.response['Error']['Code'] == 'ReportExpired':
-                resp = self.iamClient.generate_credential_report()
-                print('Generating IAM Credential Report...')
-                time.sleep(5)
-        
-        currCount = 0
-        MAX_LOOPS = 5
-        while not 'results' in locals() and currCount < MAX_LOOPS: 
-            try:
-                results = self.iamClient.get_credential_report()
-            except botocore.exceptions.ClientError as e:
-                currCount = currCount + 1
-                if e.response['Error']['Code'] == 'ReportInProgress':
-                    print('IAM Credential is still genererating, current counter: ' + str(currCount))
-                elif e.response['Error']['Code'] == 'ReportExpired':
-                    resp = self.iamClient.generate_credential_report()
-                    print('IAM Credential expired, regenerating... : ' + str(currCount))
-                else:
-                    print('Unexpected error: ', e.response['Error']['Code'])
-                    currCount = 10 #skip the loop entirely
-                time.sleep(5)
-        
-        if not 'results' in locals():
+        ## generation was requested before the pool started, see IamCredentialReport
+        content = IamCredentialReport.get(self.iamClient)
+        if content is None:
             print('IAM Users scan will be skip, unable to acquire IamCredentialReports')
             return []
         
-        rows = results.get('Content')
-        rows = rows.decode('UTF-8')
-        
-        row = rows.split("\n")
-        
-        fields = row[0].split(',')
-        del row[0]
-        for temp in row:
-            arr.append(dict(zip(fields, temp.split(','))))
+        arr = IamCredentialReport.parse(content)
         
         if not self.tags:
             return arr
@@ -123,37 +79,39 @@ class Iam(Service):
                 finalArr.append(arr[i])
                 continue
             
-            tag = self.iamClient.list_user_tags(UserName=detail['user'])
-            nTag = tag.get('Tags')
+            nTag = self.getTags('user', detail['user'])
             if self.resourceHasTags(nTag):
                 finalArr.append(arr[i])
             
             
         return finalArr
+    
+    def getTags(self, entityType, name):
+        if self.snapshot is not None:
+            tags = self.snapshot.getTags(entityType, name)
+            if tags is not None:
+                return tags
+        
+        if entityType == 'role':
+            tag = self.iamClient.list_role_tags(RoleName=name)
+        else:
+            tag = self.iamClient.list_user_tags(UserName=name)
+        return tag.get('Tags')
         
     def advise(self):
         objs = {}
         users = {}
         roles = {}
         
-        users = self.getUsers()
-        if self.getUserFlag == False:
-            return objs
-        
-        for user in users:
-            _pi('IAM::User', user['user'])
-            obj = IamUser(user, self.iamClient)
-            obj.run(self.__class__)
-            
-            identifier = "<b>root_id</b>" if user['user'] == "<root_account>" else user['user']
-            objs['User::' + identifier] = obj.getInfo()
-            del obj
+        self.snapshot = IamSnapshot.create(self.iamClient)
         
+        ## roles and groups first, the credential report keeps generating in the meantime
         roles = self.getRoles()
         for role in roles:
             _pi('IAM::Role', role['RoleName'])
-            obj = IamRole(role, self.iamClient)
+            obj = IamRole(role, self.iamClient, self.snapshot)
             obj.run(self.__class__)
+            obj.finalize()
             
             objs['Role::' + role['RoleName']] = obj.getInfo()
             del obj
@@ -161,15 +119,31 @@ class Iam(Service):
         groups = self.getGroups()
         for group in groups:
             _pi('IAM::Group', group['GroupName'])
-            obj = IamGroup(group, self.iamClient)
+            obj = IamGroup(group, self.iamClient, self.snapshot)
             obj.run(self.__class__)
+            obj.finalize()
             
             objs['Group::' + group['GroupName']] = obj.getInfo()
             del obj
         
+        users = self.getUsers()
+        if self.getUserFlag == False:
+            return objs
+        
+        for user in users:
+            _pi('IAM::User', user['user'])
+            obj = IamUser(user, self.iamClient, self.snapshot)
+            obj.run(self.__class__)
+            obj.finalize()
+            
+            identifier = "<b>root_id</b>" if user['user'] == "<root_account>" else user['user']
+            objs['User::' + identifier] = obj.getInfo()
+            del obj
+        
         _pi('IAM:Account')
         obj = IamAccount(None, self.awsClients, users, roles, self.ssBoto)
         obj.run(self.__class__)
+        obj.finalize()
         objs['Account::Config'] = obj.getInfo()
         
         return objs
@@ -0,0 +1,94 @@
+import io
+import csv
+import time
+import botocore
+
+from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+
+## One row of the IAM credential report
+## Rows share the header index and keep their values in a tuple, drivers read them like
+## the former dict rows: user['mfa_active']
+class IamCredentialRecord():
+    __slots__ = ('fields', 'values')
+
+    def __init__(self, fields, values):
+        self.fields = fields
+        self.values = values
+
+    def __getitem__(self, key):
+        return self.values[self.fields[key]]
+
+    def __contains__(self, key):
+        return key in self.fields
+
+    def get(self, key, defaultValue=None):
+        if key not in self.fields:
+            return defaultValue
+        return self.values[self.fields[key]]
+
+## Credential report is requested by main.py before the worker pool starts and only collected
+## once Iam has evaluated roles and groups, so generating it does not hold up the scan
+class IamCredentialReport():
+    POLL_SECONDS = 2
+    WAIT_SECONDS = 60
+
+    @staticmethod
+    def request(iamClient=None):
+        '''
+        start generating the report without waiting for it, return the report State
+        '''
+        if iamClient is None:
+            iamClient = ClientFactory.getClient(Config.get('ssBoto', None), 'iam')
+
+        try:
+            resp = iamClient.generate_credential_report()
+            return resp.get('State')
+        except botocore.exceptions.ClientError as e:
+            print('Unable to request IAM Credential Report, ' + e.response['Error']['Code'])
+            return None
+
+    @staticmethod
+    def get(iamClient):
+        '''
+        return the report content, None when it cannot be acquired
+        '''
+        waited = 0
+        requested = False
+        while True:
+            try:
+                return iamClient.get_credential_report().get('Content')
+            except botocore.exceptions.ClientError as e:
+                code = e.response['Error']['Code']
+                if code in ['ReportNotPresent', 'ReportExpired'] and requested == False:
+                    ## not requested before the pool, or expired in the meantime
+                    print('Generating IAM Credential Report...')
+                    IamCredentialReport.request(iamClient)
+                    requested = True
+                elif code not in ['ReportInProgress', 'ReportNotPresent', 'ReportExpired']:
+                    print('Unexpected error: ', code)
+                    return None
+
+            if waited >= IamCredentialReport.WAIT_SECONDS:
+                return None
+
+            time.sleep(IamCredentialReport.POLL_SECONDS)
+            waited += IamCredentialReport.POLL_SECONDS
+
+    @staticmethod
+    def parse(content):
+        '''
+        content: bytes of the CSV report, return [IamCredentialRecord]
+        '''
+        reader = csv.reader(io.StringIO(content.decode('UTF-8')))
+        header = next(reader, None)
+        if header is None:
+            return []
+
+        fields = {field: i for i, field in enumerate(header)}
+        records = []
+        for row in reader:
+            if not row:
+                continue
+            records.append(IamCredentialRecord(fields, tuple(row)))
+        return records
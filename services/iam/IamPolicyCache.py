@@ -0,0 +1,86 @@
+import os
+import json
+import hashlib
+
+import utils.Policy
+from utils.Config import Config
+from utils.WorkUnitScheduler import WorkUnitScheduler
+import constants as _C
+
+## Verdicts of managed policy analysis keyed by (PolicyArn, DefaultVersionId, analyzer)
+## A policy version is immutable, each distinct version is downloaded and parsed once per scan
+## no matter how many users, roles and groups it is attached to. Verdicts are written into the
+## scan unit dir for other workers, with --others '{"iamPolicyCache": 1}' they are also kept
+## under .cache/iampolicy and reused by later runs. The analyzer part is a hash of utils/Policy.py,
+## verdicts of a previous release are not reused once the analysis changes
+class IamPolicyCache():
+    verdicts = {}
+    analyzerVersion = None
+
+    @staticmethod
+    def getAnalyzerVersion():
+        if IamPolicyCache.analyzerVersion is None:
+            with open(utils.Policy.__file__, 'rb') as f:
+                IamPolicyCache.analyzerVersion = hashlib.md5(f.read()).hexdigest()
+        return IamPolicyCache.analyzerVersion
+
+    @staticmethod
+    def getKey(policyArn, versionId):
+        return hashlib.md5((policyArn + '::' + versionId + '::' + IamPolicyCache.getAnalyzerVersion()).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def getScanPath(key):
+        return WorkUnitScheduler.getUnitDir() + '/iampolicy.' + key + '.json'
+
+    @staticmethod
+    def getPersistentPath(key):
+        return _C.ROOT_DIR + '/.cache/iampolicy/' + key + '.json'
+
+    @staticmethod
+    def isPersistent():
+        return bool(Config.get('iamPolicyCache', False))
+
+    @staticmethod
+    def readFile(path):
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return None
+
+    @staticmethod
+    def writeFile(path, verdict):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.' + str(os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(verdict, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def get(policyArn, versionId):
+        '''
+        return {'fullAccessOneService': bool} or None when not analyzed yet
+        '''
+        key = IamPolicyCache.getKey(policyArn, versionId)
+        if key in IamPolicyCache.verdicts:
+            return IamPolicyCache.verdicts[key]
+
+        verdict = IamPolicyCache.readFile(IamPolicyCache.getScanPath(key))
+        if verdict is None and IamPolicyCache.isPersistent():
+            verdict = IamPolicyCache.readFile(IamPolicyCache.getPersistentPath(key))
+
+        if verdict is not None:
+            IamPolicyCache.verdicts[key] = verdict
+        return verdict
+
+    @staticmethod
+    def set(policyArn, versionId, verdict):
+        key = IamPolicyCache.getKey(policyArn, versionId)
+        IamPolicyCache.verdicts[key] = verdict
+
+        IamPolicyCache.writeFile(IamPolicyCache.getScanPath(key), verdict)
+        if IamPolicyCache.isPersistent():
+            IamPolicyCache.writeFile(IamPolicyCache.getPersistentPath(key), verdict)
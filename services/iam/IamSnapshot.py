@@ -0,0 +1,135 @@
+import botocore
+
+from utils.Paginator import Paginator
+
+## Account wide IAM authorization details, loaded with a few get_account_authorization_details pages
+## Users, roles and groups are indexed by name and ARN, managed policies by ARN with their default
+## version document. Iam service and its drivers read attachments, inline policy documents, tags,
+## group membership and RoleLastUsed from here instead of per entity IAM calls
+class IamSnapshot():
+    FILTERS = ['User', 'Role', 'Group', 'LocalManagedPolicy', 'AWSManagedPolicy']
+    PAGE_SIZE = 1000
+
+    ENTITY_KEYS = {
+        'user': ('UserName', 'UserPolicyList'),
+        'role': ('RoleName', 'RolePolicyList'),
+        'group': ('GroupName', 'GroupPolicyList')
+    }
+
+    def __init__(self, iamClient):
+        self.iamClient = iamClient
+        self.entities = {'user': {}, 'role': {}, 'group': {}}
+        self.arns = {}
+        self.policies = {}
+        self.groupUsers = {}
+
+    def load(self):
+        pages = Paginator.pages(self.iamClient, 'get_account_authorization_details', pageSize=self.PAGE_SIZE, Filter=self.FILTERS)
+        for page in pages:
+            for user in page.get('UserDetailList', []):
+                self.addEntity('user', user)
+                for groupName in user.get('GroupList', []):
+                    self.groupUsers.setdefault(groupName, []).append(user['UserName'])
+
+            for role in page.get('RoleDetailList', []):
+                self.addEntity('role', role)
+
+            for group in page.get('GroupDetailList', []):
+                self.addEntity('group', group)
+
+            for policy in page.get('Policies', []):
+                self.policies[policy['Arn']] = policy
+                self.arns[policy['Arn']] = policy
+
+        return self
+
+    @staticmethod
+    def create(iamClient):
+        '''
+        return None when the caller is not allowed to read the authorization details,
+        drivers then fall back to per entity calls
+        '''
+        try:
+            return IamSnapshot(iamClient).load()
+        except botocore.exceptions.ClientError as e:
+            print('IAM snapshot unavailable, ' + e.response['Error']['Code'] + ': ' + e.response['Error']['Message'])
+            return None
+
+    def addEntity(self, entityType, detail):
+        nameKey, _ = self.ENTITY_KEYS[entityType]
+        self.entities[entityType][detail[nameKey]] = detail
+        self.arns[detail['Arn']] = detail
+
+    def get(self, entityType, name):
+        return self.entities[entityType].get(name)
+
+    def getByArn(self, arn):
+        return self.arns.get(arn)
+
+    def getUser(self, userName):
+        return self.get('user', userName)
+
+    def getRole(self, roleName):
+        return self.get('role', roleName)
+
+    def getGroup(self, groupName):
+        return self.get('group', groupName)
+
+    def getRoles(self):
+        return list(self.entities['role'].values())
+
+    def getGroups(self):
+        return list(self.entities['group'].values())
+
+    def getTags(self, entityType, name):
+        detail = self.get(entityType, name)
+        if detail is None:
+            return None
+        return detail.get('Tags', [])
+
+    def getAttachedPolicies(self, entityType, name):
+        '''
+        same shape as list_attached_<entity>_policies AttachedPolicies
+        '''
+        detail = self.get(entityType, name)
+        if detail is None:
+            return None
+        return detail.get('AttachedManagedPolicies', [])
+
+    def getInlinePolicies(self, entityType, name):
+        '''
+        return {PolicyName: PolicyDocument}
+        '''
+        detail = self.get(entityType, name)
+        if detail is None:
+            return None
+
+        _, listKey = self.ENTITY_KEYS[entityType]
+        return {policy['PolicyName']: policy['PolicyDocument'] for policy in detail.get(listKey, [])}
+
+    def getGroupUsers(self, groupName):
+        if groupName not in self.entities['group']:
+            return None
+        return self.groupUsers.get(groupName, [])
+
+    def getUserGroups(self, userName):
+        detail = self.getUser(userName)
+        if detail is None:
+            return None
+        return detail.get('GroupList', [])
+
+    def getPolicy(self, policyArn):
+        return self.policies.get(policyArn)
+
+    def getPolicyDocument(self, policyArn):
+        '''
+        default version document of a managed policy, None when it is not part of the snapshot
+        '''
+        policy = self.getPolicy(policyArn)
+        if policy is None:
+            return None
+
+        for version in policy.get('PolicyVersionList', []):
+            if version.get('IsDefaultVersion'):
+                return version['Document']
+        return None
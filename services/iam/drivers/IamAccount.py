@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from dateutil.tz import tzlocal
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from utils.Tools import _warn, _pr
 from .IamCommon import IamCommon
  
@@ -195,7 +196,7 @@ class IamAccount(IamCommon):
                 continue
             
             conf = bConfig(region_name = region)
-            gdClient = ssBoto.client('guardduty', config=conf)
+            gdClient = ClientFactory.getClient(ssBoto, 'guardduty', config=conf)
         
             resp = gdClient.list_detectors()
             if 'DetectorIds' in resp:
@@ -290,7 +291,7 @@ class IamAccount(IamCommon):
                 continue
             
             conf = bConfig(region_name = region)
-            cfg = ssBoto.client('config', config=conf)
+            cfg = ClientFactory.getClient(ssBoto, 'config', config=conf)
             
             resp = cfg.describe_configuration_recorders()
             recorders = resp.get('ConfigurationRecorders')
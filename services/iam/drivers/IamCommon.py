@@ -7,6 +7,7 @@ import boto3
 
 from utils.Config import Config
 from utils.Policy import Policy
+from services.iam.IamPolicyCache import IamPolicyCache
 from services.Evaluator import Evaluator
 
 class IamCommon(Evaluator):
@@ -20,42 +21,101 @@ class IamCommon(Evaluator):
         datediff = datetime.today() - parse(dateTime).replace(tzinfo=None)
         return datediff.days
         
-    def evaluateManagePolicy(self, policies):
-        cachePrefix = 'iam::mpolicy::'
+    ## self.snapshot is the IamSnapshot given to the driver, None when it is unavailable
+    def getManagedPolicyVersionId(self, policyArn):
+        snapshot = self.snapshot
+        if snapshot is not None:
+            policy = snapshot.getPolicy(policyArn)
+            if policy is not None:
+                return policy['DefaultVersionId']
+        
+        versInfo = self.iamClient.get_policy(PolicyArn=policyArn)
+        vers = versInfo.get('Policy')
+        return vers['DefaultVersionId']
+    
+    def getManagedPolicyDocument(self, policyArn, verId):
+        snapshot = self.snapshot
+        if snapshot is not None:
+            doc = snapshot.getPolicyDocument(policyArn)
+            if doc is not None:
+                return doc
+
+        detail = self.iamClient.get_policy_version(
+            PolicyArn=policyArn,
+            VersionId=verId
+        )
+
+        doc = detail.get('PolicyVersion')
+        # doc = urllib.parse.unquote(doc['Document'])
+        return doc['Document']
+    
+    def analyzeManagedPolicy(self, policyArn):
+        '''
+        return the IamPolicyCache verdict of the default version, parsed once per version
+        '''
+        verId = self.getManagedPolicyVersionId(policyArn)
+        verdict = IamPolicyCache.get(policyArn, verId)
+        if verdict is not None:
+            return verdict
+        
+        pObj = Policy(self.getManagedPolicyDocument(policyArn, verId))
+        pObj.inspectAccess()
+        verdict = {
+            'fullAccessOneService': pObj.hasFullAccessToOneResource() == True
+        }
+        
+        IamPolicyCache.set(policyArn, verId, verdict)
+        return verdict
+    
+    def getInlinePolicyDocument(self, policy, identifier, entityType):
+        snapshot = self.snapshot
+        if snapshot is not None:
+            docs = snapshot.getInlinePolicies(entityType, identifier)
+            if docs is not None and policy in docs:
+                return docs[policy]
+        
+        if entityType == 'user':
+            resp = self.iamClient.get_user_policy(PolicyName=policy, UserName=identifier)
+        elif entityType == 'group':
+            resp = self.iamClient.get_group_policy(PolicyName=policy, GroupName=identifier)
+        else:
+            resp = self.iamClient.get_role_policy(PolicyName=policy, RoleName=identifier)
         
+        # doc = urllib.parse.unquote(doc)
+        return resp.get('PolicyDocument')
+    
+    def getEntityPolicies(self, identifier, entityType):
+        '''
+        return (attached managed policies, inline policy names), from the snapshot when possible
+        '''
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.get(entityType, identifier) is not None:
+            return snapshot.getAttachedPolicies(entityType, identifier), list(snapshot.getInlinePolicies(entityType, identifier).keys())
+        
+        c = self.iamClient
+        if entityType == 'user':
+            policies = c.list_attached_user_policies(UserName=identifier).get('AttachedPolicies')
+            inlinePolicies = c.list_user_policies(UserName=identifier).get('PolicyNames')
+        elif entityType == 'group':
+            policies = c.list_attached_group_policies(GroupName=identifier).get('AttachedPolicies')
+            inlinePolicies = c.list_group_policies(GroupName=identifier).get('PolicyNames')
+        else:
+            policies = c.list_attached_role_policies(RoleName=identifier).get('AttachedPolicies')
+            inlinePolicies = c.list_role_policies(RoleName=identifier).get('PolicyNames')
+        
+        return policies, inlinePolicies
+        
+    def evaluateManagePolicy(self, policies):
         policyWithFullAccess = []
         if policies:
-            hasFullAccess = -1 # instead of false/true, easier handling on cache checking using !empty
             for policy in policies:
                 if policy['PolicyName'] == 'AdministratorAccess':
                     self.results['FullAdminAccess'] = [-1, 'AdministratorAccess']
                     continue
 
-                cache = Config.get(cachePrefix + policy['PolicyArn'], "")
-                if cache == 1:
-                    hasFullAccess = 1
+                verdict = self.analyzeManagedPolicy(policy['PolicyArn'])
+                if verdict['fullAccessOneService'] == True:
                     policyWithFullAccess.append(policy['PolicyName'])
-                    continue
-                else:
-                    versInfo = self.iamClient.get_policy(PolicyArn=policy['PolicyArn'])
-                    vers = versInfo.get('Policy')
-                    verId = vers['DefaultVersionId']
-
-                    detail = self.iamClient.get_policy_version(
-                        PolicyArn=policy['PolicyArn'],
-                        VersionId=verId
-                    )
-
-                    doc = detail.get('PolicyVersion')
-                    # doc = urllib.parse.unquote(doc['Document'])
-                    pObj = Policy(doc['Document'])
-                    pObj.inspectAccess()
-
-                    if pObj.hasFullAccessToOneResource() == True:
-                        hasFullAccess = 1
-                        policyWithFullAccess.append(policy['PolicyName'])
-                    
-            Config.set(cachePrefix + policy['PolicyArn'], hasFullAccess)
 
         if policyWithFullAccess:
             self.results['ManagedPolicyFullAccessOneServ'] = [-1, '<br>'.join(policyWithFullAccess)]
@@ -68,15 +128,7 @@ class IamCommon(Evaluator):
         inlinePoliciesWithAdminAccess = []
         inlinePoliciesWithFullAccess = []
         for policy in inlinePolicies:
-            if entityType == 'user':
-                resp = self.iamClient.get_user_policy(PolicyName=policy, UserName=identifier)
-            elif entityType == 'group':
-                resp = self.iamClient.get_group_policy(PolicyName=policy, GroupName=identifier)
-            else:
-                resp = self.iamClient.get_role_policy(PolicyName=policy, RoleName=identifier)
-            
-            doc = resp.get('PolicyDocument')
-            # doc = urllib.parse.unquote(doc)
+            doc = self.getInlinePolicyDocument(policy, identifier, entityType)
             
             pObj = Policy(doc)
             pObj.inspectAccess()
@@ -4,10 +4,11 @@ from dateutil.tz import tzlocal
 from .IamCommon import IamCommon
  
 class IamGroup(IamCommon):
-    def __init__(self, group, iamClient):
+    def __init__(self, group, iamClient, snapshot=None):
         super().__init__()
         self.group = group
         self.iamClient = iamClient
+        self.snapshot = snapshot
         self.__configPrefix = 'iam::group::'
 
         self._resourceName = group['GroupName']
@@ -16,18 +17,20 @@ class IamGroup(IamCommon):
         
     def _checkGroupHasUsers(self):
         group = self.group['GroupName']
-        resp = self.iamClient.get_group(GroupName = group)
-        users = resp.get('Users')
+        users = None
+        if self.snapshot is not None:
+            users = self.snapshot.getGroupUsers(group)
+        
+        if users is None:
+            resp = self.iamClient.get_group(GroupName = group)
+            users = resp.get('Users')
+        
         if len(users) == 0:
             self.results['groupEmptyUsers'] = [-1, 'No users']
             
     def _checkGroupPolicyPermission(self):
         group = self.group['GroupName']
-        results = self.iamClient.list_attached_group_policies(GroupName = group)
-        policies = results.get('AttachedPolicies')
+        policies, inlinePolicies = self.getEntityPolicies(group, 'group')
         self.evaluateManagePolicy(policies)
         
-        resp = self.iamClient.list_group_policies(GroupName = group)
-        inlinePolicies = resp.get('PolicyNames')
         self.evaluateInlinePolicy(inlinePolicies, group, 'group')
-        
\ No newline at end of file
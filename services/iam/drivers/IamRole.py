@@ -6,10 +6,11 @@ from .IamCommon import IamCommon
 class IamRole(IamCommon):
     MAXSESSIONDURATION = 3600
     MAXROLENOTUSEDDAYS = 14
-    def __init__(self, role, iamClient):
+    def __init__(self, role, iamClient, snapshot=None):
         super().__init__()
         self.role = role
         self.iamClient = iamClient
+        self.snapshot = snapshot
         self._configPrefix = 'iam::role::'
 
         self._resourceName = self.role['RoleName']
@@ -18,6 +19,12 @@ class IamRole(IamCommon):
         self.retrieveRoleDetail()
         
     def retrieveRoleDetail(self):
+        if self.snapshot is not None:
+            detail = self.snapshot.getRole(self.role['RoleName'])
+            if detail is not None:
+                self.role['RoleLastUsed'] = detail.get('RoleLastUsed', {})
+                return
+        
         c = self.iamClient
         result = c.get_role(RoleName=self.role['RoleName'])
         
@@ -58,12 +65,8 @@ class IamRole(IamCommon):
     def _checkRolePolicy(self):
         role = self.role['RoleName']
         ## Managed Policy
-        resp = self.iamClient.list_attached_role_policies(RoleName=role)
-        policies = resp.get('AttachedPolicies')
+        policies, inlinePolicies = self.getEntityPolicies(role, 'role')
         self.evaluateManagePolicy(policies)  ## code in iam_common.class.php
         
         ## Inline Policy
-        resp = self.iamClient.list_role_policies(RoleName=role)
-        inlinePolicies = resp.get('PolicyNames')
         self.evaluateInlinePolicy(inlinePolicies, role, 'role') 
-        
\ No newline at end of file
@@ -7,10 +7,11 @@ from .IamCommon import IamCommon
 class IamUser(IamCommon):
     ENUM_NO_INFO = ['not_supported', 'no_information']
     
-    def __init__(self, user, iamClient):
+    def __init__(self, user, iamClient, snapshot=None):
         super().__init__()
         self.user = user
         self.iamClient = iamClient
+        self.snapshot = snapshot
 
         self._resourceName = user['user']
         
@@ -55,8 +56,14 @@ class IamUser(IamCommon):
             return
         
         try:
-            resp = self.iamClient.list_groups_for_user(UserName = user)
-            groups = resp.get('Groups')
+            groups = None
+            if self.snapshot is not None:
+                groups = self.snapshot.getUserGroups(user)
+            
+            if groups is None:
+                resp = self.iamClient.list_groups_for_user(UserName = user)
+                groups = resp.get('Groups')
+            
             if not groups:
                 self.results['userNotUsingGroup'] = [-1, '-']
         except botocore.exceptions.ClientError as e:
@@ -69,13 +76,10 @@ class IamUser(IamCommon):
             
         ## Managed Policy   
         try:
-            resp = self.iamClient.list_attached_user_policies(UserName = user)
-            policies = resp.get('AttachedPolicies')
+            policies, inlinePolicies = self.getEntityPolicies(user, 'user')
             self.evaluateManagePolicy(policies) ## code in iam_common.class.php
             
             ## Inline Policy
-            resp = self.iamClient.list_user_policies(UserName = user)
-            inlinePolicies = resp.get('PolicyNames')
             self.evaluateInlinePolicy(inlinePolicies, user, 'user')
         except botocore.exceptions.ClientError as e:
             print(e.response['Error']['Code'], e.response['Error']['Message'])
@@ -2,6 +2,7 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.inspector.drivers.InspectorCommon import InspectorCommon
 
@@ -9,7 +10,7 @@ class Inspector(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.inspectorClient = ssBoto.client('inspector2', config=self.bConfig)
+        self.inspectorClient = ClientFactory.getClient(ssBoto, 'inspector2', config=self.bConfig)
         
     def getResources(self):
         arr = []
@@ -25,7 +26,7 @@ class Inspector(Service):
     
     def getAccountId(self):
         try:
-            sts = self.ssBoto.client('sts')
+            sts = ClientFactory.getClient(self.ssBoto, 'sts')
             return sts.get_caller_identity()['Account']
         except:
             return 'unknown'
@@ -36,6 +37,7 @@ class Inspector(Service):
         # Inspector is account-level service
         obj = InspectorCommon({}, self.inspectorClient, self.getAccountId())
         obj.run(self.__class__)
+        obj.finalize()
         objs['Inspector::Account'] = obj.getInfo()
         del obj
         
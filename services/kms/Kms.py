@@ -1,6 +1,8 @@
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from utils.Tools import _pr
 from services.Service import Service
 ##import drivers here
@@ -13,21 +15,14 @@ class Kms(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.kmsClient = ssBoto.client('kms', config=self.bConfig)
+        self.kmsClient = ClientFactory.getClient(ssBoto, 'kms', config=self.bConfig)
         self.kmsCustomerManagedKeys = []
     
     def getResources(self):
-        resp = self.kmsClient.list_keys(Limit=10)
-        self.checkKmsKey(resp)
-        NextMarker = resp.get('NextMarker')
-        while NextMarker != None:
-            resp = self.kmsClient.list_keys(Limit=10, Marker=NextMarker)
-            NextMarker = resp.get('NextMarker')
-            
-            self.checkKmsKey(resp)
+        self.checkKmsKey(Paginator.paginate(self.kmsClient, 'list_keys', 'Keys'))
         
-    def checkKmsKey(self, resp):
-        for key in resp['Keys']:
+    def checkKmsKey(self, keys):
+        for key in keys:
             res = self.kmsClient.describe_key(KeyId = key['KeyId'])
             metadata = res.get('KeyMetadata')
             if metadata['KeyManager'] != 'AWS':
@@ -48,14 +43,11 @@ class Kms(Service):
         objs = {}
         self.getResources()
         
-        for key in self.kmsCustomerManagedKeys:
+        def build(key):
             _pi('KMS', key['KeyId'] + ' (' + key['Arn'] +')')
-            
-            obj = KmsCommon(key, self.kmsClient)        
-            obj.run(self.__class__)
-            
-            objs[key['KeyId']] = obj.getInfo()
-            del obj
+            return key['KeyId'], KmsCommon(key, self.kmsClient)
+        
+        objs.update(self.runDrivers(self.kmsCustomerManagedKeys, build))
            
         return objs
     
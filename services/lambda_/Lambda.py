@@ -4,8 +4,11 @@ from botocore.exceptions import ClientError
 # import importlib
 
 from services.lambda_.drivers.LambdaCommon import LambdaCommon
+from services.lambda_.LambdaFunctionDetails import LambdaFunctionDetails
 from services.Service import Service
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 
 from utils.Tools import _pi
 
@@ -15,26 +18,12 @@ class Lambda(Service):
         self.region = region
         
         ssBoto = self.ssBoto
-        self.lambda_client = ssBoto.client("lambda", config=self.bConfig)
-        self.iam_client = ssBoto.client("iam", config=self.bConfig)
+        self.lambda_client = ClientFactory.getClient(ssBoto, "lambda", config=self.bConfig)
+        self.iam_client = ClientFactory.getClient(ssBoto, "iam", config=self.bConfig)
         self.tags = []
 
     def get_resources(self):
-        functions = []
-        next_token = None
-
-        while True:
-            if next_token:
-                response = self.lambda_client.list_functions(Marker=next_token)
-            else:
-                response = self.lambda_client.list_functions()
-
-            functions.extend(response["Functions"])
-
-            if "NextMarker" in response:
-                next_token = response["NextMarker"]
-            else:
-                break
+        functions = Paginator.list(self.lambda_client, 'list_functions', 'Functions')
 
         if not self.tags:
             return functions
@@ -65,20 +54,24 @@ class Lambda(Service):
                 role_count[role] = 0
             role_count[role] += 1
             func_role_map[lambda_function["FunctionArn"]] = role
+            LambdaCommon.register_metrics(Config.get('CWClient'), lambda_function)
 
-        for lambda_function in lambdas:
+        ## policy, URL, code signing and concurrency of every function, each distinct role once
+        details = LambdaFunctionDetails.load(self.lambda_client, lambdas)
+        role_errors = LambdaFunctionDetails.load_roles(self.iam_client, role_count.keys())
+
+        def build(lambda_function):
             driver = "lambda_common"
 
             try:
-                # module = importlib.import_module(f"drivers.{driver}")
-                # cls = getattr(module, driver)
                 _pi('Lambda', lambda_function['FunctionName'])
-                # obj = cls(lambda_function, self.lambda_client, self.iam_client, role_count)
-                obj = LambdaCommon(lambda_function, self.lambda_client, self.iam_client, role_count)
-                obj.run(self.__class__)
-                objs[f"Lambda::{lambda_function['FunctionName']}"] = obj.getInfo()
+                obj = LambdaCommon(lambda_function, self.lambda_client, self.iam_client, role_count, details[lambda_function['FunctionName']], role_errors)
+                return f"Lambda::{lambda_function['FunctionName']}", obj
             except (ImportError, AttributeError):
                 print(f"Failed to load driver {driver}")
+                return None
+
+        objs.update(self.runDrivers(lambdas, build))
 
         return objs
             
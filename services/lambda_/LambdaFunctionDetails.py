@@ -0,0 +1,72 @@
+import botocore
+from concurrent.futures import ThreadPoolExecutor
+
+## Per function data which list_functions does not return, fetched for all functions of the
+## region on a bounded thread pool. A ClientError is kept and raised again on access so the
+## LambdaCommon checks handle it exactly as when they called the API themselves
+class LambdaFunctionDetails():
+    MAX_WORKERS = 8
+
+    ## name: lambda client operation, called with FunctionName
+    CALLS = {
+        'policy': 'get_policy',
+        'url_configs': 'list_function_url_configs',
+        'code_signing': 'get_function_code_signing_config',
+        'concurrency': 'get_function_concurrency'
+    }
+
+    def __init__(self, function_name):
+        self.function_name = function_name
+        self.responses = {}
+        self.errors = {}
+
+    @staticmethod
+    def load(lambda_client, functions):
+        '''
+        functions: list_functions items, return {FunctionName: LambdaFunctionDetails}
+        '''
+        details = {function['FunctionName']: LambdaFunctionDetails(function['FunctionName']) for function in functions}
+
+        tasks = []
+        for function in functions:
+            for name in LambdaFunctionDetails.CALLS.keys():
+                ## code signing only applies to zip packages
+                if name == 'code_signing' and function['PackageType'] != 'Zip':
+                    continue
+                tasks.append((details[function['FunctionName']], name))
+
+        with ThreadPoolExecutor(max_workers=LambdaFunctionDetails.MAX_WORKERS) as executor:
+            list(executor.map(lambda task: task[0].fetch(lambda_client, task[1]), tasks))
+
+        return details
+
+    def fetch(self, lambda_client, name):
+        try:
+            resp = getattr(lambda_client, self.CALLS[name])(FunctionName=self.function_name)
+            resp.pop('ResponseMetadata', None)
+            self.responses[name] = resp
+        except botocore.exceptions.ClientError as e:
+            self.errors[name] = e
+
+    def get(self, name):
+        if name in self.errors:
+            raise self.errors[name]
+        return self.responses[name]
+
+    @staticmethod
+    def load_roles(iam_client, role_arns):
+        '''
+        return {role arn: None when the role exists, the ClientError of get_role otherwise}
+        each distinct role is looked up once
+        '''
+        role_arns = list(set(role_arns))
+
+        def get_role(role_arn):
+            try:
+                iam_client.get_role(RoleName=role_arn.split("/")[-1])
+                return None
+            except botocore.exceptions.ClientError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=LambdaFunctionDetails.MAX_WORKERS) as executor:
+            return dict(zip(role_arns, executor.map(get_role, role_arns)))
@@ -9,6 +9,8 @@ import boto3
 from utils.Config import Config
 from utils.Policy import Policy
 from services.Evaluator import Evaluator
+from utils.MetricStore import MetricStore
+from services.lambda_.LambdaFunctionDetails import LambdaFunctionDetails
 import constants as _C
 
 class LambdaCommon(Evaluator):
@@ -29,13 +31,26 @@ class LambdaCommon(Evaluator):
     RUNTIME_PATH = _C.BOTOCORE_DIR + '/data/lambda/2015-03-31/service-2.json'
     CW_HISTORY_DAYS = [30, 7]
 
-    def __init__(self, lambda_, lambda_client, iam_client, role_count):
+    ## runtime family -> latest version as a tuple, e.g. {"python": (3, 13)}, built once per process
+    runtime_table = None
+
+    ## details: LambdaFunctionDetails, role_errors: {role arn: get_role ClientError or None}
+    ## both are prepared by Lambda.advise for all functions, fetched for this function alone when not given
+    def __init__(self, lambda_, lambda_client, iam_client, role_count, details=None, role_errors=None):
         self.lambda_ = lambda_
         self.function_name = lambda_['FunctionName']
         self.role_count = role_count
         self.lambda_client = lambda_client
         self.iam_client = iam_client
 
+        if details is None:
+            details = LambdaFunctionDetails.load(lambda_client, [lambda_])[self.function_name]
+        self.details = details
+
+        if role_errors is None:
+            role_errors = LambdaFunctionDetails.load_roles(iam_client, [lambda_['Role']])
+        self.role_errors = role_errors
+
         self._resourceName = self.function_name
 
         self.results = {}
@@ -47,25 +62,32 @@ class LambdaCommon(Evaluator):
         role_name = array[-1]
         return role_name
 
+    @staticmethod
+    def get_invocation_params(function_name, day):
+        return {
+            'Dimensions': [
+                {
+                    'Name': 'FunctionName',
+                    'Value': function_name
+                }
+            ],
+            'Namespace': 'AWS/Lambda',
+            'MetricName': 'Invocations',
+            'StartTime': datetime.utcnow() - timedelta(days=day),
+            'EndTime': datetime.utcnow(),
+            'Period': day * 24 * 60 * 60,
+            'Statistics': ['SampleCount']
+        }
+
+    ## Queue the invocation counts into the region MetricStore, fetched in GetMetricData batches
+    @staticmethod
+    def register_metrics(cw_client, lambda_function):
+        for day in LambdaCommon.CW_HISTORY_DAYS:
+            MetricStore.register(cw_client, **LambdaCommon.get_invocation_params(lambda_function['FunctionName'], day))
+
     def get_invocation_count(self, day):
         cw_client = Config.get('CWClient')
-
-        dimensions = [
-            {
-                'Name': 'FunctionName',
-                'Value': self.function_name
-            }
-        ]
-
-        results = cw_client.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/Lambda',
-            MetricName='Invocations',
-            StartTime=datetime.utcnow() - timedelta(days=day),
-            EndTime=datetime.utcnow(),
-            Period=day * 24 * 60 * 60,
-            Statistics=['SampleCount']
-        )
+        results = MetricStore.getMetricStatistics(cw_client, **LambdaCommon.get_invocation_params(self.function_name, day))
 
         if not results['Datapoints']:
             return 0
@@ -82,9 +104,7 @@ class LambdaCommon(Evaluator):
     
     def _check_function_url_in_used_and_auth(self):
         try:
-            url_config = self.lambda_client.list_function_url_configs(
-                FunctionName=self.function_name
-            )
+            url_config = self.details.get('url_configs')
             if url_config['FunctionUrlConfigs']:
                 self.results['lambdaURLInUsed'] = [-1, "Enabled"]
 
@@ -98,14 +118,9 @@ class LambdaCommon(Evaluator):
         return
 
     def _check_missing_role(self):
-        role_arn = self.lambda_['Role']
-        role_name = self.get_arn_role_name(role_arn)
-
-        try:
-            role = self.iam_client.get_role(
-                RoleName=role_name
-            )
-        except botocore.exceptions.ClientError as e:
+        ## roles shared by many functions are looked up once by Lambda.advise
+        e = self.role_errors.get(self.lambda_['Role'])
+        if e is not None:
             if e.response['Error']['Code'] == 'NoSuchEntity':
                 self.results['lambdaMissingRole'] = [-1, '']
             else:
@@ -116,9 +131,7 @@ class LambdaCommon(Evaluator):
         if self.lambda_['PackageType'] != 'Zip':
             return
         try:
-            code_sign = self.lambda_client.get_function_code_signing_config(
-                FunctionName=self.function_name
-            )
+            code_sign = self.details.get('code_signing')
             if not code_sign.get('CodeSigningConfigArn'):
                 self.results['lambdaCodeSigningDisabled'] = [-1, 'Disabled']
         except botocore.exceptions.ClientError as e:
@@ -127,11 +140,8 @@ class LambdaCommon(Evaluator):
         return
 
     def _check_dead_letter_queue_disabled(self):
-        config = self.lambda_client.get_function_configuration(
-            FunctionName=self.function_name
-        )
-
-        if not config.get('DeadLetterConfig'):
+        ## list_functions already returns the function configuration
+        if not self.lambda_.get('DeadLetterConfig'):
             self.results['lambdaDeadLetterQueueDisabled'] = [-1, 'Disabled']
 
         return
@@ -153,9 +163,7 @@ class LambdaCommon(Evaluator):
         return
 
     def _check_provisioned_concurrency(self):
-        concurrency = self.lambda_client.get_function_concurrency(
-            FunctionName=self.function_name
-        )
+        concurrency = self.details.get('concurrency')
 
         if not concurrency.get('ReservedConcurrentExecutions'):
             self.results['lambdaReservedConcurrencyDisabled'] = [-1, 'Disabled']
@@ -173,10 +181,65 @@ class LambdaCommon(Evaluator):
             self.results['lambdaRoleReused'] = [-1, self.lambda_['Role']]
         return
     
-    ## <TODO>
-    ## Cache the runtime_version and enum instead of looping everytime
+    @staticmethod
+    def get_runtime_family(runtime):
+        '''
+        return (family, version) e.g. nodejs20.x -> ('nodejs', (20,)), None for custom and unknown runtimes
+        '''
+        for prefix in LambdaCommon.CUSTOM_RUNTIME_PREFIX:
+            if runtime.startswith(prefix):
+                return None
+
+        for prefix in LambdaCommon.RUNTIME_PREFIX:
+            if not runtime.startswith(prefix):
+                continue
+
+            replace_arr = [prefix]
+            if prefix in ['go', 'nodejs']:
+                replace_arr.append('.x')
+            if prefix == 'nodejs':
+                replace_arr.append('-edge')
+
+            version = runtime
+            for item in replace_arr:
+                version = version.replace(item, '')
+
+            ## compared as (major, minor) so python3.12 is newer than python3.9
+            try:
+                return prefix, tuple([int(part) for part in version.split('.')]) if version != '' else (0,)
+            except ValueError:
+                return None
+
+        return None
+
+    @staticmethod
+    def get_runtime_table():
+        '''
+        {family: latest version} from the botocore Runtime enum, None when the model is not found
+        '''
+        if LambdaCommon.runtime_table is None:
+            if not os.path.exists(LambdaCommon.RUNTIME_PATH):
+                return None
+
+            with open(LambdaCommon.RUNTIME_PATH, 'r') as f:
+                arr = json.load(f)
+
+            table = {}
+            for option in arr['shapes']['Runtime']['enum']:
+                parsed = LambdaCommon.get_runtime_family(option)
+                if parsed is None:
+                    continue
+
+                family, version = parsed
+                if family not in table or table[family] < version:
+                    table[family] = version
+            LambdaCommon.runtime_table = table
+
+        return LambdaCommon.runtime_table
+
     def _check_runtime(self):
-        if not os.path.exists(self.RUNTIME_PATH):
+        table = self.get_runtime_table()
+        if table is None:
             print("Skipped runtime version check due to unable to locate runtime option path")
             return
         
@@ -184,54 +247,18 @@ class LambdaCommon(Evaluator):
         if self.lambda_['PackageType'] != 'Zip':
             return
 
-        arr = Config.get('lambdaRunTimeList', False)
-        if arr == False:
-            with open(self.RUNTIME_PATH, 'r') as f:
-                arr = json.load(f)
-                
-            Config.set('lambdaRunTimeList', arr)
-
-        runtime = self.lambda_['Runtime']
-
-        runtime_prefix = ''
-        runtime_version = ''
-
-        for prefix in self.CUSTOM_RUNTIME_PREFIX:
-            if runtime.startswith(prefix):
-                return
-
-        for prefix in self.RUNTIME_PREFIX:
-            if runtime.startswith(prefix):
-                runtime_prefix = prefix
-
-                replace_arr = [runtime_prefix]
-                if prefix in ['go', 'nodejs']:
-                    replace_arr.append('.x')
-                if prefix == 'nodejs':
-                    replace_arr.append('-edge')
+        parsed = self.get_runtime_family(self.lambda_['Runtime'])
+        if parsed is None:
+            return
 
-                runtime_version = runtime
-                for item in replace_arr:
-                    runtime_version = runtime_version.replace(item, '')
-                break
+        runtime_family, runtime_version = parsed
 
         # skip java check
-        if runtime_prefix == 'java':
+        if runtime_family == 'java':
             return
 
-        for option in arr['shapes']['Runtime']['enum']:
-            if not option.startswith(runtime_prefix):
-                continue
-            else:
-                option_version = option
-                for item in replace_arr:
-                    option_version = option_version.replace(item, '')
-                if option_version == '':
-                    option_version = 0
-
-                if float(option_version) > float(runtime_version):
-                    self.results['lambdaRuntimeUpdate'] = [-1, runtime]
-                    return
+        if table.get(runtime_family, runtime_version) > runtime_version:
+            self.results['lambdaRuntimeUpdate'] = [-1, self.lambda_['Runtime']]
 
         return
     
@@ -248,9 +275,7 @@ class LambdaCommon(Evaluator):
     
     def _check_function_public_access(self):
         try:
-            results = self.lambda_client.get_policy(
-                FunctionName=self.function_name
-            )
+            results = self.details.get('policy')
         except botocore.exceptions.ClientError as e:
             if e.response['Error']['Code'] == 'ResourceNotFoundException':
                 return
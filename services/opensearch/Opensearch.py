@@ -1,6 +1,7 @@
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from utils.Tools import _pr
 from services.Service import Service
 ##import drivers here
@@ -13,8 +14,8 @@ class Opensearch(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.osClient = ssBoto.client('opensearch', config=self.bConfig)
-        self.cwClient = ssBoto.client('cloudwatch', config=self.bConfig)
+        self.osClient = ClientFactory.getClient(ssBoto, 'opensearch', config=self.bConfig)
+        self.cwClient = ClientFactory.getClient(ssBoto, 'cloudwatch', config=self.bConfig)
         
         # o = Config.get('stsInfo')
     
@@ -52,6 +53,7 @@ class Opensearch(Service):
             
             obj = OpensearchCommon(self.bConfig, domain_name, domain['info'], self.osClient, self.cwClient)
             obj.run(self.__class__)
+            obj.finalize()
             
             #objs["OpenSearch::Common"] = obj.getInfo()
             objs["OpenSearch::" + domain_name] = obj.getInfo()
@@ -2,6 +2,7 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.paymentcryptography.drivers.PaymentcryptographyCommon import PaymentcryptographyCommon
 
@@ -9,7 +10,7 @@ class Paymentcryptography(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.paymentCryptoClient = ssBoto.client('payment-cryptography', config=self.bConfig)
+        self.paymentCryptoClient = ClientFactory.getClient(ssBoto, 'payment-cryptography', config=self.bConfig)
         
     def getResources(self):
         arr = []
@@ -29,6 +30,7 @@ class Paymentcryptography(Service):
             # Create a placeholder for account-level checks
             obj = PaymentcryptographyCommon({}, self.paymentCryptoClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs['PaymentCrypto::Account'] = obj.getInfo()
             del obj
         else:
@@ -37,6 +39,7 @@ class Paymentcryptography(Service):
                 print('... (PaymentCryptography) inspecting ' + key_id)
                 obj = PaymentcryptographyCommon(key, self.paymentCryptoClient)
                 obj.run(self.__class__)
+                obj.finalize()
                 objs[f"PaymentCrypto::{key_id}"] = obj.getInfo()
                 del obj
         
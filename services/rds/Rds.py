@@ -1,8 +1,13 @@
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
+from utils.CostExplorerCache import CostExplorerCache
 from utils.Tools import _pr, _warn, _pi
 from services.Service import Service
+from services.rds.RdsCatalog import RdsCatalog
+from services.rds.RdsSnapshotIndex import RdsSnapshotIndex
 ##import drivers here
 from services.rds.drivers.RdsCommon import RdsCommon
 from services.rds.drivers.RdsMysql import RdsMysql
@@ -28,12 +33,12 @@ class Rds(Service):
         super().__init__(region)
         
         ssBoto = self.ssBoto
-        self.rdsClient = ssBoto.client('rds', config=self.bConfig)
-        self.ec2Client = ssBoto.client('ec2', config=self.bConfig)
-        self.ctClient = ssBoto.client('cloudtrail', config=self.bConfig)
-        self.smClient = ssBoto.client('secretsmanager', config=self.bConfig)
-        self.cwClient = ssBoto.client('cloudwatch', config=self.bConfig)
-        self.ceClient = ssBoto.client('ce', config=self.bConfig)
+        self.rdsClient = ClientFactory.getClient(ssBoto, 'rds', config=self.bConfig)
+        self.ec2Client = ClientFactory.getClient(ssBoto, 'ec2', config=self.bConfig)
+        self.ctClient = ClientFactory.getClient(ssBoto, 'cloudtrail', config=self.bConfig)
+        self.smClient = ClientFactory.getClient(ssBoto, 'secretsmanager', config=self.bConfig)
+        self.cwClient = ClientFactory.getClient(ssBoto, 'cloudwatch', config=self.bConfig)
+        self.ceClient = ClientFactory.getClient(ssBoto, 'ce', config=self.bConfig)
         self.setChartsType(self.CHARTSTYPE)
         
         self.secrets = []
@@ -49,19 +54,11 @@ class Rds(Service):
     }
     
     def getResources(self):
-        p = {}
-        
-        results = self.rdsClient.describe_db_instances(**p)
-        
-        arr = results.get('DBInstances')
-        while results.get('Maker') is not None:
-            p['Maker'] = results.get('Maker')
-            results = self.rdsClient.describe_db_instances(**p)
-            arr = arr + results.get('DBInstances')
-        
-        for k, v in enumerate(arr):
+        arr = []
+        for v in Paginator.paginate(self.rdsClient, 'describe_db_instances', 'DBInstances'):
             if v['DBInstanceStatus'].lower() in ['deleting', 'failed', 'restore-error', 'failed'] or v['DBInstanceStatus'].lower().startswith('incompatible'):
-                del arr[k]
+                continue
+            arr.append(v)
         
         if not self.tags:
             return arr
@@ -74,15 +71,7 @@ class Rds(Service):
         return finalArr    
         
     def getClusters(self):
-        p = {}
-        results = self.rdsClient.describe_db_clusters(**p)
-        
-        arr = results.get('DBClusters')
-        while results.get('Maker') is not None:
-            p['Maker'] = results.get('Maker')
-            results = self.rdsClient.describe_db_clusters(**p)
-            
-            arr = arr + results.get('DBClusters')
+        arr = Paginator.list(self.rdsClient, 'describe_db_clusters', 'DBClusters')
 
         if not self.tags:
             return arr
@@ -95,21 +84,11 @@ class Rds(Service):
         return finalArr
             
     def getSecrets(self):
-        p = {"IncludePlannedDeletion": False, "MaxResults": 10}
-        
-        results = self.smClient.list_secrets(**p)
-        self.registerSecrets(results)
-        
-        NextToken = results.get('NextToken')
-        while NextToken != None:
-            p['NextToken'] = NextToken
-            results = self.smClient.list_secrets(**p)
-            NextToken = results.get('NextToken')
+        secrets = Paginator.paginate(self.smClient, 'list_secrets', 'SecretList', IncludePlannedDeletion=False)
+        self.registerSecrets(secrets)
             
-            self.registerSecrets(results)
-            
-    def registerSecrets(self, results):
-        for secret in results.get('SecretList'):
+    def registerSecrets(self, secrets):
+        for secret in secrets:
             if self.tags:
                 if not 'Tags' in secret:
                     print('Tags not supported in this region: [{}], ignoring tags filter'.format(self.region))
@@ -129,11 +108,12 @@ class Rds(Service):
 
         if self.hasCEPermission == True:
             try:
-                response = self.ceClient.get_cost_and_usage(
+                ## grouped by REGION as well so every region reuses the same account level query
+                response = CostExplorerCache.call(self.ceClient, 'get_cost_and_usage',
                     TimePeriod={"Start": str(startDate), "End": str(endDate)},
                     Granularity="MONTHLY",
                     Metrics=["UnblendedCost"],
-                    GroupBy=[{"Type": "DIMENSION", "Key": groupBy}],
+                    GroupBy=[{"Type": "DIMENSION", "Key": groupBy}, {"Type": "DIMENSION", "Key": "REGION"}],
                     Filter=filter,
                 )
             except botocore.exceptions.ClientError as e:
@@ -148,12 +128,7 @@ class Rds(Service):
     
     def getRDSCost(self, dimension, unuse_group=[]):
         results = {}
-        filter = {
-            "And": [
-                {"Dimensions": {"Key": "SERVICE", "Values": ["Amazon Relational Database Service"]}},
-                {"Dimensions": {"Key": "REGION", "Values": [self.region]}}
-            ]
-        }
+        filter = {"Dimensions": {"Key": "SERVICE", "Values": ["Amazon Relational Database Service"]}}
         response = self.getCEResults(dimension, filter)
         if response == {}:
             return results
@@ -161,8 +136,8 @@ class Rds(Service):
         for item in response.get('ResultsByTime'):
             for group in item.get("Groups"):
                 if 'Keys' in group:
-                    key = group.get("Keys")[0]
-                    if key in unuse_group:
+                    key, region = group.get("Keys")
+                    if region != self.region or key in unuse_group:
                         continue
                     amt = group.get("Metrics").get("UnblendedCost").get("Amount")
                     if float(amt) == 0:
@@ -205,7 +180,16 @@ class Rds(Service):
         clusters = self.getClusters()
 
         groupedResources = instances + clusters
+
+        ## Prefetch CloudWatch metrics of all instances and clusters in GetMetricData batches
+        for instance in groupedResources:
+            RdsCommon.registerMetrics(self.cwClient, instance)
+        
+        ## Parameter groups, engine versions and orderable classes shared by the drivers
+        RdsCatalog.get(self.rdsClient).prefetch(groupedResources)
+        snapshotIndex = RdsSnapshotIndex(self.rdsClient).load(groupedResources)
         
+        engineDbs = []
         for instance in groupedResources:
             dbKey = 'DBClusterIdentifier'
             dbInfo = 'Cluster'
@@ -236,17 +220,23 @@ class Rds(Service):
             driver_ = self.engineDriver[engine]
             driver = 'Rds' + driver_
             if driver in globals():
-                obj = globals()[driver](instance, self.rdsClient, self.ctClient, self.cwClient)
-                obj.setEngine(engine)
-                obj.run(self.__class__)
-                
-                objs[instance['Engine'] + '::' + dbInfo + '=' + instance[dbKey]] = obj.getInfo()
-                del obj
+                engineDbs.append((instance, dbInfo, dbKey, engine, driver))
+        
+        ## engine drivers run concurrently, findings keep the instances and clusters order
+        def build(item):
+            instance, dbInfo, dbKey, engine, driver = item
+            obj = globals()[driver](instance, self.rdsClient, self.ctClient, self.cwClient)
+            obj.setEngine(engine)
+            obj.setSnapshotIndex(snapshotIndex)
+            return instance['Engine'] + '::' + dbInfo + '=' + instance[dbKey], obj
+        
+        objs.update(self.runDrivers(engineDbs, build))
         
         for sg, rdsList in securityGroupArr.items():
             _pi('RDS-SG', sg)
             obj = RdsSecurityGroup(sg, self.ec2Client, rdsList)
             obj.run(self.__class__)
+            obj.finalize()
             objs['RDS_SG::' + sg] = obj.getInfo()
             del obj
 
@@ -255,12 +245,14 @@ class Rds(Service):
             _pi('SecretsManager', secret['Name'])
             obj = RdsSecretsManager(secret, self.smClient, self.ctClient)
             obj.run(self.__class__)
+            obj.finalize()
             
             objs['SecretsManager::'+ secret['Name']] = obj.getInfo()
             del obj
         
         obj = RdsSecretsVsDB(len(self.secrets), len(instances))
         obj.run(self.__class__)
+        obj.finalize()
         objs['SecretsRDS::General'] = obj.getInfo()
         del obj
         
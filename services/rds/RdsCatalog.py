@@ -0,0 +1,120 @@
+import botocore
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.Paginator import Paginator
+
+## Region scoped RDS reference data shared by every RDS driver of the worker process
+## Parameter groups are keyed by (type, group name), engine versions by (engine, version) and
+## orderable instance classes by (engine, version). Rds.advise prefetches what its instances and
+## clusters need concurrently, drivers read from here and only fetch on a miss
+class RdsCatalog():
+    MAX_WORKERS = 4
+
+    catalogs = {}
+
+    def __init__(self, rdsClient):
+        self.rdsClient = rdsClient
+        self.parameters = {}
+        self.engineVersions = {}
+        self.orderableClasses = {}
+
+    @staticmethod
+    def get(rdsClient):
+        key = id(rdsClient)
+        if key in RdsCatalog.catalogs:
+            client, catalog = RdsCatalog.catalogs[key]
+            if client is rdsClient:
+                return catalog
+
+        catalog = RdsCatalog(rdsClient)
+        RdsCatalog.catalogs[key] = (rdsClient, catalog)
+        return catalog
+
+    def prefetch(self, dbs):
+        '''
+        dbs: describe_db_instances and describe_db_clusters items
+        '''
+        tasks = set()
+        for db in dbs:
+            engine, engineVersion = db['Engine'], db['EngineVersion']
+            if 'DBInstanceIdentifier' in db:
+                tasks.add((self.getParameters, ('instance', db['DBParameterGroups'][0]['DBParameterGroupName'])))
+                ## serverless instances have no orderable class to compare against
+                if 'serverless' not in db['DBInstanceClass']:
+                    tasks.add((self.getOrderableClasses, (engine, engineVersion)))
+            else:
+                tasks.add((self.getParameters, ('cluster', db['DBClusterParameterGroup'])))
+            tasks.add((self.getEngineVersion, (engine, engineVersion)))
+
+        if not tasks:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            futures = [executor.submit(fn, *args) for fn, args in tasks]
+            for future in futures:
+                try:
+                    future.result()
+                except botocore.exceptions.ClientError as e:
+                    ## the driver fetching it again reports the error on its own check
+                    pass
+
+    def getParameters(self, groupType, groupName):
+        '''
+        groupType: instance|cluster, return {ParameterName: ParameterValue} of modifiable parameters
+        '''
+        key = (groupType, groupName)
+        if key in self.parameters:
+            return self.parameters[key]
+
+        if groupType == 'instance':
+            params = Paginator.paginate(self.rdsClient, 'describe_db_parameters', 'Parameters', DBParameterGroupName=groupName)
+        else:
+            params = Paginator.paginate(self.rdsClient, 'describe_db_cluster_parameters', 'Parameters', DBClusterParameterGroupName=groupName)
+
+        arr = {}
+        for param in params:
+            if param['IsModifiable'] == 1 and 'ParameterValue' in param:
+                arr[param['ParameterName']] = param['ParameterValue']
+
+        self.parameters[key] = arr
+        return arr
+
+    def getEngineVersion(self, engine, engineVersion):
+        '''
+        describe_db_engine_versions detail, None when the version is no longer available
+        '''
+        key = (engine, engineVersion)
+        if key in self.engineVersions:
+            return self.engineVersions[key]
+
+        versions = self.rdsClient.describe_db_engine_versions(
+            Engine=engine,
+            EngineVersion=engineVersion
+        )
+        version = versions.get('DBEngineVersions')
+        self.engineVersions[key] = version[0] if version else None
+        return self.engineVersions[key]
+
+    def getOrderableClasses(self, engine, engineVersion):
+        key = (engine, engineVersion)
+        if key in self.orderableClasses:
+            return self.orderableClasses[key]
+
+        options = Paginator.paginate(self.rdsClient, 'describe_orderable_db_instance_options', 'OrderableDBInstanceOptions',
+            pageSize=1000,
+            Engine=engine,
+            EngineVersion=engineVersion
+        )
+        self.orderableClasses[key] = list(set([option['DBInstanceClass'] for option in options]))
+        return self.orderableClasses[key]
+
+    def getLatestGenerations(self, engine, engineVersion):
+        '''
+        return {family: latest generation} among the orderable classes, e.g. {'r': '7', 't': '4'}
+        '''
+        latest = {}
+        for instClass in self.getOrderableClasses(engine, engineVersion):
+            prefix = instClass.split('.')[1]
+            if prefix[0] not in latest or latest[prefix[0]] < prefix[1]:
+                latest[prefix[0]] = prefix[1]
+        return latest
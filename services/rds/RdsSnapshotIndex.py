@@ -0,0 +1,95 @@
+import botocore
+import datetime
+
+from utils.Paginator import Paginator
+
+## DB and cluster snapshots of the region, listed once and indexed by source identifier
+## Manual and automated snapshots come from one describe_db_snapshots and one
+## describe_db_cluster_snapshots pass, public ones from a public listing filtered on the
+## scanned identifiers. Rows keep their age in days and public flag precomputed.
+## A ClientError of either listing is kept and raised again by getSnapshots, so only the snapshot
+## checks report it
+class RdsSnapshotIndex():
+    ## identifiers per db-instance-id / db-cluster-id filter
+    FILTER_BATCH = 100
+
+    def __init__(self, rdsClient):
+        self.rdsClient = rdsClient
+        self.instanceSnapshots = {}
+        self.clusterSnapshots = {}
+        ## isCluster: ClientError
+        self.errors = {}
+
+    def load(self, dbs):
+        '''
+        dbs: describe_db_instances and describe_db_clusters items of the region
+        '''
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+        instanceIds = [db['DBInstanceIdentifier'] for db in dbs if 'DBInstanceIdentifier' in db]
+        clusterIds = list(set([db['DBClusterIdentifier'] for db in dbs if db.get('DBClusterIdentifier')]))
+
+        if instanceIds:
+            try:
+                publicArns = self.loadPublicArns('describe_db_snapshots', 'DBSnapshots', 'db-instance-id', instanceIds, 'DBSnapshotArn')
+                for snapshot in Paginator.paginate(self.rdsClient, 'describe_db_snapshots', 'DBSnapshots'):
+                    self.addRow(self.instanceSnapshots, snapshot['DBInstanceIdentifier'], snapshot['DBSnapshotIdentifier'], snapshot, snapshot['DBSnapshotArn'] in publicArns, now)
+            except botocore.exceptions.ClientError as e:
+                self.errors[False] = e
+
+        if clusterIds:
+            try:
+                publicArns = self.loadPublicArns('describe_db_cluster_snapshots', 'DBClusterSnapshots', 'db-cluster-id', clusterIds, 'DBClusterSnapshotArn')
+                for snapshot in Paginator.paginate(self.rdsClient, 'describe_db_cluster_snapshots', 'DBClusterSnapshots'):
+                    self.addRow(self.clusterSnapshots, snapshot['DBClusterIdentifier'], snapshot['DBClusterSnapshotIdentifier'], snapshot, snapshot['DBClusterSnapshotArn'] in publicArns, now)
+            except botocore.exceptions.ClientError as e:
+                self.errors[True] = e
+
+        for index in [self.instanceSnapshots, self.clusterSnapshots]:
+            for rows in index.values():
+                rows.sort(key=lambda row: row['ageInDays'], reverse=True)
+
+        return self
+
+    def loadPublicArns(self, operation, resultKey, filterName, identifiers, arnKey):
+        ## IncludePublic also lists other accounts' snapshots, only own snapshots listed later are flagged
+        arns = set()
+        for i in range(0, len(identifiers), self.FILTER_BATCH):
+            snapshots = Paginator.paginate(self.rdsClient, operation, resultKey,
+                SnapshotType = 'public',
+                IncludePublic = True,
+                Filters = [{'Name': filterName, 'Values': identifiers[i:i + self.FILTER_BATCH]}]
+            )
+            for snapshot in snapshots:
+                arns.add(snapshot[arnKey])
+        return arns
+
+    def addRow(self, index, identifier, snapshotId, snapshot, isPublic, now):
+        createTime = snapshot.get('SnapshotCreateTime')
+        if identifier not in index:
+            index[identifier] = []
+
+        index[identifier].append({
+            'SnapshotIdentifier': snapshotId,
+            'SnapshotType': snapshot.get('SnapshotType'),
+            'SnapshotCreateTime': createTime,
+            ## snapshots still being created have no SnapshotCreateTime yet
+            'ageInDays': (now - createTime).days if createTime else 0,
+            'isPublic': isPublic
+        })
+
+    def getSnapshots(self, identifier, isCluster=False, snapshotType=None):
+        '''
+        rows of the DB instance or cluster, oldest first
+        '''
+        if isCluster in self.errors:
+            raise self.errors[isCluster]
+
+        index = self.clusterSnapshots if isCluster else self.instanceSnapshots
+        rows = index.get(identifier, [])
+        if snapshotType is None:
+            return rows
+        return [row for row in rows if row['SnapshotType'] == snapshotType]
+
+    def getPublicSnapshots(self, identifier, isCluster=False):
+        return [row for row in self.getSnapshots(identifier, isCluster) if row['isPublic']]
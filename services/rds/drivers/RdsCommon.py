@@ -9,6 +9,9 @@ from utils.Tools import _pr
 from utils.Tools import aws_parseInstanceFamily
 from utils.Tools import _warn
 from services.Evaluator import Evaluator
+from utils.MetricStore import MetricStore
+from services.rds.RdsCatalog import RdsCatalog
+from services.rds.RdsSnapshotIndex import RdsSnapshotIndex
 
 class RdsCommon(Evaluator):
     def __init__(self, db, rdsClient, ctClient, cwClient):
@@ -19,8 +22,9 @@ class RdsCommon(Evaluator):
         self.cwClient = cwClient
         self.ctClient = ctClient
         self.certInfo = None
+        self.catalog = RdsCatalog.get(rdsClient)
+        self.snapshotIndex = None
         
-        self.__configPrefix = 'rds::' + db['Engine'] + '::' + db['EngineVersion'] + '::'
         self.isCluster = True
         if 'DBInstanceIdentifier' in db:
             self.isCluster = False
@@ -35,6 +39,48 @@ class RdsCommon(Evaluator):
 
         
         
+    @staticmethod
+    def getMetricParams(db, metric, window, period, statistics):
+        if 'DBInstanceIdentifier' in db:
+            dimensions = [{'Name': 'DBInstanceIdentifier', 'Value': db['DBInstanceIdentifier']}]
+        else:
+            dimensions = [{'Name': 'DBClusterIdentifier', 'Value': db['DBClusterIdentifier']}]
+
+        return {
+            'Dimensions': dimensions,
+            'Namespace': 'AWS/RDS',
+            'MetricName': metric,
+            'StartTime': int(time.time()) - window,
+            'EndTime': int(time.time()),
+            'Period': period,
+            'Statistics': statistics
+        }
+
+    ## Queue the metrics read by the _check methods into the region MetricStore, fetched in GetMetricData batches
+    @staticmethod
+    def registerMetrics(cwClient, db):
+        dayInSecond = 60*60*24
+        monthInSecond = dayInSecond*30
+        day7 = dayInSecond*7
+
+        queries = []
+        if 'DBInstanceIdentifier' not in db:
+            queries.append(('VolumeReadIOPs', monthInSecond, monthInSecond, ['Sum']))
+            queries.append(('VolumeWriteIOPs', monthInSecond, monthInSecond, ['Sum']))
+            queries.append(('VolumeBytesUsed', monthInSecond, monthInSecond, ['Maximum']))
+        else:
+            queries.append(('DatabaseConnections', day7, day7, ['Sum']))
+            if 'DBClusterIdentifier' not in db:
+                queries.append(('FreeStorageSpace', 300, 300, ['Average']))
+            if 'serverless' not in db['DBInstanceClass']:
+                queries.append(('CPUUtilization', monthInSecond, dayInSecond, ['Minimum', 'Maximum', 'Average']))
+                queries.append(('CPUUtilization', monthInSecond, monthInSecond, ['Minimum', 'Maximum', 'Average']))
+                queries.append(('FreeableMemory', dayInSecond, dayInSecond, ['Minimum', 'Maximum', 'Average']))
+                queries.append(('FreeableMemory', monthInSecond, monthInSecond, ['Minimum', 'Maximum', 'Average']))
+
+        for metric, window, period, statistics in queries:
+            MetricStore.register(cwClient, **RdsCommon.getMetricParams(db, metric, window, period, statistics))
+
     def setEngine(self, engine):
         self.engine = engine
         self.addII('engine', engine)
@@ -78,6 +124,15 @@ class RdsCommon(Evaluator):
         
         self.certInfo = myCert
         
+    def setSnapshotIndex(self, snapshotIndex):
+        self.snapshotIndex = snapshotIndex
+    
+    def getSnapshotIndex(self):
+        ## drivers created outside Rds.advise index their own snapshots only
+        if self.snapshotIndex is None:
+            self.snapshotIndex = RdsSnapshotIndex(self.rdsClient).load([self.db])
+        return self.snapshotIndex
+        
     def showInfo(self):
         identifier = self.db['DBInstanceIdentifier'] if self.isCluster == False else self.db['DBClusterIdentifier']
         print("Identifier: " + identifier + "\n")
@@ -102,73 +157,23 @@ class RdsCommon(Evaluator):
         engine = self.db['Engine']
         engineVersion = self.db['EngineVersion']
         
-        key = self.__configPrefix + 'engineVersions'
-        details = Config.get(key, {})
-        
-        if not details:
-            versions = self.rdsClient.describe_db_engine_versions(
-                Engine=engine,
-                EngineVersion=engineVersion
-            )
-            version = versions.get('DBEngineVersions')
-            if not version:
-                self.results['EngineVersionMinor'] = [-1, "**DEPRECIATED**"]
-                self.results['EngineVersionMajor'] = [-1, "**DEPRECIATED**"]
-                return
-            details = version[0]
-            Config.set(key, details)
+        details = self.catalog.getEngineVersion(engine, engineVersion)
+        if details is None:
+            self.results['EngineVersionMinor'] = [-1, "**DEPRECIATED**"]
+            self.results['EngineVersionMajor'] = [-1, "**DEPRECIATED**"]
+            return
         
         self.addII('EngineVersion', engineVersion)
         self.enginePatches = details
         
     def loadParameterInfo(self):
-        arr = {}
-        
+        ## parameter groups are shared by many instances, read once per region through RdsCatalog
         if self.isCluster == False:
             paramGroupName = self.db['DBParameterGroups'][0]['DBParameterGroupName']
-            results = self.rdsClient.describe_db_parameters(
-                DBParameterGroupName = paramGroupName
-            )
-
-            for param in results.get('Parameters'):
-                if param['IsModifiable'] == 1 and 'ParameterValue' in param:
-                    arr[param['ParameterName']] = param['ParameterValue']
-            
-            while results.get('Marker') is not None:
-                results = self.rdsClient.describe_db_parameters(
-                    DBParameterGroupName = paramGroupName,
-                    Marker = results.get('Marker')
-                )
-
-                for param in results.get('Parameters'):
-                    #__pr(param['ParameterName'] + ' = ' + param['ParameterValue'] + ' || ' + param['IsModifiable'])
-                    if param['IsModifiable'] == 1 and 'ParameterValue' in param:
-                        arr[param['ParameterName']] = param['ParameterValue']
-            
+            self.dbParams = self.catalog.getParameters('instance', paramGroupName)
         else: 
             paramGroupName = self.db['DBClusterParameterGroup']
-            results = self.rdsClient.describe_db_cluster_parameters(
-                DBClusterParameterGroupName = paramGroupName
-            )
-
-            for param in results.get('Parameters'):
-                if param['IsModifiable'] == 1 and 'ParameterValue' in param:
-                    arr[param['ParameterName']] = param['ParameterValue']
-            
-            while results.get('Marker') is not None:
-                results = self.rdsClient.describe_db_cluster_parameters(
-                    DBClusterParameterGroupName = paramGroupName,
-                    Marker = results.get('Marker')
-                )
-
-                for param in results.get('Parameters'):
-                    #__pr(param['ParameterName'] + ' = ' + param['ParameterValue'] + ' || ' + param['IsModifiable'])
-                    if param['IsModifiable'] == 1 and 'ParameterValue' in param:
-                        arr[param['ParameterName']] = param['ParameterValue']
-            
-
-        self.dbParams = arr
-        del arr
+            self.dbParams = self.catalog.getParameters('cluster', paramGroupName)
 
     ##Common Logic Belows
     ##All checks start from __check;
@@ -177,25 +182,12 @@ class RdsCommon(Evaluator):
             if self.db.get('DBClusterIdentifier', None) == None:
                 return
 
-            resp = self.rdsClient.describe_db_cluster_snapshots(
-                DBClusterIdentifier=self.db['DBClusterIdentifier'],
-                SnapshotType='public',
-                IncludePublic=True,
-                MaxRecords=20
-            )
-            publicSnapshots = resp.get('DBClusterSnapshots')
+            publicSnapshots = self.getSnapshotIndex().getPublicSnapshots(self.db['DBClusterIdentifier'], isCluster=True)
         else:
             if self.db.get('DBInstanceIdentifier', None) == None:
                 return
 
-            resp = self.rdsClient.describe_db_snapshots(
-                DBInstanceIdentifier=self.db['DBInstanceIdentifier'],
-                SnapshotType='public',
-                IncludePublic=True,
-                MaxRecords=20
-            )
-            
-            publicSnapshots = resp.get('DBSnapshots')
+            publicSnapshots = self.getSnapshotIndex().getPublicSnapshots(self.db['DBInstanceIdentifier'])
             
         if len(publicSnapshots) > 0:
             self.results['SnapshotRDSIsPublic'] = [-1, "At least " + str(len(publicSnapshots))]
@@ -319,49 +311,15 @@ class RdsCommon(Evaluator):
         if self.isCluster == True or self.isServerless == True:
             return
         
-        key = self.__configPrefix + 'orderableInstanceType'
-        instTypes = Config.get(key, [])
-        
-        if not instTypes:
-            try:
-                results = self.rdsClient.describe_orderable_db_instance_options(
-                    # DBInstanceClass = self.db['DBInstanceClass'],
-                    Engine = self.db['Engine'],
-                    EngineVersion = self.db['EngineVersion'],
-                    MaxRecords = 20
-                )
-                
-                arr = []
-                for instClass in results.get('OrderableDBInstanceOptions'):
-                    arr.append(instClass['DBInstanceClass'])
-                
-                while results.get('Marker') is not None:
-                    results = self.rdsClient.describe_orderable_db_instance_options(
-                        Engine = self.db['Engine'],
-                        EngineVersion = self.db['EngineVersion'],
-                        Marker = results.get('Marker')
-                    )
-                    
-                    for instClass in results.get('OrderableDBInstanceOptions'):
-                        arr.append(instClass['DBInstanceClass'])
-                
-                instTypes = list(set(arr))
-                Config.set(key, instTypes)
-                
-                compressedLists = {}
-                for instType in instTypes:
-                    temp = instType.split('.')
-                    compressedLists[temp[1][0]] = temp[1][1]
-                
-                Config.set(key + '::zip', compressedLists)
-            except self.rdsClient.exceptions as e:
-                _warn("Unable to identify potential latest engine version")
-                if e.getAwsErrorCode() == 'InvalidParameterCombination':
-                    self.results['LatestInstanceGeneration'] = [-1, '**DEPRECIATED**' + self.db['DBInstanceClass']]
-                self.results['LatestInstanceGeneration'] = [-1, '_ERROR_']
+        try:
+            compressedLists = self.catalog.getLatestGenerations(self.db['Engine'], self.db['EngineVersion'])
+        except botocore.exceptions.ClientError as e:
+            _warn("Unable to identify potential latest engine version")
+            if e.response['Error']['Code'] == 'InvalidParameterCombination':
+                self.results['LatestInstanceGeneration'] = [-1, '**DEPRECIATED**' + self.db['DBInstanceClass']]
                 return
-        else:
-            compressedLists = Config.get(key + '::zip')
+            self.results['LatestInstanceGeneration'] = [-1, '_ERROR_']
+            return
             
         dbInstClass = self.db['DBInstanceClass'].split('.')
         instInfo = self.instInfo
@@ -371,7 +329,7 @@ class RdsCommon(Evaluator):
         if dbInstFamily == 't':
             self.results['BurstableInstance'] = [-1, self.db['DBInstanceClass']]   
         
-        if compressedLists[dbInstFamily] > dbInstGeneration:
+        if compressedLists.get(dbInstFamily, dbInstGeneration) > dbInstGeneration:
             self.results['LatestInstanceGeneration'] = [-1, self.db['DBInstanceClass']]
     
     def _checkIsOpenSource(self):
@@ -440,49 +398,15 @@ class RdsCommon(Evaluator):
             
     def _checkOldSnapshots(self):
         if self.db.get('DBClusterIdentifier'):
-            identifier = self.db['DBClusterIdentifier']
-            result = self.rdsClient.describe_db_cluster_snapshots(
-                DBClusterIdentifier=identifier,
-                SnapshotType='manual'
-            )
-            
-            snapshots = result.get('DBClusterSnapshots')
-            while result.get('Marker') is not None:
-                result = self.rdsClient.describe_db_cluster_snapshots(
-                    DBClusterIdentifier=identifier,
-                    SnapshotType='manual',
-                    Marker=result.get('Marker')
-                )
-                
-                snapshots = snapshots + result.get('DBSnapshots')
+            snapshots = self.getSnapshotIndex().getSnapshots(self.db['DBClusterIdentifier'], isCluster=True, snapshotType='manual')
         else:
-            identifier = self.db['DBInstanceIdentifier']
-            result = self.rdsClient.describe_db_snapshots(
-                DBInstanceIdentifier=identifier,
-                SnapshotType='manual'
-            )
-            
-            snapshots = result.get('DBSnapshots')
-            while result.get('Marker') is not None:
-                result = self.rdsClient.describe_db_snapshots(
-                    DBInstanceIdentifier=identifier,
-                    SnapshotType='manual',
-                    Marker=result.get('Marker')
-                )
-                
-                snapshots = snapshots + result.get('DBSnapshots')
+            snapshots = self.getSnapshotIndex().getSnapshots(self.db['DBInstanceIdentifier'], snapshotType='manual')
         
         if not snapshots:
             return
-                
-        oldest_copy = snapshots[-1]
-        
-        oldest_copy_date = oldest_copy['SnapshotCreateTime']
-        
-        now = datetime.datetime.now(timezone.utc)
         
-        diff = now - oldest_copy_date
-        days = diff.days
+        ## rows are sorted oldest first
+        days = snapshots[0]['ageInDays']
         
         if len(snapshots) > 5:
             self.results['ManualSnapshotTooMany'] = [-1, len(snapshots)]
@@ -506,22 +430,8 @@ class RdsCommon(Evaluator):
             return
         else:
             metric = 'FreeStorageSpace'
-            dimensions = [
-                {
-                    'Name': 'DBInstanceIdentifier',
-                    'Value': self.db['DBInstanceIdentifier']
-                }
-            ]
     
-        results = cw_client.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/RDS',
-            MetricName=metric,
-            StartTime=int(time.time()) - 300,
-            EndTime=int(time.time()),
-            Period=300,
-            Statistics=['Average']
-        )
+        results = MetricStore.getMetricStatistics(cw_client, **RdsCommon.getMetricParams(self.db, metric, 300, 300, ['Average']))
     
         GBYTES = 1024 * 1024 * 1024
         dp = results['Datapoints']
@@ -539,25 +449,10 @@ class RdsCommon(Evaluator):
             return
         
         metric = 'DatabaseConnections'
-        dimensions = [
-            {
-                'Name': 'DBInstanceIdentifier',
-                'Value': self.db['DBInstanceIdentifier']
-            }   
-        ]
-        
         day7 = 60 * 60 * 24 * 7
         
         cw_client = self.cwClient
-        results = cw_client.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/RDS',
-            MetricName=metric,
-            StartTime=int(time.time()) - day7,
-            EndTime=int(time.time()),
-            Period=day7,
-            Statistics=['Sum']
-        )
+        results = MetricStore.getMetricStatistics(cw_client, **RdsCommon.getMetricParams(self.db, metric, day7, day7, ['Sum']))
         
         dp = results['Datapoints']
         if dp and dp[0]['Sum'] == 0:
@@ -577,38 +472,20 @@ class RdsCommon(Evaluator):
         metrics = ['VolumeReadIOPs', 'VolumeWriteIOPs']
         
         volumeMetric = 'VolumeBytesUsed'
-        dimensions = [
-            {
-                'Name': 'DBClusterIdentifier',
-                'Value': self.db['DBClusterIdentifier']
-            }
-        ]
         
         dayInSecond=(60*60*24)
         monthInSecond=dayInSecond*30
         
-        statsParams = {
-            'Dimensions':dimensions,
-            'Namespace':'AWS/RDS',
-            'StartTime':int(time.time()) - monthInSecond,
-            'EndTime':int(time.time()),
-            'Period':monthInSecond,
-            'Statistics':['Sum']
-        }
-        
         ioCnt = 0
         volumeSize = 0
         for metric in metrics:
-            statsParams['MetricName'] = metric
-            resp = cwClient.get_metric_statistics(**statsParams)
+            resp = MetricStore.getMetricStatistics(cwClient, **RdsCommon.getMetricParams(self.db, metric, monthInSecond, monthInSecond, ['Sum']))
             data = resp.get('Datapoints')
             
             if data:
                 ioCnt = ioCnt + int(data[0]['Sum'])/MILLION
             
-        statsParams['MetricName'] = volumeMetric
-        statsParams['Statistics'] = ['Maximum']
-        resp = cwClient.get_metric_statistics(**statsParams)
+        resp = MetricStore.getMetricStatistics(cwClient, **RdsCommon.getMetricParams(self.db, volumeMetric, monthInSecond, monthInSecond, ['Maximum']))
         data = resp.get('Datapoints')
         
         if data:
@@ -636,35 +513,13 @@ class RdsCommon(Evaluator):
         serverVCPU = self.instInfo['specification']['vcpu']
         
         metric = 'CPUUtilization'
-        dimensions = [
-            {
-                'Name': 'DBInstanceIdentifier',
-                'Value': self.db['DBInstanceIdentifier']
-            }    
-        ]
         
         dayInSecond=(60*60*24)
         monthInSecond=dayInSecond*30
-        resp = cwClient.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/RDS',
-            MetricName=metric,
-            StartTime=int(time.time()) - monthInSecond,
-            EndTime=int(time.time()),
-            Period=dayInSecond,
-            Statistics=['Minimum', 'Maximum', 'Average']
-        )
+        resp = MetricStore.getMetricStatistics(cwClient, **RdsCommon.getMetricParams(self.db, metric, monthInSecond, dayInSecond, ['Minimum', 'Maximum', 'Average']))
         dailyDp = resp.get('Datapoints')
         
-        resp = cwClient.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/RDS',
-            MetricName=metric,
-            StartTime=int(time.time()) - monthInSecond,
-            EndTime=int(time.time()),
-            Period=monthInSecond,
-            Statistics=['Minimum', 'Maximum', 'Average']
-        )
+        resp = MetricStore.getMetricStatistics(cwClient, **RdsCommon.getMetricParams(self.db, metric, monthInSecond, monthInSecond, ['Minimum', 'Maximum', 'Average']))
         monthDp = resp.get('Datapoints')
         if len(monthDp) == 0:
             return
@@ -706,26 +561,12 @@ class RdsCommon(Evaluator):
         
         cwClient = self.cwClient
         metric = 'FreeableMemory'
-        dimensions = [
-            {
-                'Name': 'DBInstanceIdentifier',
-                'Value': self.db['DBInstanceIdentifier']
-            }    
-        ]
         
         rawToGBRatio=1024*1024*1024
         
         ## Past 24 hours, might recovers back
         dayInSecond=(60*60*24)
-        resp = cwClient.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/RDS',
-            MetricName=metric,
-            StartTime=int(time.time()) - dayInSecond,
-            EndTime=int(time.time()),
-            Period=dayInSecond,
-            Statistics=['Minimum', 'Maximum', 'Average']
-        )
+        resp = MetricStore.getMetricStatistics(cwClient, **RdsCommon.getMetricParams(self.db, metric, dayInSecond, dayInSecond, ['Minimum', 'Maximum', 'Average']))
         
         dp = resp.get('Datapoints')
         if len(dp) == 0:
@@ -742,15 +583,7 @@ class RdsCommon(Evaluator):
         freeMemoryAvgRatio = freeMemoryAvg/serverGB
         
         monthInSecond = dayInSecond*30
-        resp = cwClient.get_metric_statistics(
-            Dimensions=dimensions,
-            Namespace='AWS/RDS',
-            MetricName=metric,
-            StartTime=int(time.time()) - monthInSecond,
-            EndTime=int(time.time()),
-            Period=monthInSecond,
-            Statistics=['Minimum', 'Maximum', 'Average']
-        )
+        resp = MetricStore.getMetricStatistics(cwClient, **RdsCommon.getMetricParams(self.db, metric, monthInSecond, monthInSecond, ['Minimum', 'Maximum', 'Average']))
         
         dp = resp.get('Datapoints')
         freeMemoryMthMin = dp[0]['Minimum'] / rawToGBRatio
@@ -3,6 +3,7 @@ import botocore
 import requests
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.redshift.drivers.RedshiftCluster import RedshiftCluster
 
@@ -12,7 +13,7 @@ class Redshift(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.rsClient = ssBoto.client('redshift', config=self.bConfig)
+        self.rsClient = ClientFactory.getClient(ssBoto, 'redshift', config=self.bConfig)
         
         self.redshifts = []
         return
@@ -66,6 +67,7 @@ class Redshift(Service):
             _pi('Redshift', cluster['ClusterIdentifier'])
             obj = RedshiftCluster(cluster, self.rsClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"Redshift::{cluster['ClusterIdentifier']}"] = obj.getInfo()
             del obj
         
@@ -3,6 +3,8 @@ import json
 import time
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.WorkUnitScheduler import WorkUnitScheduler
 from utils.Tools import _pr, _warn
 from services.Service import Service
 from botocore.config import Config as bConfig
@@ -11,10 +13,14 @@ from botocore.config import Config as bConfig
 from services.s3.drivers.S3Bucket import S3Bucket
 from services.s3.drivers.S3Control import S3Control
 from services.s3.drivers.S3Macie import S3Macie
+from services.s3.S3BucketRegions import S3BucketRegions
+from services.s3.S3BucketConfig import S3BucketConfig
 
 from utils.Tools import _pi
 
 class S3(Service):
+    BUCKET_BATCH = 50
+    
     def __init__(self, region):
         super().__init__(region)
         self.region = region
@@ -22,9 +28,9 @@ class S3(Service):
         # print(self.bConfig)
         
         ssBoto = self.ssBoto
-        self.s3Client = ssBoto.client('s3', config=self.bConfig)
-        self.s3Control = ssBoto.client('s3control', config=self.bConfig)
-        self.macieV2Client = ssBoto.client('macie2', config=self.bConfig)
+        self.s3Client = ClientFactory.getClient(ssBoto, 's3', config=self.bConfig)
+        self.s3Control = ClientFactory.getClient(ssBoto, 's3control', config=self.bConfig)
+        self.macieV2Client = ClientFactory.getClient(ssBoto, 'macie2', config=self.bConfig)
         
         # buckets = Config.get('s3::buckets', [])
     
@@ -33,32 +39,8 @@ class S3(Service):
         unableToListBucket = Config.get('s3::bucketUnableToList', False)
         if not buckets and not unableToListBucket:
             try:
-                buckets = {}
-                results = self.s3Client.list_buckets()
-                
-                arr = results.get('Buckets')
-                while results.get('Maker') is not None:
-                    results = self.s3Client.list_buckets(
-                        Maker = results.get('Maker')
-                    )    
-                    arr = arr + results.get('Buckets')
-                
-                # Sequential bucket location fetching (tool already uses multiprocessing)
-                for bucket in arr:
-                    try:
-                        loc = self.s3Client.get_bucket_location(Bucket=bucket['Name'])
-                        reg = loc.get('LocationConstraint') or 'us-east-1'
-                        
-                        if reg not in buckets:
-                            buckets[reg] = []
-                        buckets[reg].append(bucket)
-                    except Exception as e:
-                        print(f"Error getting location for {bucket['Name']}: {e}")
-                        # Default to us-east-1 on error
-                        if 'us-east-1' not in buckets:
-                            buckets['us-east-1'] = []
-                        buckets['us-east-1'].append(bucket)
-                
+                ## shared by the S3 work units of every region, see S3BucketRegions
+                buckets = S3BucketRegions.load(self.s3Client)
             except botocore.exceptions.ClientError as e:
                 Config.set('s3::bucketUnableToList', True)
                 ecode = e.response['Error']['Code']
@@ -91,31 +73,39 @@ class S3(Service):
     
     def advise(self):
         objs = {}
-        accountScanned = Config.get('S3_HasAccountScanned', False)
-        if accountScanned == False:
+        ## S3 runs as one work unit per region, account level checks only run in the first one
+        if WorkUnitScheduler.claimOnce('S3_HasAccountScanned'):
             _pi('S3Account')
             obj = S3Control(self.s3Control)
             obj.run(self.__class__)
+            obj.finalize()
             objs["Account::Control"] = obj.getInfo()
             
-            Config.set('S3_HasAccountScanned', True)
             del obj
         
         objs = {}
         buckets = self.getResources()
         
-        # Sequential processing (tool already uses multiprocessing at service level)
-        for bucket in buckets:
-            _pi('S3Bucket', bucket['Name'])
-            obj = S3Bucket(bucket['Name'], self.s3Client)
-            obj.run(self.__class__)
+        bucketRegions = {}
+        for region, arr in Config.get('s3::buckets', {}).items():
+            for bucket in arr:
+                bucketRegions[bucket['Name']] = region
+        
+        ## bucket configurations are fetched concurrently per batch, checks run from memory
+        for i in range(0, len(buckets), self.BUCKET_BATCH):
+            batch = [bucket['Name'] for bucket in buckets[i:i + self.BUCKET_BATCH]]
+            configs = S3BucketConfig.load(self.s3Client, batch, bucketRegions)
             
-            objs["Bucket::" + bucket['Name']] = obj.getInfo()
-            del obj
+            def build(name):
+                _pi('S3Bucket', name)
+                return "Bucket::" + name, S3Bucket(name, self.s3Client, configs[name])
+            
+            objs.update(self.runDrivers(batch, build))
         
         _pi('S3Macie')
         obj = S3Macie(self.macieV2Client)
         obj.run(self.__class__)
+        obj.finalize()
         objs["Macie"] = obj.getInfo()
         return objs
 
@@ -0,0 +1,139 @@
+import json
+import botocore
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.ClientFactory import ClientFactory
+
+## Bucket level configuration fetched ahead of the S3Bucket checks
+## S3BucketConfig.load runs every GetBucket* call needed by the checks for a batch of buckets on a
+## bounded thread pool. Expected "not configured" error codes are kept as empty values, other
+## errors are kept per call so the checks can tell both apart without calling S3 themselves
+class S3BucketConfig():
+    MAX_WORKERS = 16
+
+    ## name: (operation, extra params, error codes meaning "not configured")
+    CALLS = {
+        'encryption': ('get_bucket_encryption', {}, ['ServerSideEncryptionConfigurationNotFoundError']),
+        'publicAccessBlock': ('get_public_access_block', {}, ['NoSuchPublicAccessBlockConfiguration']),
+        'acl': ('get_bucket_acl', {}, ['NoSuchAcl']),
+        'policy': ('get_bucket_policy', {}, ['NoSuchBucketPolicy']),
+        'versioning': ('get_bucket_versioning', {}, []),
+        'objectLock': ('get_object_lock_configuration', {}, ['ObjectLockConfigurationNotFoundError']),
+        'replication': ('get_bucket_replication', {}, ['ReplicationConfigurationNotFoundError']),
+        'lifecycle': ('get_bucket_lifecycle', {}, ['NoSuchLifecycleConfiguration']),
+        'logging': ('get_bucket_logging', {}, []),
+        'notification': ('get_bucket_notification_configuration', {}, ['NoSuchNotificationConfiguration']),
+        ## check only first 10 objects for performance
+        'objects': ('list_objects_v2', {'MaxKeys': 10}, [])
+    }
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.responses = {}
+        self.errors = {}
+        self.policyJson = None
+        self.region = None
+        self.replicationTargetRegion = None
+
+    @staticmethod
+    def load(s3Client, buckets, bucketRegions={}):
+        '''
+        buckets: [bucketName], bucketRegions: {bucketName: region} of known buckets
+        return {bucketName: S3BucketConfig}
+        '''
+        configs = {bucket: S3BucketConfig(bucket) for bucket in buckets}
+        tasks = [(configs[bucket], name) for bucket in buckets for name in S3BucketConfig.CALLS.keys()]
+
+        ## all threads share s3Client, more of them than its pool connections would only wait on the pool
+        workers = min(S3BucketConfig.MAX_WORKERS, ClientFactory.getMaxPoolConnections())
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda task: task[0].fetch(s3Client, task[1]), tasks))
+
+            ## source and destination are usually account buckets with a known region, only look up the others
+            unknown = set()
+            for config in configs.values():
+                target = config.getReplicationTargetBucket()
+                if target is None:
+                    continue
+
+                for bucket in [config.bucket, target]:
+                    if bucket not in bucketRegions:
+                        unknown.add(bucket)
+
+            unknown = list(unknown)
+            regions = dict(bucketRegions)
+            regions.update(zip(unknown, executor.map(lambda bucket: S3BucketConfig.getBucketLocation(s3Client, bucket), unknown)))
+
+            for config in configs.values():
+                config.region = regions.get(config.bucket)
+                target = config.getReplicationTargetBucket()
+                if target is not None:
+                    config.replicationTargetRegion = regions.get(target)
+
+        return configs
+
+    @staticmethod
+    def getBucketLocation(s3Client, bucket):
+        try:
+            loc = s3Client.get_bucket_location(Bucket=bucket)
+            return loc.get('LocationConstraint') or 'us-east-1'
+        except botocore.exceptions.ClientError as e:
+            return None
+
+    def fetch(self, s3Client, name):
+        operation, params, notConfiguredCodes = self.CALLS[name]
+        try:
+            resp = getattr(s3Client, operation)(Bucket=self.bucket, **params)
+            resp.pop('ResponseMetadata', None)
+            self.responses[name] = resp
+        except botocore.exceptions.ClientError as e:
+            code = e.response['Error']['Code']
+            if code in notConfiguredCodes:
+                self.responses[name] = None
+            else:
+                self.errors[name] = code
+        except Exception as e:
+            ## one failing call must not fail the whole batch, the check reports it
+            self.errors[name] = type(e).__name__
+
+    def get(self, name):
+        '''
+        response of the call, None when it is not configured or failed
+        '''
+        return self.responses.get(name)
+
+    def isNotConfigured(self, name):
+        return name in self.responses and self.responses[name] is None
+
+    def hasError(self, name):
+        return name in self.errors
+
+    def getPolicy(self):
+        '''
+        bucket policy as a string, None when there is none
+        '''
+        resp = self.get('policy')
+        return resp['Policy'] if resp else None
+
+    def getPolicyJson(self):
+        '''
+        parsed once, None when there is no policy or it is not valid JSON
+        '''
+        if self.policyJson is None and self.getPolicy():
+            try:
+                self.policyJson = json.loads(self.getPolicy())
+            except json.JSONDecodeError:
+                return None
+        return self.policyJson
+
+    def getReplicationTargetBucket(self):
+        resp = self.get('replication')
+        if not resp:
+            return None
+
+        rules = resp.get('ReplicationConfiguration', {}).get('Rules', [])
+        if not rules:
+            return None
+
+        target = rules[0].get('Destination', {}).get('Bucket', '').split(':')[-1]
+        return target or None
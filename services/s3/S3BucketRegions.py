@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import botocore
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.Config import Config
+from utils.Paginator import Paginator
+from utils.WorkUnitScheduler import WorkUnitScheduler
+import constants as _C
+
+## Account buckets grouped by region, built once per scan from the BucketRegion returned by list_buckets
+## The first S3 work unit builds the map and writes it into the scan unit dir, units of other regions
+## read it from there. Buckets without BucketRegion fall back to get_bucket_location on a bounded
+## thread pool, resolved locations are kept under .cache/s3 since a bucket does not change region
+class S3BucketRegions():
+    MAX_WORKERS = 8
+    WAIT_SECONDS = 120
+    POLL_SECONDS = 0.5
+
+    @staticmethod
+    def getScanPath():
+        return WorkUnitScheduler.getUnitDir() + '/s3.buckets.json'
+
+    @staticmethod
+    def getLocationCachePath():
+        acctId = Config.get('stsInfo', {}).get('Account', 'default')
+        return _C.ROOT_DIR + '/.cache/s3/' + acctId + '/bucketRegions.json'
+
+    @staticmethod
+    def readFile(path):
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return None
+
+    @staticmethod
+    def writeFile(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.' + str(os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(s3Client):
+        '''
+        return {region: [bucket]}, raise the ClientError of list_buckets
+        '''
+        scanPath = S3BucketRegions.getScanPath()
+        entry = S3BucketRegions.readFile(scanPath)
+
+        if entry is None:
+            if WorkUnitScheduler.claimOnce('S3::BucketRegions'):
+                try:
+                    entry = {'buckets': S3BucketRegions.build(s3Client)}
+                except botocore.exceptions.ClientError as e:
+                    ## let units of other regions fail fast with the same error
+                    S3BucketRegions.writeFile(scanPath, {'operation': 'ListBuckets', 'error': e.response['Error']})
+                    raise
+                S3BucketRegions.writeFile(scanPath, entry)
+            else:
+                entry = S3BucketRegions.waitFor(scanPath)
+                if entry is None:
+                    entry = {'buckets': S3BucketRegions.build(s3Client)}
+
+        if 'error' in entry:
+            raise botocore.exceptions.ClientError({'Error': entry['error']}, entry['operation'])
+        return entry['buckets']
+
+    @staticmethod
+    def waitFor(path):
+        waited = 0
+        while waited < S3BucketRegions.WAIT_SECONDS:
+            entry = S3BucketRegions.readFile(path)
+            if entry is not None:
+                return entry
+
+            time.sleep(S3BucketRegions.POLL_SECONDS)
+            waited += S3BucketRegions.POLL_SECONDS
+
+        return None
+
+    @staticmethod
+    def build(s3Client):
+        arr = Paginator.list(s3Client, 'list_buckets', 'Buckets', tokenKeys=('ContinuationToken', 'ContinuationToken'))
+
+        locations = S3BucketRegions.readFile(S3BucketRegions.getLocationCachePath()) or {}
+        missing = [bucket['Name'] for bucket in arr if not bucket.get('BucketRegion') and bucket['Name'] not in locations]
+        if missing:
+            with ThreadPoolExecutor(max_workers=S3BucketRegions.MAX_WORKERS) as executor:
+                for name, region in zip(missing, executor.map(lambda name: S3BucketRegions.getBucketLocation(s3Client, name), missing)):
+                    if region is not None:
+                        locations[name] = region
+
+            ## only keep buckets which still exist
+            names = set([bucket['Name'] for bucket in arr])
+            S3BucketRegions.writeFile(S3BucketRegions.getLocationCachePath(), {name: region for name, region in locations.items() if name in names})
+
+        buckets = {}
+        for bucket in arr:
+            ## Default to us-east-1 when the location cannot be retrieved
+            reg = bucket.get('BucketRegion') or locations.get(bucket['Name']) or 'us-east-1'
+            if reg not in buckets:
+                buckets[reg] = []
+            buckets[reg].append(bucket)
+
+        return buckets
+
+    @staticmethod
+    def getBucketLocation(s3Client, name):
+        try:
+            loc = s3Client.get_bucket_location(Bucket=name)
+            return loc.get('LocationConstraint') or 'us-east-1'
+        except Exception as e:
+            print(f"Error getting location for {name}: {e}")
+            return None
@@ -2,39 +2,39 @@ import urllib.parse
 from datetime import date
 
 import boto3
-import botocore
-import json
 
-from utils.Config import Config
 from utils.Policy import Policy
 from services.Evaluator import Evaluator
+from services.s3.S3BucketConfig import S3BucketConfig
 
 class S3Bucket(Evaluator):
-    def __init__(self, bucket, s3Client):
+    ## bucketConfig: S3BucketConfig loaded by S3.advise for a batch of buckets
+    def __init__(self, bucket, s3Client, bucketConfig=None):
         super().__init__()
         self.bucket = bucket
         self.s3Client = s3Client
+        if bucketConfig is None:
+            bucketConfig = S3BucketConfig.load(s3Client, [bucket])[bucket]
+        self.bucketConfig = bucketConfig
 
         self._resourceName = bucket
         
         self.init()
 
-    def policyAllowsPublicRead(self, policy_document):
+    def policyAllowsPublicRead(self, policy):
         """
         Check if the policy allows public read access
         
         Args:
-            policy_document (str): The bucket policy as a string
+            policy (dict): The parsed bucket policy
         
         Returns:
             bool: True if policy allows public read access, False otherwise
         """
-        if not policy_document:
+        if not policy:
             return False
             
         try:
-            policy = json.loads(policy_document)
-            
             # Check for public read in policy
             for statement in policy['Statement']:
                 principal = statement.get('Principal', {})
@@ -47,25 +47,23 @@ class S3Bucket(Evaluator):
                     
             return False
             
-        except (json.JSONDecodeError, KeyError):
+        except KeyError:
             return False
     
-    def policyAllowsPublicWrite(self, policy_document):
+    def policyAllowsPublicWrite(self, policy):
         """
         Check if the policy allows public write access
         
         Args:
-            policy_document (str): The bucket policy as a string
+            policy (dict): The parsed bucket policy
         
         Returns:
             bool: True if policy allows public write access, False otherwise
         """
-        if not policy_document:
+        if not policy:
             return False
             
         try:
-            policy = json.loads(policy_document)
-            
             # Check for public write in policy
             for statement in policy['Statement']:
                 principal = statement.get('Principal', {})
@@ -78,19 +76,9 @@ class S3Bucket(Evaluator):
                     
             return False
             
-        except (json.JSONDecodeError, KeyError):
+        except KeyError:
             return False
 
-    def getBucketPolicy(self):
-        try:
-            policy = self.s3Client.get_bucket_policy(
-                Bucket=self.bucket
-            )
-            return policy['Policy']
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchBucketPolicy':
-                return None
-    
     def aclAllowsPublicRead(self, bucket_acl):
         acl_allows_public_read = False
         for grant in bucket_acl['Grants']:
@@ -109,46 +97,37 @@ class S3Bucket(Evaluator):
 
     def _checkEncrypted(self):
         self.results['ServerSideEncrypted'] = [1, 'On']
-        try:
-            resp = self.s3Client.get_bucket_encryption(
-                Bucket=self.bucket
-            )
+        resp = self.bucketConfig.get('encryption')
+        if resp:
             if "kms" not in resp.get('ServerSideEncryptionConfiguration').get('Rules')[0].get('ApplyServerSideEncryptionByDefault').get('SSEAlgorithm'):
                 self.results['SSEWithKMS'] = [1, 'On']
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] == 'ServerSideEncryptionConfigurationNotFoundError':
-                self.results['ServerSideEncrypted'] = [-1, 'Off']
+        elif self.bucketConfig.isNotConfigured('encryption'):
+            self.results['ServerSideEncrypted'] = [-1, 'Off']
 
     def _checkAccess(self):
         self.results['PublicAccessBlock'] = [1, 'On']
         
         public_policy_restricted = False
-        try:
-            resp = self.s3Client.get_public_access_block(
-                Bucket=self.bucket
-            )
+        if self.bucketConfig.isNotConfigured('publicAccessBlock'):
+            return
+        
+        resp = self.bucketConfig.get('publicAccessBlock')
+        if resp:
             public_policy_restricted = resp['PublicAccessBlockConfiguration']['RestrictPublicBuckets']
             for param, val in resp['PublicAccessBlockConfiguration'].items():
                 if val == False:
                    self.results['PublicAccessBlock'] = [-1, 'Off']
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchPublicAccessBlockConfiguration':
-                return
 
         public_acl_restricted = False
-        bucket_acl = None
-        try:
-            bucket_acl = self.s3Client.get_bucket_acl(
-                Bucket=self.bucket
-            )
+        bucket_acl = self.bucketConfig.get('acl')
+        if bucket_acl:
             self.results['AccessControlList'] = [-1, 'Enabled']
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchAcl':
-                public_acl_restricted = True
-                self.results['AccessControlList'] = [1, 'Disabled']
-                # Don't return - continue with public access checks
+        elif self.bucketConfig.isNotConfigured('acl'):
+            public_acl_restricted = True
+            self.results['AccessControlList'] = [1, 'Disabled']
+            # Don't return - continue with public access checks
 
-        policy = self.getBucketPolicy()    
+        policy = self.bucketConfig.getPolicyJson()
 
         # Check public read access (handle None bucket_acl)
         policy_blocks_read = not self.policyAllowsPublicRead(policy)
@@ -172,121 +151,84 @@ class S3Bucket(Evaluator):
         self.results['MFADelete'] = [-1, 'Off']
         self.results['BucketVersioning'] = [-1, 'Off']
         
-        try:
-            resp = self.s3Client.get_bucket_versioning(
-                Bucket=self.bucket
-            )
-            if resp.get('Status') == "MFADelete":
-                self.results['MFADelete'] = [1, 'On']
-            
-            if resp.get('Status') == "Enabled":
-                self.results['BucketVersioning'] = [1, 'On']
-        except botocore.exceptions.ClientError as e:
+        if self.bucketConfig.hasError('versioning'):
             print("[{}] Unable to get Bucket Versioning Informaton, skip".format(self.bucket))
+            return
+        
+        resp = self.bucketConfig.get('versioning')
+        if resp.get('Status') == "MFADelete":
+            self.results['MFADelete'] = [1, 'On']
+        
+        if resp.get('Status') == "Enabled":
+            self.results['BucketVersioning'] = [1, 'On']
 
     def _checkObjectLock(self):
         self.results['ObjectLock'] = [1, 'On']
-        try:
-            resp = self.s3Client.get_object_lock_configuration(
-                Bucket=self.bucket
-            )
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] ==  'ObjectLockConfigurationNotFoundError':
-                self.results['ObjectLock'] = [-1, 'Off']
+        if self.bucketConfig.isNotConfigured('objectLock'):
+            self.results['ObjectLock'] = [-1, 'Off']
 
     def _checkBucketReplication(self):
-        try:
-            resp = self.s3Client.get_bucket_replication(
-                Bucket=self.bucket
-            )
-            self.results['BucketReplication'] = [1, 'On']
-            
-            # Check if cross-region replication
-            rules = resp.get('ReplicationConfiguration', {}).get('Rules', [])
-            if rules:
-                target_bucket = rules[0].get('Destination', {}).get('Bucket', '').split(':')[-1]
-                if target_bucket:
-                    # Use cached bucket location if available
-                    source_region = Config.get(f's3::bucket_region::{self.bucket}')
-                    if not source_region:
-                        source_loc = self.s3Client.get_bucket_location(Bucket=self.bucket)
-                        source_region = source_loc.get('LocationConstraint') or 'us-east-1'
-                        Config.set(f's3::bucket_region::{self.bucket}', source_region)
-                    
-                    target_loc = self.s3Client.get_bucket_location(Bucket=target_bucket)
-                    target_region = target_loc.get('LocationConstraint') or 'us-east-1'
-                    
-                    if source_region != target_region:
-                        self.results['CrossRegionReplication'] = [1, 'On']
-                        
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] == 'ReplicationConfigurationNotFoundError':
-                self.results['BucketReplication'] = [-1, 'Off']
+        if self.bucketConfig.isNotConfigured('replication'):
+            self.results['BucketReplication'] = [-1, 'Off']
+            return
+        
+        if not self.bucketConfig.get('replication'):
+            return
+        
+        self.results['BucketReplication'] = [1, 'On']
+        
+        # Check if cross-region replication, regions are resolved by S3BucketConfig.load
+        source_region = self.bucketConfig.region
+        target_region = self.bucketConfig.replicationTargetRegion
+        if source_region and target_region and source_region != target_region:
+            self.results['CrossRegionReplication'] = [1, 'On']
 
     def _checkLifecycle(self):
         self.results['BucketLifecycle'] = [1, 'On']
-        try:
-            resp = self.s3Client.get_bucket_lifecycle(
-                Bucket=self.bucket
-            )
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] ==  'NoSuchLifecycleConfiguration':
-                self.results['BucketLifecycle'] = [-1, 'Off']
+        if self.bucketConfig.isNotConfigured('lifecycle'):
+            self.results['BucketLifecycle'] = [-1, 'Off']
 
     def _checkLogging(self):
         self.results['BucketLogging'] = [1, 'On']
-        try:
-            resp = self.s3Client.get_bucket_logging(
-                Bucket=self.bucket
-            )
-            ele = resp.get('LoggingEnabled')
-            if not ele:
-                self.results['BucketLogging'] = [-1, 'Off']
-        except botocore.exceptions.ClientError as e:
+        if self.bucketConfig.hasError('logging'):
             print("[{}] Unable to get Logging Informaton, skip".format(self.bucket))
+            return
+        
+        ele = self.bucketConfig.get('logging').get('LoggingEnabled')
+        if not ele:
+            self.results['BucketLogging'] = [-1, 'Off']
     
     def _checkEventNotif(self):
-        try:
-            resp = self.s3Client.get_bucket_notification_configuration(
-                Bucket=self.bucket
-            )
-        except botocore.exceptions.ClientError as e:
-            if e.response['Error']['Code'] ==  'NoSuchNotificationConfiguration':
-                self.results['EventNotification'] = [-1, 'Off']
+        if self.bucketConfig.isNotConfigured('notification'):
+            self.results['EventNotification'] = [-1, 'Off']
     
     def _checkIntelligentTiering(self): 
-        try:
-            resp = self.s3Client.list_objects_v2(
-                Bucket=self.bucket,
-                MaxKeys=10  # Check only first 10 objects for performance
-            )
-            
-            contents = resp.get('Contents', [])
-            if not contents:
-                self.results['ObjectsInIntelligentTier'] = [1, 'No Objects']
-                return
-            
-            for obj in contents:
-                storage_class = obj.get('StorageClass', 'STANDARD')
-                if storage_class != 'INTELLIGENT_TIERING':
-                    self.results['ObjectsInIntelligentTier'] = [-1, f'Mixed storage classes (found {storage_class})']
-                    return
-            
-            self.results['ObjectsInIntelligentTier'] = [1, f'Sample of {len(contents)} objects in Intelligent Tiering']
-            
-        except botocore.exceptions.ClientError as e:
+        if self.bucketConfig.hasError('objects'):
             print("[{}] Unable to get Tier Information, skip".format(self.bucket))
             self.results['ObjectsInIntelligentTier'] = [0, 'Unable to check']
+            return
+        
+        contents = self.bucketConfig.get('objects').get('Contents', [])
+        if not contents:
+            self.results['ObjectsInIntelligentTier'] = [1, 'No Objects']
+            return
+        
+        for obj in contents:
+            storage_class = obj.get('StorageClass', 'STANDARD')
+            if storage_class != 'INTELLIGENT_TIERING':
+                self.results['ObjectsInIntelligentTier'] = [-1, f'Mixed storage classes (found {storage_class})']
+                return
+        
+        self.results['ObjectsInIntelligentTier'] = [1, f'Sample of {len(contents)} objects in Intelligent Tiering']
             
     def _checkTls(self):
         self.results['TlsEnforced'] = [-1, 'Off']
         
-        policy_str = self.getBucketPolicy()
-        if not policy_str:
+        policy = self.bucketConfig.getPolicyJson()
+        if not policy:
             return
             
         try:
-            policy = json.loads(policy_str)
             for statement in policy['Statement']: 
                 condition = statement.get('Condition', {})
                 if not condition:
@@ -302,5 +244,5 @@ class S3Bucket(Evaluator):
                     self.results['TlsEnforced'] = [1, 'On']
                     return
                     
-        except (json.JSONDecodeError, KeyError):
+        except KeyError:
             return
@@ -1,5 +1,6 @@
 import botocore
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.sagemaker.drivers.SagemakerNotebook import SagemakerNotebook
 from services.sagemaker.drivers.SagemakerEndpoint import SagemakerEndpoint
@@ -10,7 +11,7 @@ class Sagemaker(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.sagemakerClient = ssBoto.client('sagemaker', config=self.bConfig)
+        self.sagemakerClient = ClientFactory.getClient(ssBoto, 'sagemaker', config=self.bConfig)
         
     def getNotebookInstances(self):
         notebooks = []
@@ -71,6 +72,7 @@ class Sagemaker(Service):
             
             obj = SagemakerNotebook(notebook, self.sagemakerClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"NotebookInstance::{notebook_name}"] = obj.getInfo()
             del obj
         
@@ -82,6 +84,7 @@ class Sagemaker(Service):
             
             obj = SagemakerEndpoint(endpoint, self.sagemakerClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"Endpoint::{endpoint_name}"] = obj.getInfo()
             del obj
         
@@ -93,6 +96,7 @@ class Sagemaker(Service):
             
             obj = SagemakerModel(model, self.sagemakerClient)
             obj.run(self.__class__)
+            obj.finalize()
             objs[f"Model::{model_name}"] = obj.getInfo()
             del obj
         
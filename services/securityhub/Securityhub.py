@@ -2,6 +2,7 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.securityhub.drivers.SecurityhubCommon import SecurityhubCommon
 
@@ -9,7 +10,7 @@ class Securityhub(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.securityhubClient = ssBoto.client('securityhub', config=self.bConfig)
+        self.securityhubClient = ClientFactory.getClient(ssBoto, 'securityhub', config=self.bConfig)
         
     def getResources(self):
         arr = []
@@ -27,6 +28,7 @@ class Securityhub(Service):
         # Security Hub is account-level service
         obj = SecurityhubCommon({}, self.securityhubClient)
         obj.run(self.__class__)
+        obj.finalize()
         objs['SecurityHub::Account'] = obj.getInfo()
         del obj
         
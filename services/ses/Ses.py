@@ -2,6 +2,7 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.ses.drivers.SesCommon import SesCommon
 
@@ -9,8 +10,8 @@ class Ses(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.sesClient = ssBoto.client('sesv2', config=self.bConfig)
-        self.sesv1Client = ssBoto.client('ses', config=self.bConfig)
+        self.sesClient = ClientFactory.getClient(ssBoto, 'sesv2', config=self.bConfig)
+        self.sesv1Client = ClientFactory.getClient(ssBoto, 'ses', config=self.bConfig)
         
     def getResources(self):
         arr = []
@@ -30,6 +31,7 @@ class Ses(Service):
             # Create a placeholder for account-level checks
             obj = SesCommon({}, self.sesClient, self.sesv1Client)
             obj.run(self.__class__)
+            obj.finalize()
             objs['SES::Account'] = obj.getInfo()
             del obj
         else:
@@ -38,6 +40,7 @@ class Ses(Service):
                 print('... (SES) inspecting ' + identity_name)
                 obj = SesCommon(identity, self.sesClient, self.sesv1Client)
                 obj.run(self.__class__)
+                obj.finalize()
                 objs[f"SES::{identity_name}"] = obj.getInfo()
                 del obj
         
@@ -1,5 +1,7 @@
 import botocore
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from services.Service import Service
 from utils.Tools import _pi
 
@@ -12,8 +14,8 @@ class Sqs(Service):
         self.region = region
         
         ssBoto = self.ssBoto
-        self.sqsClient = ssBoto.client('sqs', config=self.bConfig)
-        self.cloudwatchClient = ssBoto.client('cloudwatch', config=self.bConfig)
+        self.sqsClient = ClientFactory.getClient(ssBoto, 'sqs', config=self.bConfig)
+        self.cloudwatchClient = ClientFactory.getClient(ssBoto, 'cloudwatch', config=self.bConfig)
         
     def getResources(self):
         """
@@ -25,8 +27,7 @@ class Sqs(Service):
         
         try:
             # List all queues
-            response = self.sqsClient.list_queues()
-            queue_urls = response.get('QueueUrls', [])
+            queue_urls = Paginator.paginate(self.sqsClient, 'list_queues', 'QueueUrls', pageSize=1000)
             
             # First pass: collect all queues and their DLQ relationships
             for queue_url in queue_urls:
@@ -100,18 +101,15 @@ class Sqs(Service):
         objs = {}
         queues = self.getResources()
         
-        for queue in queues:
+        cloudtrail_client = ClientFactory.getClient(self.ssBoto, 'cloudtrail', config=self.bConfig)
+        
+        # Create driver instances and run checks, results keep the queues order
+        def build(queue):
             queue_name = queue['QueueName']
             _pi('SQS Queue', queue_name)
-            
-            # Create driver instance and run checks
-            cloudtrail_client = self.ssBoto.client('cloudtrail', config=self.bConfig)
-            obj = SqsQueueDriver(queue, self.sqsClient, self.cloudwatchClient, cloudtrail_client)
-            obj.run(self.__class__)
-            
-            # Store results
-            objs[f"Queue::{queue_name}"] = obj.getInfo()
-            del obj
+            return f"Queue::{queue_name}", SqsQueueDriver(queue, self.sqsClient, self.cloudwatchClient, cloudtrail_client)
+        
+        objs.update(self.runDrivers(queues, build))
             
         return objs
 
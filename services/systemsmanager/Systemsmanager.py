@@ -2,6 +2,8 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from services.Service import Service
 from services.systemsmanager.drivers.SystemsmanagerCommon import SystemsmanagerCommon
 
@@ -9,13 +11,12 @@ class Systemsmanager(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.ssmClient = ssBoto.client('ssm', config=self.bConfig)
+        self.ssmClient = ClientFactory.getClient(ssBoto, 'ssm', config=self.bConfig)
         
     def getResources(self):
         arr = []
         try:
-            results = self.ssmClient.describe_instance_information()
-            arr = results.get('InstanceInformationList', [])
+            arr = Paginator.list(self.ssmClient, 'describe_instance_information', 'InstanceInformationList')
         except botocore.exceptions.ClientError as e:
             if e.response['Error']['Code'] not in ['AccessDeniedException']:
                 raise
@@ -27,6 +28,7 @@ class Systemsmanager(Service):
         # Systems Manager is account-level service
         obj = SystemsmanagerCommon({}, self.ssmClient)
         obj.run(self.__class__)
+        obj.finalize()
         objs['SystemsManager::Account'] = obj.getInfo()
         del obj
         
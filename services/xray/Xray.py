@@ -2,6 +2,7 @@ import boto3
 import botocore
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from services.Service import Service
 from services.xray.drivers.XrayCommon import XrayCommon
 
@@ -9,7 +10,7 @@ class Xray(Service):
     def __init__(self, region):
         super().__init__(region)
         ssBoto = self.ssBoto
-        self.xrayClient = ssBoto.client('xray', config=self.bConfig)
+        self.xrayClient = ClientFactory.getClient(ssBoto, 'xray', config=self.bConfig)
         
     def getResources(self):
         arr = []
@@ -27,6 +28,7 @@ class Xray(Service):
         # X-Ray is account-level service
         obj = XrayCommon({}, self.xrayClient)
         obj.run(self.__class__)
+        obj.finalize()
         objs['XRay::Account'] = obj.getInfo()
         del obj
         
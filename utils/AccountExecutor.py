@@ -0,0 +1,48 @@
+from sys import platform
+
+if platform == 'darwin':
+    from multiprocess import Process
+    from multiprocess.connection import wait
+else:
+    from multiprocessing import Process
+    from multiprocessing.connection import wait
+
+from utils.Tools import _warn, _info
+
+## Runs --crossAccounts scans N accounts at a time, each account in its own process
+## so Config, __fork and the generated html folder do not clash.
+## --workerCounts is shared among the accounts running at the same time
+class AccountExecutor():
+    def __init__(self, maxAccounts, workerCounts):
+        self.maxAccounts = max(1, int(maxAccounts))
+        self.workerCounts = max(1, int(workerCounts))
+    
+    def getWorkersPerAccount(self):
+        return max(1, self.workerCounts // self.maxAccounts)
+    
+    def run(self, target, accounts):
+        '''
+        target(acctId, cred, workers) is executed in a child process for every account
+        return list of account id which did not complete successfully
+        '''
+        pending = list(accounts.items())
+        running = {}
+        failed = []
+        
+        while pending or running:
+            while pending and len(running) < self.maxAccounts:
+                acctId, cred = pending.pop(0)
+                p = Process(target=target, args=(acctId, cred, self.getWorkersPerAccount()))
+                p.start()
+                running[p.sentinel] = (acctId, p)
+            
+            for sentinel in wait(list(running.keys())):
+                acctId, p = running.pop(sentinel)
+                p.join()
+                if p.exitcode != 0:
+                    failed.append(acctId)
+                    _warn("Account [{}] scan exited with code {}".format(acctId, p.exitcode))
+                else:
+                    _info("Account [{}] scan completed".format(acctId), True)
+        
+        return failed
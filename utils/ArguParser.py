@@ -76,6 +76,11 @@ class ArguParser:
             "default": 4,
             "help": "Number of parallel threads, recommend 4 for Cloudshell"
         },
+        'parallelAccounts':{
+            "required": False,
+            "default": 1,
+            "help": "Number of accounts to scan at the same time with --crossAccounts, shares --workerCounts among them"
+        },
         'beta': {
             "required": False,
             "default": False,
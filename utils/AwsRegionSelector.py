@@ -3,6 +3,8 @@ import sys
 import boto3
 from botocore.config import Config as bConfig
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from utils.Tools import _warn, _info
 
 class AwsRegionSelector:
@@ -22,30 +24,11 @@ class AwsRegionSelector:
         conf = bConfig(
             region_name = 'us-east-1'    
         )
-        acct = ssBoto.client('account')
+        acct = ClientFactory.getClient(ssBoto, 'account')
         
-        results = {}
         regions = []
-        token = None
-        while True:
-            if token == None:
-                results = acct.list_regions(
-                    RegionOptStatusContains=['ENABLED', 'ENABLED_BY_DEFAULT'],
-                    MaxResults=20
-                )
-            else:
-                results = acct.list_regions(
-                    RegionOptStatusContains=['ENABLED', 'ENABLED_BY_DEFAULT'],
-                    NextToken = token,
-                    MaxResults=20
-                )
-            
-            token = results.get('NextToken')
-            for info in results.get('Regions'):
-                regions.append(info['RegionName'])
-            
-            if not token:
-                break
+        for info in Paginator.paginate(acct, 'list_regions', 'Regions', pageSize=20, RegionOptStatusContains=['ENABLED', 'ENABLED_BY_DEFAULT']):
+            regions.append(info['RegionName'])
         
         # if DEBUG and not minimal:
         _info("The following region(s) are enabled/opt-in")
@@ -6,6 +6,7 @@ import botocore
 from botocore.config import Config as bConfig
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from utils.Tools import _warn, _info
 
 ## Class name decided by Sarika
@@ -45,7 +46,7 @@ Outputs:
         )
         
         ssBoto = Config.get('ssBoto', None)
-        self.cfClient = ssBoto.client('cloudformation', config=self.bConfig)
+        self.cfClient = ClientFactory.getClient(ssBoto, 'cloudformation', config=self.bConfig)
 
         self.additionalDesc = additionalDesc
         
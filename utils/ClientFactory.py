@@ -0,0 +1,86 @@
+import os
+import threading
+
+from botocore.config import Config as bConfig
+from utils.Config import Config
+from utils.RateLimiter import RateLimiter
+from utils.Profiler import Profiler
+
+## Process-wide registry of boto3 clients, keyed by (session, service, region, config)
+## Creating a client loads the botocore service model and a new HTTP connection pool,
+## services and drivers should call ClientFactory.getClient instead of ssBoto.client
+class ClientFactory():
+    DEFAULT_MAX_POOL_CONNECTIONS = 10
+
+    clients = {}
+    stats = {'created': 0, 'hits': 0}
+    maxPoolConnections = None
+    lock = threading.Lock()
+
+    @staticmethod
+    def setMaxPoolConnections(num):
+        ## only affects clients created afterwards
+        ClientFactory.maxPoolConnections = max(int(num), ClientFactory.DEFAULT_MAX_POOL_CONNECTIONS)
+
+    @staticmethod
+    def getMaxPoolConnections():
+        if ClientFactory.maxPoolConnections is not None:
+            return ClientFactory.maxPoolConnections
+
+        ## Match ThreadPoolExecutor default max_workers when checks run concurrently
+        if Config.get('beta', False):
+            return max(min(32, (os.cpu_count() or 1) + 4), ClientFactory.DEFAULT_MAX_POOL_CONNECTIONS)
+
+        return ClientFactory.DEFAULT_MAX_POOL_CONNECTIONS
+
+    @staticmethod
+    def configKey(config):
+        if config is None:
+            return None
+
+        ## botocore Config keeps only the options explicitly passed in
+        return repr(sorted(config._user_provided_options.items(), key=lambda kv: kv[0]))
+
+    @staticmethod
+    def getClient(ssBoto, serviceName, config=None, region_name=None):
+        if ssBoto is None:
+            ssBoto = Config.get('ssBoto', None)
+
+        key = (id(ssBoto), serviceName, region_name, ClientFactory.configKey(config))
+
+        with ClientFactory.lock:
+            if key in ClientFactory.clients:
+                session, client = ClientFactory.clients[key]
+                ## id() can be reused once a session is garbage collected
+                if session is ssBoto:
+                    ClientFactory.stats['hits'] += 1
+                    return client
+
+            poolConfig = bConfig(max_pool_connections=ClientFactory.getMaxPoolConnections())
+            config = poolConfig if config is None else config.merge(poolConfig)
+
+            if region_name is None:
+                client = ssBoto.client(serviceName, config=config)
+            else:
+                client = ssBoto.client(serviceName, config=config, region_name=region_name)
+
+            RateLimiter.register(client)
+            Profiler.register(client)
+            ClientFactory.clients[key] = (ssBoto, client)
+            ClientFactory.stats['created'] += 1
+
+        return client
+
+    @staticmethod
+    def getStats():
+        return {
+            'created': ClientFactory.stats['created'],
+            'hits': ClientFactory.stats['hits'],
+            'cached': len(ClientFactory.clients)
+        }
+
+    @staticmethod
+    def reset():
+        with ClientFactory.lock:
+            ClientFactory.clients = {}
+            ClientFactory.stats = {'created': 0, 'hits': 0}
@@ -1,5 +1,6 @@
 import traceback
 import os
+import threading
 import boto3
 import constants as _C
 
@@ -34,6 +35,9 @@ class Config:
     
     CURRENT_REGION = 'us-east-1'
     
+    ## guards read-modify-write of cached values when drivers run on several threads
+    lock = threading.RLock()
+    
     @staticmethod
     def init():
         global cache
@@ -66,6 +70,17 @@ class Config:
     def set(key, val):
         cache[key] = val
 
+    @staticmethod
+    def increase(key, counts):
+        '''
+        add counts to the numbers stored in key, e.g. the scanned_<service> counters
+        '''
+        with Config.lock:
+            val = dict(cache.get(key) or {})
+            for k, v in counts.items():
+                val[k] = val.get(k, 0) + v
+            cache[key] = val
+
     @staticmethod
     def get(key, defaultValue = False):
         ## <TODO>, fix the DEBUG variable
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import hashlib
+import botocore
+
+from utils.Config import Config
+from utils.WorkUnitScheduler import WorkUnitScheduler
+import constants as _C
+
+## Account level cache of Cost Explorer responses keyed by the normalized request
+## Cost Explorer is global and billed per request, the first worker process fetching a query
+## writes it into the scan unit dir, other workers and regions read it from there.
+## With --others '{"ceCacheTTL": 43200}' responses are also kept under .cache/costexplorer
+## and reused by later runs until they expire
+class CostExplorerCache():
+    ## how long a worker waits for another process fetching the same query
+    WAIT_SECONDS = 60
+    POLL_SECONDS = 0.5
+
+    responses = {}
+
+    @staticmethod
+    def getKey(operation, params):
+        normalized = json.dumps({'operation': operation, 'params': params}, sort_keys=True, default=str)
+        return hashlib.md5(normalized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def getScanPath(key):
+        return WorkUnitScheduler.getUnitDir() + '/ce.' + key + '.json'
+
+    @staticmethod
+    def getPersistentPath(key):
+        acctId = Config.get('stsInfo', {}).get('Account', 'default')
+        return _C.ROOT_DIR + '/.cache/costexplorer/' + acctId + '/' + key + '.json'
+
+    @staticmethod
+    def getTTL():
+        return int(Config.get('ceCacheTTL', 0) or 0)
+
+    @staticmethod
+    def readFile(path, ttl=None):
+        '''
+        return the cached response, raise the cached ClientError when the fetch had failed
+        '''
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (ValueError, OSError):
+            return None
+
+        if ttl is not None and time.time() - entry.get('fetchedAt', 0) > ttl:
+            return None
+
+        if 'error' in entry:
+            raise botocore.exceptions.ClientError({'Error': entry['error']}, entry['operation'])
+        return entry['response']
+
+    @staticmethod
+    def writeFile(path, response=None, operation=None, error=None):
+        entry = {'fetchedAt': time.time()}
+        if error is None:
+            entry['response'] = response
+        else:
+            entry['operation'] = operation
+            entry['error'] = error
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.' + str(os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def fetch(ceClient, operation, params):
+        method = getattr(ceClient, operation)
+        response = method(**params)
+        response.pop('ResponseMetadata', None)
+
+        ## grouped get_cost_and_usage is paged, ResultsByTime of every page are kept
+        while response.get('NextPageToken') and 'ResultsByTime' in response:
+            page = method(**params, NextPageToken=response['NextPageToken'])
+            response['ResultsByTime'].extend(page.get('ResultsByTime', []))
+            response['NextPageToken'] = page.get('NextPageToken')
+
+        return response
+
+    @staticmethod
+    def call(ceClient, operation, **params):
+        '''
+        same as ceClient.<operation>(**params), served from cache when available
+        ClientError is raised as is, it is only remembered for the current scan
+        '''
+        key = CostExplorerCache.getKey(operation, params)
+        if key in CostExplorerCache.responses:
+            return CostExplorerCache.responses[key]
+
+        scanPath = CostExplorerCache.getScanPath(key)
+        response = CostExplorerCache.readFile(scanPath)
+
+        ttl = CostExplorerCache.getTTL()
+        if response is None and ttl > 0:
+            response = CostExplorerCache.readFile(CostExplorerCache.getPersistentPath(key), ttl)
+            if response is not None:
+                CostExplorerCache.writeFile(scanPath, response)
+
+        if response is None:
+            if WorkUnitScheduler.claimOnce('CostExplorer::' + key):
+                try:
+                    response = CostExplorerCache.fetch(ceClient, operation, params)
+                except botocore.exceptions.ClientError as e:
+                    ## let waiting workers fail fast with the same error
+                    CostExplorerCache.writeFile(scanPath, operation=operation, error=e.response['Error'])
+                    raise
+                CostExplorerCache.writeFile(scanPath, response)
+                if ttl > 0:
+                    CostExplorerCache.writeFile(CostExplorerCache.getPersistentPath(key), response)
+            else:
+                response = CostExplorerCache.waitFor(scanPath)
+                if response is None:
+                    ## the other worker failed or is too slow, do not hold up the scan
+                    response = CostExplorerCache.fetch(ceClient, operation, params)
+
+        CostExplorerCache.responses[key] = response
+        return response
+
+    @staticmethod
+    def waitFor(path):
+        waited = 0
+        while waited < CostExplorerCache.WAIT_SECONDS:
+            response = CostExplorerCache.readFile(path)
+            if response is not None:
+                return response
+
+            time.sleep(CostExplorerCache.POLL_SECONDS)
+            waited += CostExplorerCache.POLL_SECONDS
+
+        return None
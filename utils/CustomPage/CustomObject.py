@@ -47,6 +47,35 @@ class CustomObject():
         
         return s
         
+    def resetStat(self, service):
+        if not service in self.ResourcesToTrack:
+            return
+        
+        self.ResourcesStat[service] = {}
+        for res, rules in self.ResourcesToTrack[service].items():
+            tRules = {'total': 0, 'items': [], 'rules': {}}
+            for rule in rules:
+                tRules['rules'][rule] = []
+            
+            self.ResourcesStat[service][res] = tRules
+    
+    ## Combine printInfo outputs of the same service, e.g. scanned by different work units
+    def mergeInfo(self, parts):
+        merged = {}
+        for part in parts:
+            for driver, stat in part.items():
+                if not driver in merged:
+                    merged[driver] = {'total': 0, 'items': [], 'rules': {}}
+                
+                merged[driver]['total'] += stat['total']
+                merged[driver]['items'] += stat['items']
+                for rule, names in stat['rules'].items():
+                    if not rule in merged[driver]['rules']:
+                        merged[driver]['rules'][rule] = []
+                    merged[driver]['rules'][rule] += names
+        
+        return merged
+        
     def setData(self, json):
         self.dataSets = json
         
@@ -39,6 +39,14 @@ class CustomPage():
     def getRegistrar(self):
         return self.registrar
     
+    def tracksDriver(self, driver):
+        for cname, classObj in self.Pages.items():
+            pObj, pbObj = classObj
+            for serv, groups in pObj.ResourcesToTrack.items():
+                if driver in groups:
+                    return True
+        return False
+
     def trackInfo(self, driver, name, results, inventoryInfo):
         for cname, classObj in self.Pages.items():
             pObj, pbObj = classObj
@@ -67,6 +75,31 @@ class CustomPage():
             with open(filename, "w") as f:
                 f.write(s)
                 
+    def collectOutput(self, service):
+        ## Return tracked info of that service and clear it, used per work unit
+        serv = service.lower()
+        output = {}
+        for cname, classObj in self.Pages.items():
+            pObj, pbObj = classObj
+            s = pObj.printInfo(serv)
+            if s == None:
+                return output
+            
+            output[cname] = json.loads(s)
+            pObj.resetStat(serv)
+        
+        return output
+    
+    def writeMergedOutput(self, service, customPages):
+        for cname, parts in customPages.items():
+            if not cname in self.Pages:
+                continue
+            
+            pObj, pbObj = self.Pages[cname]
+            filename = _C.FORK_DIR + '/CustomPage.' + cname + '.' + service + '.json'
+            with open(filename, "w") as f:
+                f.write(json.dumps(pObj.mergeInfo(parts)))
+                
     def buildPage(self):
         arr = {}
         prefix = 'CustomPage.'
@@ -0,0 +1,25 @@
+import os
+import json
+from utils.CustomPage.CustomObject import CustomObject
+import constants as _C
+
+class Profile(CustomObject):
+    ResourcesToTrack = {}
+    report = {}
+    profileError = ''
+    def __init__(self):
+        super().__init__()
+        return
+    
+    ## __fork/profile.json is written by WorkUnitScheduler.mergeUnits from the profiles of all workers
+    def build(self):
+        path = _C.FORK_DIR + '/profile.json'
+        if not os.path.exists(path):
+            self.profileError = "Profiling data is not available, it is collected unless --others '{\"profiler\": 0}' is given"
+            return
+        
+        try:
+            with open(path, 'r') as f:
+                self.report = json.load(f)
+        except (ValueError, OSError) as e:
+            self.profileError = "Unable to read profile.json: {}".format(e)
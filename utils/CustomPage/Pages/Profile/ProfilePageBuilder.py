@@ -0,0 +1,66 @@
+import html
+from utils.CustomPage.CustomPageBuilder import CustomPageBuilder
+
+class ProfilePageBuilder(CustomPageBuilder):
+    hasError = False
+    def customPageInit(self):
+        if not self.data.profileError == '':
+            self.hasError = True
+            
+        return
+
+    def buildContentSummary_customPage(self):
+        if self.hasError:
+            return ["<span>{}</span>".format(self.data.profileError)]
+        
+        summ = self.data.report.get('summary', {})
+        items = [
+            "<span class='badge badge-info'>{} checks in {}s</span>".format(summ.get('checks', 0), round(summ.get('checkSeconds', 0), 2)),
+            "<span class='badge badge-info'>{} API calls in {}s</span>".format(summ.get('apiCalls', 0), round(summ.get('apiSeconds', 0), 2)),
+            "<span class='badge badge-warning'>{} retries</span>".format(summ.get('retries', 0)),
+            "<span class='badge badge-danger'>{} throttled</span>".format(summ.get('throttles', 0)),
+            "<span class='badge badge-secondary'>{} MB received</span>".format(round(summ.get('bytes', 0)/1024/1024, 2))
+        ]
+        return [' '.join(items)]
+
+    def buildContentDetail_customPage(self):
+        if self.hasError:
+            return
+
+        report = self.data.report
+        sections = [
+            ['Slowest checks', ['Service', 'Driver', 'Check', 'Runs', 'Total (s)', 'p50 (s)', 'p95 (s)', 'Max (s)'],
+                [[r['service'], r['driver'], r['check'], r['count'], r['total'], r['p50'], r['p95'], r['max']] for r in report.get('checks', [])]],
+            ['AWS API operations', ['Service', 'Operation', 'Calls', 'Retries', 'Throttles', 'Errors', 'KB received', 'Total (s)', 'p50 (s)', 'p95 (s)', 'Max (s)'],
+                [[r['service'], r['operation'], r['calls'], r['retries'], r['throttles'], r['errors'], round(r['bytes']/1024, 1), r['total'], r['p50'], r['p95'], r['max']] for r in report.get('apis', [])]],
+            ['Slowest resources', ['Service', 'Driver', 'Resource', 'Seconds'],
+                [[r['service'], r['driver'], r['name'], r['seconds']] for r in report.get('resources', [])]]
+        ]
+
+        output = []
+        for title, head, rows in sections:
+            op = self.formatOutput(head, rows)
+            card = self.generateCard(pid=self.getHtmlId(title), html=op, cardClass='primary', title=title, titleBadge='', collapse=True, noPadding=False)
+            items = [[card, '']]
+            
+            output.append(self.generateRowWithCol(12, items, "data-context='settingTable'"))
+
+        return output
+
+    def formatOutput(self, thead, rowInfo):
+        htmlO = []
+        htmlO.append("<table class='table table-bordered table-hover'>")
+        
+        htmlO.append("<tr>")
+        for headInfo in thead:
+            htmlO.append(f"<th>{headInfo}</th>")
+        htmlO.append("</tr>")
+
+        for row in rowInfo:
+            htmlO.append("<tr>")
+            for value in row:
+                htmlO.append(f"<td>{html.escape(str(value))}</td>")
+            htmlO.append("</tr>")
+
+        htmlO.append("</table>")
+        return ''.join(htmlO)
@@ -1,5 +1,6 @@
 import json
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
 from utils.CustomPage.CustomObject import CustomObject
 
 import boto3
@@ -19,7 +20,7 @@ class TA(CustomObject):
     def build(self):
         print("... Running CP - TA, it can takes up to 60 seconds")
         ssBoto = Config.get('ssBoto')
-        ta_client = ssBoto.client('trustedadvisor', region_name='us-east-1')
+        ta_client = ClientFactory.getClient(ssBoto, 'trustedadvisor', region_name='us-east-1')
         findings = defaultdict(lambda: defaultdict(list))
     
         try:
@@ -0,0 +1,168 @@
+import re
+import threading
+
+from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
+
+## Per region catalog of EC2 instance types, built once per process from bulk
+## describe_instance_types and describe_instance_type_offerings pages.
+## Indexed by instance type and by prefix (family + generation + attributes, e.g. m6g)
+## so next generation, Graviton and AMD lookups are dictionary hits.
+## RDS (db.r6g.large) and ElastiCache (cache.r6g.large) node types resolve through the same index
+class InstanceTypeCatalog():
+    PATTERN = re.compile(r"([a-zA-Z]+)(\d+)([a-zA-Z0-9\-]*)")
+
+    catalogs = {}
+    lock = threading.Lock()
+
+    def __init__(self, region):
+        self.region = region
+        self.specs = {}
+        self.offered = set()
+        self.prefixes = {}
+        self.families = {}
+
+    @staticmethod
+    def get(region=None):
+        if region is None:
+            region = Config.CURRENT_REGION
+
+        ## drivers of one region call this from several ResourceExecutor threads, load it once
+        if region not in InstanceTypeCatalog.catalogs:
+            with InstanceTypeCatalog.lock:
+                if region not in InstanceTypeCatalog.catalogs:
+                    InstanceTypeCatalog.catalogs[region] = InstanceTypeCatalog(region).load()
+        return InstanceTypeCatalog.catalogs[region]
+
+    @staticmethod
+    def parse(instanceType):
+        '''
+        c6gn.4xlarge, db.r6g.xlarge, cache.r6g.large, t4g.xlarge.search
+        return {prefix, suffix, family, version, attributes} or None for invalid strings
+        '''
+        arr = instanceType.split('.')
+        if len(arr) > 3 or len(arr) == 1:
+            return None
+
+        if len(arr) == 3 and arr[0].lower() in ['db', 'cache']:
+            p, s = arr[1], arr[2]
+        else:
+            p, s = arr[0], arr[1]
+
+        output = InstanceTypeCatalog.PATTERN.fullmatch(p)
+        if output is None:
+            return None
+
+        return {
+            'prefix': p,
+            'suffix': s,
+            'family': output.group(1),
+            'version': output.group(2),
+            'attributes': output.group(3)
+        }
+
+    @staticmethod
+    def getLatestGenerations(prefixes):
+        '''
+        input: set(['t4g','t3a','t2','m5']), output: set(['t4g','m5'])
+        '''
+        latest = {}
+        for prefix in prefixes:
+            info = InstanceTypeCatalog.parse(prefix + '.x')
+            if info is None:
+                continue
+
+            family, version = info['family'], int(info['version'])
+            if family not in latest or latest[family][0] < version:
+                latest[family] = (version, set([prefix]))
+            elif latest[family][0] == version:
+                latest[family][1].add(prefix)
+
+        return set([prefix for _, group in latest.values() for prefix in group])
+
+    def load(self):
+        ec2Client = ClientFactory.getClient(Config.get('ssBoto', None), 'ec2', region_name=self.region)
+
+        for info in Paginator.paginate(ec2Client, 'describe_instance_types', 'InstanceTypes', pageSize=100):
+            self.specs[info['InstanceType']] = {
+                'vcpu': info['VCpuInfo']['DefaultVCpus'],
+                'memoryInGiB': round(info['MemoryInfo']['SizeInMiB']/1024, 2)
+            }
+
+        offerings = Paginator.paginate(ec2Client, 'describe_instance_type_offerings', 'InstanceTypeOfferings',
+            LocationType = 'region',
+            Filters = [{'Name': 'location', 'Values': [self.region]}]
+        )
+        for offering in offerings:
+            self.offered.add(offering['InstanceType'])
+
+        for instanceType in self.specs.keys():
+            info = InstanceTypeCatalog.parse(instanceType)
+            if info is None:
+                continue
+
+            if info['prefix'] not in self.prefixes:
+                self.prefixes[info['prefix']] = set()
+            self.prefixes[info['prefix']].add(info['suffix'])
+
+            if info['family'] not in self.families:
+                self.families[info['family']] = {}
+            self.families[info['family']].setdefault(int(info['version']), set()).add(info['attributes'])
+
+        return self
+
+    def getSpec(self, instanceType):
+        info = InstanceTypeCatalog.parse(instanceType)
+        if info is None:
+            return {'vcpu': 0, 'memoryInGiB': 0}
+        return self.specs.get(info['prefix'] + '.' + info['suffix'], {'vcpu': 0, 'memoryInGiB': 0})
+
+    def hasType(self, instanceType):
+        return instanceType in self.specs
+
+    def isOffered(self, instanceType):
+        return instanceType in self.offered
+
+    def hasPrefix(self, prefix):
+        return prefix in self.prefixes
+
+    def getNextGeneration(self, instanceType):
+        '''
+        m5a.large -> m6a.large when it exists in the region, otherwise None
+        '''
+        info = InstanceTypeCatalog.parse(instanceType)
+        if info is None:
+            return None
+
+        nextPrefix = info['family'] + str(int(info['version']) + 1) + info['attributes']
+        if info['suffix'] in self.prefixes.get(nextPrefix, ()):
+            return nextPrefix + '.' + info['suffix']
+        return None
+
+    def isLatestGeneration(self, prefix):
+        info = InstanceTypeCatalog.parse(prefix + '.x')
+        if info is None:
+            return True
+        return not self.hasPrefix(info['family'] + str(int(info['version']) + 1) + info['attributes'])
+
+    def getAlternative(self, instanceType, attribute):
+        '''
+        same or next generation with the processor attribute, g for Graviton, a for AMD
+        return the first offered instance type or None
+        '''
+        info = InstanceTypeCatalog.parse(instanceType)
+        if info is None or attribute in info['attributes']:
+            return None
+
+        for version in [int(info['version']), int(info['version']) + 1]:
+            candidate = info['family'] + str(version) + attribute + '.' + info['suffix']
+            if self.isOffered(candidate):
+                return candidate
+        return None
+
+    def getGravitonAlternative(self, instanceType):
+        return self.getAlternative(instanceType, 'g')
+
+    def getAmdAlternative(self, instanceType):
+        return self.getAlternative(instanceType, 'a')
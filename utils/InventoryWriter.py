@@ -0,0 +1,97 @@
+import os
+import heapq
+
+from utils.WorkUnitScheduler import WorkUnitScheduler
+
+## Scanned resource inventory (all.csv), one "region;driver;name;hasError" row per resource
+## Each worker appends the rows of every (service, region) it scans to its own file as a sorted run
+## and records the run's byte range next to it. The parent k-way merges all runs into all.csv,
+## dropping duplicates, reading each run a block at a time so memory does not grow with the rows
+class InventoryWriter():
+    READ_SIZE = 65536
+
+    @staticmethod
+    def getWorkerPath():
+        return WorkUnitScheduler.getUnitDir() + '/inventory.' + str(os.getpid()) + '.csv'
+
+    @staticmethod
+    def write(rows):
+        '''
+        rows of one (service, region), written once by the worker which scanned them
+        '''
+        rows = sorted(set(rows))
+        if not rows:
+            return
+
+        if not os.path.exists(WorkUnitScheduler.getUnitDir()):
+            os.makedirs(WorkUnitScheduler.getUnitDir(), exist_ok=True)
+
+        data = ('\n'.join(rows) + '\n').encode('utf-8')
+        path = InventoryWriter.getWorkerPath()
+        with open(path, 'ab') as f:
+            f.seek(0, os.SEEK_END)
+            start = f.tell()
+            f.write(data)
+
+        with open(path + '.runs', 'a') as f:
+            f.write('{} {}\n'.format(start, start + len(data)))
+
+    @staticmethod
+    def readRun(f, start, end):
+        pending = b''
+        pos = start
+        while pos < end:
+            f.seek(pos)
+            chunk = f.read(min(InventoryWriter.READ_SIZE, end - pos))
+            if not chunk:
+                break
+            pos += len(chunk)
+
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line.decode('utf-8')
+
+        if pending:
+            yield pending.decode('utf-8')
+
+    @staticmethod
+    def merge(dest):
+        '''
+        merge the runs of every worker into dest, sorted and without duplicates
+        '''
+        unitDir = WorkUnitScheduler.getUnitDir()
+        if not os.path.exists(unitDir):
+            return
+
+        files = []
+        runs = []
+        for filename in sorted(os.listdir(unitDir)):
+            if not filename.startswith('inventory.') or not filename.endswith('.csv'):
+                continue
+
+            path = unitDir + '/' + filename
+            if not os.path.exists(path + '.runs'):
+                continue
+
+            f = open(path, 'rb')
+            files.append(f)
+            with open(path + '.runs', 'r') as r:
+                for line in r:
+                    start, end = line.split()
+                    runs.append(InventoryWriter.readRun(f, int(start), int(end)))
+
+        try:
+            if not runs:
+                return
+
+            with open(dest, 'w', newline='') as out:
+                last = None
+                for row in heapq.merge(*runs):
+                    if row == last:
+                        continue
+                    out.write(row + '\r\n')
+                    last = row
+        finally:
+            for f in files:
+                f.close()
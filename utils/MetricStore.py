@@ -0,0 +1,196 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.Paginator import Paginator
+
+## Region scoped CloudWatch metric prefetch, one store per cloudwatch client
+## Drivers register the get_metric_statistics queries they are going to need, the store
+## packs them into GetMetricData calls of up to 500 queries and serves the results from memory.
+## MetricStore.getMetricStatistics returns the same shape as cwClient.get_metric_statistics,
+## queries which were not registered are fetched on first use together with anything pending
+class MetricStore():
+    MAX_QUERIES = 500
+    MAX_WORKERS = 4
+
+    stores = {}
+    storesLock = threading.Lock()
+    stats = {'queries': 0, 'calls': 0, 'hits': 0}
+
+    def __init__(self, cwClient):
+        self.cwClient = cwClient
+        self.series = {}
+        self.pending = {}
+        ## drivers of a region may read the store from several threads
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def getStore(cwClient):
+        key = id(cwClient)
+        with MetricStore.storesLock:
+            if key in MetricStore.stores:
+                client, store = MetricStore.stores[key]
+                if client is cwClient:
+                    return store
+
+            store = MetricStore(cwClient)
+            MetricStore.stores[key] = (cwClient, store)
+            return store
+
+    @staticmethod
+    def register(cwClient, **params):
+        MetricStore.getStore(cwClient).add(params)
+
+    @staticmethod
+    def getMetricStatistics(cwClient, **params):
+        return MetricStore.getStore(cwClient).get(params)
+
+    @staticmethod
+    def getStats():
+        return MetricStore.stats
+
+    @staticmethod
+    def reset():
+        MetricStore.stores = {}
+
+    @staticmethod
+    def toDatetime(value):
+        ## get_metric_statistics also accepts epoch seconds
+        if isinstance(value, (int, float)):
+            return datetime.datetime.utcfromtimestamp(value)
+        return value
+
+    @staticmethod
+    def getEndOffset(endTime):
+        '''
+        hours between now and EndTime, callers mix utcnow() and now(), both count as "now"
+        '''
+        if endTime.tzinfo is not None:
+            endTime = endTime.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            candidates = [datetime.datetime.utcnow()]
+        else:
+            candidates = [datetime.datetime.utcnow(), datetime.datetime.now()]
+
+        offset = min([abs((now - endTime).total_seconds()) for now in candidates])
+        if offset < 3600:
+            return 0
+        return int(round((datetime.datetime.utcnow() - endTime).total_seconds() / 3600))
+
+    def makeKeys(self, params):
+        '''
+        one key per statistic, GetMetricData returns a single statistic per query
+        key: (namespace, metric, dimensions, stat, period, window, endOffset, unit)
+        '''
+        dimensions = tuple(sorted((d['Name'], d['Value']) for d in params.get('Dimensions', [])))
+        startTime = MetricStore.toDatetime(params['StartTime'])
+        endTime = MetricStore.toDatetime(params['EndTime'])
+        window = int(round((endTime - startTime).total_seconds()))
+        endOffset = MetricStore.getEndOffset(endTime)
+
+        stats = list(params.get('Statistics', [])) + list(params.get('ExtendedStatistics', []))
+        keys = []
+        for stat in stats:
+            keys.append((params['Namespace'], params['MetricName'], dimensions, stat, params['Period'], window, endOffset, params.get('Unit')))
+        return keys
+
+    def add(self, params):
+        with self.lock:
+            for key in self.makeKeys(params):
+                if key not in self.series:
+                    self.pending[key] = True
+
+    def get(self, params):
+        keys = self.makeKeys(params)
+        with self.lock:
+            if all(key in self.series for key in keys):
+                MetricStore.stats['hits'] += 1
+            else:
+                self.add(params)
+                self.fetch()
+
+        extended = params.get('ExtendedStatistics', [])
+        datapoints = None
+        for key in keys:
+            stat = key[3]
+            points = {}
+            for ts, value in self.series.get(key, []):
+                if datapoints is not None and ts not in datapoints:
+                    continue
+                point = datapoints[ts] if datapoints is not None else {'Timestamp': ts}
+                if stat in extended:
+                    point.setdefault('ExtendedStatistics', {})[stat] = value
+                else:
+                    point[stat] = value
+                if params.get('Unit') is not None:
+                    point['Unit'] = params['Unit']
+                points[ts] = point
+
+            ## keep only timestamps having every requested statistic
+            datapoints = points
+
+        return {
+            'Label': params['MetricName'],
+            'Datapoints': list(datapoints.values()) if datapoints else []
+        }
+
+    def fetch(self):
+        ## StartTime/EndTime are per call, group by time range before batching
+        groups = {}
+        for key in self.pending.keys():
+            rangeKey = (key[5], key[6])
+            if rangeKey not in groups:
+                groups[rangeKey] = []
+            groups[rangeKey].append(key)
+        self.pending = {}
+
+        batches = []
+        for (window, endOffset), keys in groups.items():
+            for i in range(0, len(keys), MetricStore.MAX_QUERIES):
+                batches.append((window, endOffset, keys[i:i + MetricStore.MAX_QUERIES]))
+
+        if not batches:
+            return
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=min(MetricStore.MAX_WORKERS, len(batches))) as executor:
+            futures = [executor.submit(self.getMetricData, *batch) for batch in batches]
+            for future in futures:
+                try:
+                    self.series.update(future.result())
+                except Exception as e:
+                    errors.append(e)
+
+        if errors:
+            raise errors[0]
+
+    def getMetricData(self, window, endOffset, keys):
+        endTime = datetime.datetime.utcnow() - datetime.timedelta(hours=endOffset)
+        startTime = endTime - datetime.timedelta(seconds=window)
+
+        queries = []
+        for i, key in enumerate(keys):
+            namespace, metric, dimensions, stat, period, _, _, unit = key
+            metricStat = {
+                'Metric': {
+                    'Namespace': namespace,
+                    'MetricName': metric,
+                    'Dimensions': [{'Name': name, 'Value': value} for name, value in dimensions]
+                },
+                'Period': period,
+                'Stat': stat
+            }
+            if unit is not None:
+                metricStat['Unit'] = unit
+
+            queries.append({'Id': 'm' + str(i), 'MetricStat': metricStat, 'ReturnData': True})
+
+        MetricStore.stats['queries'] += len(queries)
+        MetricStore.stats['calls'] += 1
+
+        results = {key: [] for key in keys}
+        for result in Paginator.paginate(self.cwClient, 'get_metric_data', 'MetricDataResults',
+                                         MetricDataQueries=queries, StartTime=startTime, EndTime=endTime, ScanBy='TimestampAscending'):
+            key = keys[int(result['Id'][1:])]
+            results[key].extend(zip(result.get('Timestamps', []), result.get('Values', [])))
+
+        return results
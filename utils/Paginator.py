@@ -0,0 +1,70 @@
+## Streams items across pages of a list/describe call
+## Uses the botocore paginator when the operation has one, otherwise follows the
+## request/response token given in tokenKeys. Page count is recorded per operation
+class Paginator():
+    stats = {}
+
+    @staticmethod
+    def paginate(client, operation, resultKey, pageSize=None, tokenKeys=None, **params):
+        '''
+        yield every item under resultKey, e.g.
+            Paginator.paginate(ec2Client, 'describe_volumes', 'Volumes', Filters=filters)
+        resultKey can be a "A.B" path for nested results (cloudfront DistributionList.Items)
+        tokenKeys=(requestParam, responseKey) for operations without botocore paginator
+        '''
+        for page in Paginator.pages(client, operation, pageSize, tokenKeys, **params):
+            for item in Paginator.getResult(page, resultKey):
+                yield item
+
+    @staticmethod
+    def pages(client, operation, pageSize=None, tokenKeys=None, **params):
+        '''
+        yield whole response pages, for operations returning several lists per page
+        (iam get_account_authorization_details)
+        '''
+        if tokenKeys is None and client.can_paginate(operation):
+            paginationConfig = {}
+            if pageSize is not None:
+                paginationConfig['PageSize'] = pageSize
+            pages = client.get_paginator(operation).paginate(PaginationConfig=paginationConfig, **params)
+        else:
+            pages = Paginator.tokenPages(client, operation, tokenKeys or ('NextToken', 'NextToken'), **params)
+
+        statKey = client.meta.service_model.service_name + '.' + operation
+        if statKey not in Paginator.stats:
+            Paginator.stats[statKey] = {'calls': 0, 'pages': 0}
+        Paginator.stats[statKey]['calls'] += 1
+
+        for page in pages:
+            Paginator.stats[statKey]['pages'] += 1
+            yield page
+
+    @staticmethod
+    def tokenPages(client, operation, tokenKeys, **params):
+        requestKey, responseKey = tokenKeys
+        method = getattr(client, operation)
+        while True:
+            page = method(**params)
+            yield page
+
+            token = Paginator.getResult(page, responseKey, None)
+            if not token:
+                break
+            params[requestKey] = token
+
+    @staticmethod
+    def getResult(page, resultKey, defaultValue=[]):
+        result = page
+        for key in resultKey.split('.'):
+            if not isinstance(result, dict) or key not in result:
+                return defaultValue
+            result = result[key]
+        return result
+
+    @staticmethod
+    def list(client, operation, resultKey, pageSize=None, tokenKeys=None, **params):
+        return list(Paginator.paginate(client, operation, resultKey, pageSize, tokenKeys, **params))
+
+    @staticmethod
+    def getStats():
+        return Paginator.stats
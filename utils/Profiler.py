@@ -0,0 +1,272 @@
+import math
+import time
+import heapq
+import threading
+
+from array import array
+
+from utils.Config import Config
+from utils.RateLimiter import RateLimiter
+
+## Scan time breakdown, per (service, driver, check) and per AWS API operation
+## Checks are timed by Evaluator.run, API calls through botocore events on every client created by
+## ClientFactory. Durations are kept as exact count, total and max plus a fixed log-scaled
+## histogram, so memory does not grow with the number of calls and p50/p95 are read from the
+## buckets (within BUCKET_GROWTH of the exact value). Each work unit hands its histograms over with
+## collect(), the parent adds up those of all workers into __fork/profile.json.
+## Disable with --others '{"profiler": 0}'
+class Profiler():
+    TOP_RESOURCES = 20
+    ## rows kept per section of the report
+    TOP_ROWS = 100
+    PRECISION = 4
+
+    ## bucket 0 holds durations up to BUCKET_MIN seconds, bucket i up to BUCKET_MIN * BUCKET_GROWTH^i
+    ## and the last one everything longer (~30 minutes and above)
+    BUCKET_MIN = 0.001
+    BUCKET_GROWTH = 1.2
+    BUCKET_COUNT = 80
+
+    lock = threading.Lock()
+    checks = {}
+    apis = {}
+    resources = []
+
+    @staticmethod
+    def isEnabled():
+        return bool(Config.get('profiler', 1))
+
+    @staticmethod
+    def getApi(event_name):
+        ## e.g. after-call.cloudwatch-logs.DescribeLogGroups
+        parts = event_name.split('.')
+        key = (parts[1], parts[2])
+        if key not in Profiler.apis:
+            with Profiler.lock:
+                if key not in Profiler.apis:
+                    Profiler.apis[key] = {'stat': Profiler.newStat(), 'calls': 0, 'attempts': 0, 'throttles': 0, 'errors': 0, 'bytes': 0}
+        return Profiler.apis[key]
+
+    @staticmethod
+    def register(client):
+        if not Profiler.isEnabled():
+            return
+
+        def beforeCall(event_name, context=None, **kwargs):
+            if context is not None:
+                context['profilerStart'] = time.time()
+
+        def beforeSend(event_name, **kwargs):
+            api = Profiler.getApi(event_name)
+            with Profiler.lock:
+                api['attempts'] += 1
+
+        def needsRetry(event_name, response=None, **kwargs):
+            if response is None:
+                return
+            ## same throttling codes as the rate limiter reacts on
+            code = response[1].get('Error', {}).get('Code')
+            if code in RateLimiter.THROTTLE_CODES:
+                api = Profiler.getApi(event_name)
+                with Profiler.lock:
+                    api['throttles'] += 1
+
+        def afterCall(event_name, http_response=None, model=None, context=None, **kwargs):
+            size = 0
+            if http_response is not None:
+                size = http_response.headers.get('content-length')
+                if size is None and model is not None and not model.has_streaming_output:
+                    size = len(http_response.content or b'')
+            Profiler.recordCall(event_name, context, int(size or 0), http_response is None or http_response.status_code >= 400)
+
+        def afterCallError(event_name, context=None, **kwargs):
+            Profiler.recordCall(event_name, context, 0, True)
+
+        client.meta.events.register('before-call', beforeCall)
+        client.meta.events.register('before-send', beforeSend)
+        client.meta.events.register('needs-retry', needsRetry)
+        client.meta.events.register('after-call', afterCall)
+        client.meta.events.register('after-call-error', afterCallError)
+
+    @staticmethod
+    def recordCall(event_name, context, size, isError):
+        if context is None or 'profilerStart' not in context:
+            return
+
+        duration = time.time() - context.pop('profilerStart')
+        api = Profiler.getApi(event_name)
+        with Profiler.lock:
+            Profiler.addSample(api['stat'], duration)
+            api['calls'] += 1
+            api['bytes'] += size
+            if isError:
+                api['errors'] += 1
+
+    @staticmethod
+    def recordCheck(service, driver, check, duration):
+        if not Profiler.isEnabled():
+            return
+
+        key = (service, driver, check)
+        with Profiler.lock:
+            if key not in Profiler.checks:
+                Profiler.checks[key] = Profiler.newStat()
+            Profiler.addSample(Profiler.checks[key], duration)
+
+    @staticmethod
+    def recordResource(service, driver, name, duration):
+        if not Profiler.isEnabled():
+            return
+
+        row = (duration, service, driver, name)
+        with Profiler.lock:
+            if len(Profiler.resources) < Profiler.TOP_RESOURCES:
+                heapq.heappush(Profiler.resources, row)
+            elif row > Profiler.resources[0]:
+                heapq.heapreplace(Profiler.resources, row)
+
+    @staticmethod
+    def newStat():
+        return {'count': 0, 'total': 0.0, 'max': 0.0, 'buckets': array('L', [0] * Profiler.BUCKET_COUNT)}
+
+    @staticmethod
+    def getBucket(duration):
+        if duration <= Profiler.BUCKET_MIN:
+            return 0
+        bucket = math.ceil(math.log(duration / Profiler.BUCKET_MIN, Profiler.BUCKET_GROWTH))
+        return min(bucket, Profiler.BUCKET_COUNT - 1)
+
+    @staticmethod
+    def addSample(stat, duration):
+        stat['count'] += 1
+        stat['total'] += duration
+        stat['max'] = max(stat['max'], duration)
+        stat['buckets'][Profiler.getBucket(duration)] += 1
+
+    @staticmethod
+    def dumpStat(stat):
+        p = Profiler.PRECISION
+        return [stat['count'], round(stat['total'], p), round(stat['max'], p), list(stat['buckets'])]
+
+    @staticmethod
+    def mergeStat(stat, part):
+        '''
+        part: [count, total, max, buckets] as written by dumpStat
+        '''
+        count, total, maxDuration, buckets = part
+        stat['count'] += count
+        stat['total'] += total
+        stat['max'] = max(stat['max'], maxDuration)
+        for i, n in enumerate(buckets):
+            stat['buckets'][i] += n
+
+    @staticmethod
+    def collect():
+        '''
+        histograms recorded since the last collect, JSON serializable, used per work unit
+        '''
+        with Profiler.lock:
+            checks, apis, resources = Profiler.checks, Profiler.apis, Profiler.resources
+            Profiler.checks, Profiler.apis, Profiler.resources = {}, {}, []
+
+        p = Profiler.PRECISION
+        return {
+            'checks': [list(key) + [Profiler.dumpStat(stat)] for key, stat in checks.items()],
+            'apis': [list(key) + [api['calls'], api['attempts'], api['throttles'], api['errors'], api['bytes'], Profiler.dumpStat(api['stat'])] for key, api in apis.items()],
+            'resources': [[round(row[0], p)] + list(row[1:]) for row in resources]
+        }
+
+    @staticmethod
+    def summarize(stat):
+        n = stat['count']
+        if n == 0:
+            return {'count': 0, 'total': 0, 'p50': 0, 'p95': 0, 'max': 0}
+
+        ## nearest-rank percentile, reported as the upper bound of its bucket
+        def percentile(pct):
+            rank = max(1, math.ceil(pct * n))
+            seen = 0
+            for i, count in enumerate(stat['buckets']):
+                seen += count
+                if seen >= rank:
+                    return min(Profiler.BUCKET_MIN * Profiler.BUCKET_GROWTH ** i, stat['max'])
+            return stat['max']
+
+        p = Profiler.PRECISION
+        return {
+            'count': n,
+            'total': round(stat['total'], p),
+            'p50': round(percentile(0.5), p),
+            'p95': round(percentile(0.95), p),
+            'max': round(stat['max'], p)
+        }
+
+    @staticmethod
+    def buildReport(parts):
+        '''
+        parts: collect() outputs of all work units
+        '''
+        checks = {}
+        apis = {}
+        resources = []
+        for part in parts:
+            for service, driver, check, stat in part.get('checks', []):
+                key = (service, driver, check)
+                if key not in checks:
+                    checks[key] = Profiler.newStat()
+                Profiler.mergeStat(checks[key], stat)
+
+            for awsService, operation, calls, attempts, throttles, errors, size, stat in part.get('apis', []):
+                key = (awsService, operation)
+                if key not in apis:
+                    apis[key] = {'calls': 0, 'attempts': 0, 'throttles': 0, 'errors': 0, 'bytes': 0, 'stat': Profiler.newStat()}
+                api = apis[key]
+                api['calls'] += calls
+                api['attempts'] += attempts
+                api['throttles'] += throttles
+                api['errors'] += errors
+                api['bytes'] += size
+                Profiler.mergeStat(api['stat'], stat)
+
+            resources.extend(part.get('resources', []))
+
+        checkRows = []
+        for (service, driver, check), stat in checks.items():
+            row = {'service': service, 'driver': driver, 'check': check}
+            row.update(Profiler.summarize(stat))
+            checkRows.append(row)
+
+        apiRows = []
+        for (awsService, operation), api in apis.items():
+            row = {
+                'service': awsService,
+                'operation': operation,
+                'calls': api['calls'],
+                'retries': max(0, api['attempts'] - api['calls']),
+                'throttles': api['throttles'],
+                'errors': api['errors'],
+                'bytes': api['bytes']
+            }
+            stat = Profiler.summarize(api['stat'])
+            del stat['count']
+            row.update(stat)
+            apiRows.append(row)
+
+        checkRows.sort(key=lambda row: row['total'], reverse=True)
+        apiRows.sort(key=lambda row: row['total'], reverse=True)
+        resources.sort(key=lambda row: row[0], reverse=True)
+
+        return {
+            'summary': {
+                'checks': sum(row['count'] for row in checkRows),
+                'checkSeconds': round(sum(row['total'] for row in checkRows), Profiler.PRECISION),
+                'apiCalls': sum(row['calls'] for row in apiRows),
+                'apiSeconds': round(sum(row['total'] for row in apiRows), Profiler.PRECISION),
+                'retries': sum(row['retries'] for row in apiRows),
+                'throttles': sum(row['throttles'] for row in apiRows),
+                'bytes': sum(row['bytes'] for row in apiRows)
+            },
+            'checks': checkRows[:Profiler.TOP_ROWS],
+            'apis': apiRows[:Profiler.TOP_ROWS],
+            'resources': [{'service': service, 'driver': driver, 'name': name, 'seconds': seconds} for seconds, service, driver, name in resources[:Profiler.TOP_RESOURCES]]
+        }
@@ -0,0 +1,226 @@
+import re
+import time
+import hashlib
+from sys import platform
+
+if platform == 'darwin':
+    import multiprocess as mp
+else:
+    import multiprocessing as mp
+
+from utils.Tools import _pr
+
+## Token bucket per (API family, region), shared by all worker processes.
+## API family is <service>.<verb>, e.g. ec2.Describe, cloudwatch.Get
+## Every boto3 client created by ClientFactory consults the bucket before sending a request,
+## the rate is halved when a throttling error is seen and recovers slowly on success
+class RateLimiter():
+    SLOTS = 2048
+    ## tokens, lastRefill, rate, baseRate, key id of the (family, region) owning the slot
+    FIELDS = 5
+    BURST_SECONDS = 2
+    MIN_RATE = 0.5
+    RECOVERY_STEP = 0.05
+
+    ## requests per second, service part is the botocore hyphenized service id
+    ## override with --others '{"rateLimits": {"ec2.Describe": 10}}'
+    DEFAULT_RATES = {
+        'default': 25,
+        'ec2.Describe': 20,
+        'cloudwatch.Get': 40,
+        'iam.Get': 10,
+        'iam.List': 10,
+        'cost-explorer.Get': 5,
+        's3.Get': 50,
+        'cloudwatch-logs.Describe': 5,
+        'support.Describe': 5
+    }
+
+    ## botocore.retries.standard throttling error codes
+    THROTTLE_CODES = [
+        'Throttling',
+        'ThrottlingException',
+        'ThrottledException',
+        'RequestThrottledException',
+        'TooManyRequestsException',
+        'ProvisionedThroughputExceededException',
+        'TransactionInProgressException',
+        'RequestLimitExceeded',
+        'BandwidthLimitExceeded',
+        'LimitExceededException',
+        'RequestThrottled',
+        'SlowDown',
+        'PriorRequestNotComplete',
+        'EC2ThrottledException'
+    ]
+
+    table = None
+    lock = None
+    rates = DEFAULT_RATES.copy()
+    ## (family, region) key: slot offset, slots never change owner so this is cached per process
+    slots = {}
+    stats = {'waits': 0, 'waited': 0, 'throttles': 0}
+
+    @staticmethod
+    def init(rates=None):
+        ## Call in parent process before creating the Pool, workers inherit the shared table
+        RateLimiter.table = mp.Array('d', RateLimiter.SLOTS * RateLimiter.FIELDS, lock=False)
+        RateLimiter.lock = mp.Lock()
+        RateLimiter.slots = {}
+        if rates:
+            RateLimiter.rates.update(rates)
+
+    @staticmethod
+    def getShared():
+        if RateLimiter.table is None:
+            RateLimiter.init()
+        return (RateLimiter.table, RateLimiter.lock, RateLimiter.rates)
+
+    @staticmethod
+    def attach(table, lock, rates):
+        ## Pool initializer, for platforms not using fork
+        RateLimiter.table = table
+        RateLimiter.lock = lock
+        RateLimiter.rates = rates
+        RateLimiter.slots = {}
+
+    @staticmethod
+    def getFamily(serviceName, operation):
+        verb = re.match(r'[A-Z][a-z]+', operation)
+        return serviceName + '.' + (verb.group(0) if verb else operation)
+
+    @staticmethod
+    def getRate(family):
+        return float(RateLimiter.rates.get(family, RateLimiter.rates['default']))
+
+    @staticmethod
+    def getKeyId(key):
+        ## 52 bits stay exact in a double, 0 marks a free slot
+        return (int(hashlib.md5(key.encode('utf-8')).hexdigest()[:13], 16) or 1)
+
+    @staticmethod
+    def getSlot(family, region):
+        '''
+        open addressing on the shared table, each (family, region) claims its own slot
+        the first worker to use a key writes its id, others probe until they find it
+        '''
+        key = family + '@' + str(region)
+        if key in RateLimiter.slots:
+            return RateLimiter.slots[key]
+
+        t = RateLimiter.table
+        keyId = RateLimiter.getKeyId(key)
+        home = keyId % RateLimiter.SLOTS
+        slot = None
+        with RateLimiter.lock:
+            for n in range(RateLimiter.SLOTS):
+                i = ((home + n) % RateLimiter.SLOTS) * RateLimiter.FIELDS
+                if t[i+4] == keyId:
+                    slot = i
+                    break
+                if t[i+4] == 0:
+                    t[i+4] = keyId
+                    slot = i
+                    break
+
+        if slot is None:
+            ## table full, share the home slot rather than fail the call
+            _pr("[RateLimiter] no free slot for {}, sharing slot {}".format(key, home))
+            slot = home * RateLimiter.FIELDS
+
+        RateLimiter.slots[key] = slot
+        return slot
+
+    @staticmethod
+    def acquire(family, region):
+        if RateLimiter.table is None:
+            RateLimiter.init()
+
+        t = RateLimiter.table
+        i = RateLimiter.getSlot(family, region)
+        waited = 0
+        while True:
+            with RateLimiter.lock:
+                now = time.time()
+                if t[i+2] == 0:
+                    rate = RateLimiter.getRate(family)
+                    t[i] = rate * RateLimiter.BURST_SECONDS
+                    t[i+1] = now
+                    t[i+2] = rate
+                    t[i+3] = rate
+
+                rate = t[i+2]
+                capacity = max(rate * RateLimiter.BURST_SECONDS, 1)
+                t[i] = min(capacity, t[i] + (now - t[i+1]) * rate)
+                t[i+1] = now
+
+                if t[i] >= 1:
+                    t[i] -= 1
+                    break
+
+                wait = (1 - t[i]) / rate
+
+            time.sleep(wait)
+            waited += wait
+
+        if waited > 0:
+            RateLimiter.stats['waits'] += 1
+            RateLimiter.stats['waited'] += waited
+
+    @staticmethod
+    def throttled(family, region):
+        if RateLimiter.table is None:
+            return
+
+        t = RateLimiter.table
+        i = RateLimiter.getSlot(family, region)
+        with RateLimiter.lock:
+            t[i+2] = max(RateLimiter.MIN_RATE, t[i+2] / 2)
+            t[i] = 0
+
+        RateLimiter.stats['throttles'] += 1
+        _pr("[RateLimiter] {}@{} throttled, rate lowered to {}/s".format(family, region, round(t[i+2], 2)))
+
+    @staticmethod
+    def succeeded(family, region):
+        if RateLimiter.table is None:
+            return
+
+        t = RateLimiter.table
+        i = RateLimiter.getSlot(family, region)
+        if t[i+2] >= t[i+3]:
+            return
+
+        with RateLimiter.lock:
+            t[i+2] = min(t[i+3], t[i+2] + t[i+3] * RateLimiter.RECOVERY_STEP)
+
+    @staticmethod
+    def register(client):
+        region = client.meta.region_name
+
+        def parseEvent(event_name):
+            ## e.g. before-send.ec2.DescribeInstances
+            parts = event_name.split('.')
+            return RateLimiter.getFamily(parts[1], parts[2])
+
+        def beforeSend(event_name, **kwargs):
+            RateLimiter.acquire(parseEvent(event_name), region)
+
+        def needsRetry(event_name, response=None, **kwargs):
+            if response is None:
+                return
+            code = response[1].get('Error', {}).get('Code')
+            if code in RateLimiter.THROTTLE_CODES:
+                RateLimiter.throttled(parseEvent(event_name), region)
+
+        def afterCall(event_name, http_response=None, **kwargs):
+            if http_response is not None and http_response.status_code < 400:
+                RateLimiter.succeeded(parseEvent(event_name), region)
+
+        client.meta.events.register('before-send', beforeSend)
+        client.meta.events.register('needs-retry', needsRetry)
+        client.meta.events.register('after-call', afterCall)
+
+    @staticmethod
+    def getStats():
+        return RateLimiter.stats
@@ -5,6 +5,7 @@ from functools import lru_cache
 
 from pprint import pprint
 from utils.Config import Config
+from utils.InstanceTypeCatalog import InstanceTypeCatalog
 from typing import Set, Dict, Union
 from ipaddress import ip_address as IPAddress
 from functools import lru_cache
@@ -65,28 +66,8 @@ def aws_parseInstanceFamily(instanceFamily: str, region=None) -> Dict[str, str]:
     patterns = r"([a-zA-Z]+)(\d+)([a-zA-Z]*)"
     output = re.search(patterns, p)
 
-    cpu = memory = 0
-
-    family = p+'.'+s
-    CACHE_KEYWORD = 'INSTANCE_SPEC::' + family
-    spec = Config.get(CACHE_KEYWORD, [])
-    ssBoto = Config.get('ssBoto', None)
-    if not spec:
-        ec2c = ssBoto.client('ec2', region_name=CURRENT_REGION)
-        resp = ec2c.describe_instance_types(InstanceTypes=[family])
-        
-        iType = resp.get('InstanceTypes')
-        if iType:
-            info = iType[0]
-            cpu = info['VCpuInfo']['DefaultVCpus']
-            memory = round(info['MemoryInfo']['SizeInMiB']/1024, 2)
-
-        spec = {
-            'vcpu': cpu,
-            'memoryInGiB': memory
-        }
-
-        Config.set(CACHE_KEYWORD, spec)
+    ## vcpu & memory from the region instance type catalog instead of a describe call per family
+    spec = InstanceTypeCatalog.get(CURRENT_REGION).getSpec(p+'.'+s)
 
     result = {
         "full": instanceFamily,
@@ -109,35 +90,7 @@ def aws_get_latest_instance_generations(instanceFamilyList: Set[str]) -> Set[str
       input: set(['t4g','t3a','t2','m5'])
       output: set(['t4g','m5'])
     '''
-
-    def parse_instance_family_to_dict(name: str) -> Dict[str, Union[str, int]]:
-        idx = 0
-        family = ""
-        gen = ""
-        attrib = ""
-        for idx in range(len(name)):
-            if str.isalpha(name[idx]):
-                if len(gen) == 0:
-                    family += name[idx]
-                attrib += name[idx]
-            if str.isdigit(name[idx]):
-                gen += name[idx]
-        return {"family": family, "gen": int(gen), "attrib": attrib}
-
-    q = dict()
-    q_attribs = dict()
-
-    for i in [parse_instance_family_to_dict(i) for i in instanceFamilyList]:
-        if i['family'] not in q.keys():
-            q[i['family']] = i['gen']
-            q_attribs[i['family']] = [i['attrib']]
-        elif q[i['family']] < i['gen']:
-            q[i['family']] = i['gen']
-            q_attribs[i['family']] = [i['attrib']]
-        elif q[i['family']] == i['gen']:
-            q_attribs[i['family']].append(i['attrib'])
-
-    return set([e for sublist in [[f"{i}{q[i]}{v}" for v in q_attribs[i]] for i in q.keys()] for e in sublist])
+    return InstanceTypeCatalog.getLatestGenerations(instanceFamilyList)
 
 
 if __name__ == "__main__":
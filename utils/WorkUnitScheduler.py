@@ -0,0 +1,204 @@
+import os
+import json
+import shutil
+import hashlib
+
+from utils.Config import Config
+from utils.CustomPage.CustomPage import CustomPage
+from utils.Profiler import Profiler
+import constants as _C
+
+## Splits each service into (service, region) work units so the pool is not
+## held up by a single service walking every region one after another.
+## Each unit writes its partial output into FORK_DIR/.units, the parent merges
+## them back into the __fork/<service>.json, .stat.json and .charts.json layout
+class WorkUnitScheduler():
+
+    ## Relative cost of scanning one region of a service, used when no timing
+    ## history is available. Higher weight is submitted to the pool first
+    SERVICE_WEIGHTS = {
+        'ec2': 10,
+        'iam': 10,
+        'rds': 8,
+        's3': 8,
+        'lambda': 5,
+        'dynamodb': 5,
+        'cloudwatch': 5,
+        'sqs': 4,
+        'eks': 4,
+        'elasticache': 3,
+        'opensearch': 3,
+        'kms': 3,
+        'ecs': 3,
+        'cloudtrail': 2,
+        'guardduty': 2
+    }
+    DEFAULT_WEIGHT = 1
+
+    ## Services which discover their resources account-wide and cannot be split by region
+    ## s3 shares its bucket to region map across units through S3BucketRegions
+    ACCOUNT_SCOPED_SERVICES = []
+
+    ## FORK_DIR is resolved on call, it is relocated per account when accounts run in parallel
+    @staticmethod
+    def getUnitDir():
+        return _C.FORK_DIR + '/.units'
+
+    @staticmethod
+    def getHistoryFile():
+        return _C.FORK_DIR + '/.workunit.history'
+
+    @staticmethod
+    def reset():
+        if os.path.exists(WorkUnitScheduler.getUnitDir()):
+            shutil.rmtree(WorkUnitScheduler.getUnitDir())
+        os.makedirs(WorkUnitScheduler.getUnitDir())
+
+    @staticmethod
+    def loadHistory():
+        if not os.path.exists(WorkUnitScheduler.getHistoryFile()):
+            return {}
+
+        try:
+            with open(WorkUnitScheduler.getHistoryFile(), 'r') as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return {}
+
+    @staticmethod
+    def expectedCost(service, regions, history):
+        serviceName = service.split('::')[0]
+        weight = WorkUnitScheduler.SERVICE_WEIGHTS.get(serviceName, WorkUnitScheduler.DEFAULT_WEIGHT)
+
+        cost = 0
+        for region in regions:
+            key = serviceName + '::' + region
+            cost += history[key] if key in history else weight
+
+        return cost
+
+    @staticmethod
+    def buildUnits(services, regions, filters):
+        '''
+        return list of (service, [regions], filters), longest expected first
+        service keep the "service::rules" format as passed in from --services
+        '''
+        history = WorkUnitScheduler.loadHistory()
+
+        units = []
+        for service in services:
+            serviceName = service.split('::')[0]
+            if serviceName in Config.GLOBAL_SERVICES:
+                units.append((service, ['GLOBAL'], filters))
+            elif serviceName in WorkUnitScheduler.ACCOUNT_SCOPED_SERVICES:
+                units.append((service, list(regions), filters))
+            else:
+                for region in regions:
+                    units.append((service, [region], filters))
+
+        ## sorted() is stable, units with the same cost keep the --services order
+        return sorted(units, key=lambda unit: WorkUnitScheduler.expectedCost(unit[0], unit[1], history), reverse=True)
+
+    @staticmethod
+    def claimOnce(key):
+        '''
+        return True to the first worker process claiming the key within this scan
+        for account level checks which should not be repeated by every work unit
+        '''
+        if not os.path.exists(WorkUnitScheduler.getUnitDir()):
+            os.makedirs(WorkUnitScheduler.getUnitDir(), exist_ok=True)
+
+        marker = WorkUnitScheduler.getUnitDir() + '/claim.' + hashlib.md5(key.encode('utf-8')).hexdigest()
+        try:
+            fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.close(fd)
+            return True
+        except FileExistsError:
+            return False
+
+    @staticmethod
+    def unitPath(service, region):
+        return WorkUnitScheduler.getUnitDir() + '/' + service + '@' + region + '.json'
+
+    @staticmethod
+    def writeUnit(service, region, results, charts, scanned, customPage, profile=None):
+        with open(WorkUnitScheduler.unitPath(service, region), 'w') as f:
+            json.dump({
+                'service': service,
+                'region': region,
+                'results': results,
+                'charts': charts,
+                'stat': scanned,
+                'customPage': customPage,
+                'profile': profile or {}
+            }, f)
+
+    @staticmethod
+    def readUnits(service):
+        units = []
+        prefix = service + '@'
+        for filename in sorted(os.listdir(WorkUnitScheduler.getUnitDir())):
+            if not filename.startswith(prefix) or not filename.endswith('.json'):
+                continue
+
+            with open(WorkUnitScheduler.getUnitDir() + '/' + filename, 'r') as f:
+                units.append(json.load(f))
+
+        return units
+
+    @staticmethod
+    def mergeUnits(services):
+        history = WorkUnitScheduler.loadHistory()
+        cp = CustomPage()
+        profiles = []
+
+        for service in services:
+            serviceName = service.split('::')[0]
+
+            contexts = {}
+            charts = {}
+            customPages = {}
+            scanned = {
+                'resources': 0,
+                'rules': 0,
+                'exceptions': 0,
+                'timespent': 0
+            }
+
+            for unit in WorkUnitScheduler.readUnits(serviceName):
+                region = unit['region']
+                contexts[region] = unit['results']
+                charts[region] = unit['charts']
+
+                for k in scanned.keys():
+                    scanned[k] += unit['stat'].get(k, 0)
+
+                for cname, info in unit['customPage'].items():
+                    if cname not in customPages:
+                        customPages[cname] = []
+                    customPages[cname].append(info)
+
+                history[serviceName + '::' + region] = round(unit['stat'].get('timespent', 0), 3)
+                if unit.get('profile'):
+                    profiles.append(unit['profile'])
+
+            with open(_C.FORK_DIR + '/' + serviceName + '.json', 'w') as f:
+                json.dump(contexts, f)
+
+            with open(_C.FORK_DIR + '/' + serviceName + '.stat.json', 'w') as f:
+                json.dump(scanned, f)
+
+            ## write the charts data per region
+            with open(_C.FORK_DIR + '/' + serviceName + '.charts.json', 'w') as f:
+                json.dump(charts, f)
+
+            cp.resetOutput(serviceName)
+            cp.writeMergedOutput(serviceName.lower(), customPages)
+
+        with open(WorkUnitScheduler.getHistoryFile(), 'w') as f:
+            json.dump(history, f)
+
+        ## samples of every unit, combined into one report
+        if profiles:
+            with open(_C.FORK_DIR + '/profile.json', 'w') as f:
+                json.dump(Profiler.buildReport(profiles), f)
@@ -3,6 +3,8 @@ import botocore
 import requests
 
 from utils.Config import Config
+from utils.ClientFactory import ClientFactory
+from utils.Paginator import Paginator
 from services.Service import Service
 
 ###### TO DO #####
@@ -21,9 +23,9 @@ class ServiceName(Service):
         ssBoto = self.ssBoto
         
         ###### TO DO #####
-        ## Initiate clients required for the check
+        ## Initiate clients required for the check, clients are cached per process
         ## Example
-        ## self.rdsClient = ssBoto.client('rds', config=self.bConfig)
+        ## self.rdsClient = ClientFactory.getClient(ssBoto, 'rds', config=self.bConfig)
         
         return
     
@@ -40,19 +42,8 @@ class ServiceName(Service):
         ## list the resources
         ## make sure filter by tagging is supported
         ## make sure pagination is supoprted
-        ## Example
-        # results = self.ec2Client.describe_instances(
-        #     Filters = filters
-        # )
-        
-            
-        # arr = results.get('Reservations')
-        # while results.get('NextToken') is not None:
-        #     results = self.ec2Client.describe_instances(
-        #         Filters = filters,
-        #         NextToken = results.get('NextToken')
-        #     )    
-        #     arr = arr + results.get('Reservations')
+        ## Example, Paginator follows NextToken/Marker and yields every item
+        # arr = Paginator.list(self.ec2Client, 'describe_instances', 'Reservations', Filters = filters)
         
         return arr
         
@@ -70,6 +61,7 @@ class ServiceName(Service):
         #     print('... (EC2) inspecting ' + instanceData['InstanceId'])
         #     obj = Ec2Instance(instanceData,self.ec2Client, self.cwClient)
         #     obj.run(self.__class__)
+        #     obj.finalize()
             
         #     objs[f"EC2::{instanceData['InstanceId']}"] = obj.getInfo()
         #.    del obj